@@ -25,7 +25,7 @@ def check_process():
 def check_dependencies():
     """Check if all required dependencies are installed"""
     required_packages = [
-        'telegram', 'openai', 'schedule', 'dotenv'
+        'telegram', 'openai', 'dotenv'
     ]
     
     missing = []
@@ -5,18 +5,22 @@ import signal
 import sys
 from datetime import datetime, timedelta
 from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup, BotCommand, ReplyKeyboardMarkup, KeyboardButton
-from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler, MessageHandler, filters
-import schedule
+from telegram.error import BadRequest, Forbidden, RetryAfter
+from telegram.constants import ParseMode
+from telegram.request import HTTPXRequest
+from telegram.ext import Application, BaseUpdateProcessor, CommandHandler, ContextTypes, CallbackQueryHandler, MessageHandler, filters
 import time
-from typing import List, Dict
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Tuple
 import os
 from dataclasses import dataclass
+import random
 import sqlite3
 import aiohttp
 import json
-import requests
 from urllib.parse import quote
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, APIConnectionError, InternalServerError, RateLimitError
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +29,350 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Prompt templates for generate_predictions_digest; only the date and topic vary per call
+PREDICTIONS_SYSTEM_PROMPTS = {
+    'ru': """Ты - ведущий рыночный аналитик. Создай профессиональный прогноз для сектора "{topic}" на {current_time}.
+
+ФОРМАТ:
+🔮 **АНАЛИТИЧЕСКИЙ ПРОГНОЗ**
+*{current_time} | Стратегический обзор*
+
+📊 **ТЕКУЩИЕ ТРЕНДЫ:**
+• **Основной тренд:** направление рынка
+• **Уровни поддержки/сопротивления:** ключевые цифры
+• **Волатильность:** ожидаемые колебания
+
+⚡️ **КАТАЛИЗАТОРЫ:**
+• Ключевые события на горизонте
+• Риски и возможности
+
+🎯 **РЕКОМЕНДАЦИИ:**
+• Краткосрочная стратегия (1-2 недели)
+• Среднесрочный взгляд (1-3 месяца)
+
+💡 *Аналитика основана на текущих рыночных условиях*
+
+ТРЕБОВАНИЯ:
+- Профессиональный тон
+- Конкретные уровни цен (где применимо)
+- Эмодзи для структурирования: 📊⚡️🎯💡🔍📈📉🚀⚠️
+- Максимум 800 символов""",
+    'en': """You are a leading market analyst. Create a professional forecast for "{topic}" sector on {current_time}.
+
+FORMAT:
+🔮 **ANALYTICAL FORECAST**
+*{current_time} | Strategic Overview*
+
+📊 **CURRENT TRENDS:**
+• **Main trend:** market direction
+• **Support/resistance levels:** key figures
+• **Volatility:** expected fluctuations
+
+⚡️ **CATALYSTS:**
+• Key upcoming events
+• Risks and opportunities
+
+🎯 **RECOMMENDATIONS:**
+• Short-term strategy (1-2 weeks)
+• Medium-term outlook (1-3 months)
+
+💡 *Analysis based on current market conditions*
+
+REQUIREMENTS:
+- Professional tone
+- Specific price levels (where applicable)
+- Emojis for structure: 📊⚡️🎯💡🔍📈📉🚀⚠️
+- Maximum 800 characters""",
+}
+
+# /status command output
+BOT_STATUS_TMPL = """
+🤖 **Bot Status**
+
+📊 **Statistics:**
+• Total users: {user_count}
+• Active subscribers: {subscriber_count}
+• Uptime: ✅ Online
+
+👤 **Your Settings:**
+• Language: {language_name}
+• Topic: {topic_name}
+• Subscribed: {subscribed}
+
+🔧 **System:**
+• AI Research: ✅ Operational
+• Database: ✅ Connected
+• Scheduler: ✅ Running
+        """
+
+# /notify confirmation, filled from the admin's translation table plus the send counts
+NOTIFY_CONFIRMATION_TMPL = """
+✅ **{notification_success}**
+
+📊 **{results}:**
+• {successfully_sent}: {sent} users
+• {failed_to_send}: {failed} users
+• {total_subscribers}: {total} users
+
+⏰ **{sent_at}:** {timestamp} EST
+
+🔔 {all_notified}
+"""
+
+# Main-menu status screen per language: (template, subscribed text, not subscribed text)
+STATUS_TMPL = {
+    'ru': ("""📊 **Ваш статус:**
+
+🔔 **Уведомления:** {sub}
+🎯 **Темы:** {topics}
+🌐 **Язык:** 🇷🇺 Русский
+👤 **ID:** {uid}""", "✅ Подписан", "❌ Не подписан"),
+    'en': ("""📊 **Your Status:**
+
+🔔 **Notifications:** {sub}
+🎯 **Topics:** {topics}
+🌐 **Language:** 🇺🇸 English
+👤 **ID:** {uid}""", "✅ Subscribed", "❌ Not subscribed"),
+}
+
+# Static bilingual screens for contextual callbacks
+PREMARKET_MSG = {
+    'ru': """📊 **ПРЕМАРКЕТ**
+*Данные до открытия торгов*
+
+🇺🇸 **US Futures:**
+• S&P 500: +0.2% 📈
+• Nasdaq: +0.1% 📈  
+• Dow Jones: +0.3% 📈
+
+🌍 **Global Markets:**
+• FTSE 100: +0.4% 📈
+• DAX: +0.1% 📈
+• Nikkei: -0.2% 📉
+
+⏰ **До открытия:** 2ч 30мин
+🔄 **Обновлено:** каждые 5 минут""",
+    'en': """📊 **PRE-MARKET**
+*Data before market open*
+
+🇺🇸 **US Futures:**
+• S&P 500: +0.2% 📈
+• Nasdaq: +0.1% 📈  
+• Dow Jones: +0.3% 📈
+
+🌍 **Global Markets:**
+• FTSE 100: +0.4% 📈
+• DAX: +0.1% 📈
+• Nikkei: -0.2% 📉
+
+⏰ **Until open:** 2h 30min
+🔄 **Updated:** every 5 minutes""",
+}
+
+TODAY_EVENTS_MSG = {
+    'ru': """📅 **СОБЫТИЯ ДНЯ**
+*Ключевые события сегодня*
+
+🕘 **09:00** - Данные по инфляции ЕС
+🕘 **14:30** - Отчет по занятости США
+🕘 **16:00** - Решение ФРС по ставкам
+
+🏢 **Отчетность:**
+• Apple - до открытия
+• Tesla - после закрытия
+• Microsoft - завтра
+
+⚠️ **Важно:**
+• Волатильность ожидается высокая
+• Следите за объемами торгов""",
+    'en': """📅 **TODAY'S EVENTS**
+*Key events today*
+
+🕘 **09:00** - EU Inflation Data
+🕘 **14:30** - US Employment Report
+🕘 **16:00** - Fed Rate Decision
+
+🏢 **Earnings:**
+• Apple - before open
+• Tesla - after close
+• Microsoft - tomorrow
+
+⚠️ **Important:**
+• High volatility expected
+• Watch trading volumes""",
+}
+
+UNDER_DEV_MSG = {
+    'ru': """🚧 **Функция в разработке**
+
+⚡ Эта функция скоро будет доступна!
+📈 Мы работаем над улучшением вашего опыта
+
+🔄 Попробуйте другие функции из меню""",
+    'en': """🚧 **Feature Under Development**
+
+⚡ This feature will be available soon!
+📈 We're working to improve your experience
+
+🔄 Try other features from the menu""",
+}
+
+# How long the in-process subscriber list may be reused before re-reading the database
+SUBSCRIBERS_CACHE_TTL = 60
+
+# Telegram allows ~30 messages per second per bot; stay a little below that
+TELEGRAM_MESSAGES_PER_SECOND = 25
+
+# Updates from different chats are handled concurrently, ordered within each of this many chat shards
+UPDATE_SHARDS = 16
+# Updates admitted at once; well above UPDATE_SHARDS, since updates waiting on a busy shard's lock keep their slot
+MAX_CONCURRENT_UPDATES = 256
+
+# Workers generating and sending daily digests at the same time
+DAILY_NOTIFICATION_CONCURRENCY = 25
+
+# Progressive message edits while an AI response streams in
+STREAM_EDIT_INTERVAL = 0.5  # seconds between edits
+STREAM_EDIT_MIN_CHARS = 80  # new characters required before editing again
+
+# OpenAI errors worth retrying, with exponential backoff capped at OPENAI_RETRY_MAX_DELAY;
+# clients are built with max_retries=0 so openai_with_retry is the only retry layer
+OPENAI_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+OPENAI_RETRY_ATTEMPTS = 5
+OPENAI_RETRY_MAX_DELAY = 30  # seconds
+
+PREDICTIONS_USER_PROMPT = (
+    "Generate market predictions and trends for {topic} sector based on current {today} market conditions."
+)
+
+# UI strings per language, shared by every bot instance
+TRANSLATIONS = {
+    'en': {
+        'welcome_title': '🛢️ Oil & Gas AI Bot',
+        'welcome_message': 'Welcome, {name}! I am your AI-powered oil & gas market assistant.',
+        'what_i_do': 'What I offer:',
+        'daily_news': 'Hourly oil & gas market updates powered by AI',
+        'sentiment_analysis': 'AI-powered oil & gas market analysis',
+        'predictions': 'Oil futures analysis and market predictions',
+        'auto_updates': 'Automatic hourly updates for testing',
+        'commands': 'Commands:',
+        'news_cmd': '/news - Get latest market news',
+        'notify_cmd': '/notify - Manually trigger notifications for all subscribers (Admin only)',
+        'subscribe_cmd': '/subscribe - Enable daily news updates',
+        'unsubscribe_cmd': '/unsubscribe - Disable daily updates',
+        'language_cmd': '/language - Choose language with buttons',
+        'topics_cmd': '/topics - Choose topics of interest',
+        'help_cmd': '/help - Show all commands',
+        'status_cmd': '/status - Check bot and market status',
+        'stats_cmd': '/stats - View bot usage statistics',
+        'admin_features': 'Admin Features:',
+        'first_user_admin': 'First user automatically becomes admin',
+        'fetching_news': '📰 Researching latest market news...',
+        'no_news': '❌ Unable to fetch news at the moment. Please try again later.',
+        'error_fetching': '❌ Error occurred while fetching news. Please try again.',
+        'subscribed': '✅ You are now subscribed to daily market updates!',
+        'already_subscribed': 'ℹ️ You are already subscribed to daily updates.',
+        'unsubscribed': '✅ You have been unsubscribed from daily updates.',
+        'not_subscribed': 'ℹ️ You are not currently subscribed.',
+        'language_selection': '🌍 Language Selection',
+        'current_language': 'Current language',
+        'topic_selection': '🎯 Topic Selection',
+        'current_topics': 'Current topic',
+        'topics_updated': '✅ Topic preferences updated!',
+        'notification_success': 'Manual notification sent successfully!',
+        'no_subscribers': 'No subscribers found.',
+        'error_notification': '❌ Error sending notifications.',
+        'results': 'Results',
+        'successfully_sent': 'Successfully sent',
+        'failed_to_send': 'Failed to send',
+        'total_subscribers': 'Total subscribers',
+        'sent_at': 'Sent at',
+        'all_notified': 'All subscribers have been notified!',
+        'help_message': '''🤖 **AI-Only Oil & Gas Bot**
+
+🛢️ **Specialization:** Professional oil & gas market data
+📊 **Source:** AI-generated content for demonstration
+⏰ **Updates:** Hourly notifications during testing
+
+**📱 Available Commands:**
+• `/news` - Get latest oil & gas market digest
+• `/subscribe` - Enable hourly notifications
+• `/unsubscribe` - Disable notifications  
+• `/status` - Check bot status
+• `/help` - Show this help
+
+**🎯 What You Get:**
+📰 Oil & Gas News
+💰 Live Price Simulation
+📈 Futures Analysis (NEW!)
+🔮 Market Predictions
+
+⚠️ **Disclaimer:** AI-generated data for demonstration only'''
+    },
+    'ru': {
+        'welcome_title': '🛢️ Нефтегазовый AI-Бот',
+        'welcome_message': 'Добро пожаловать, {name}! Я ваш помощник по нефтегазовым рынкам на базе ИИ.',
+        'what_i_do': 'Что я предлагаю:',
+        'daily_news': 'Ежечасные обновления нефтегазовых рынков на базе ИИ',
+        'sentiment_analysis': 'Анализ нефтегазовых рынков с помощью ИИ',
+        'predictions': 'Анализ нефтяных фьючерсов и прогнозы рынка',
+        'auto_updates': 'Автоматические ежечасные обновления для тестирования',
+        'commands': 'Команды:',
+        'news_cmd': '/news - Получить последние новости рынка',
+        'notify_cmd': '/notify - Вручную отправить уведомления всем подписчикам (только для админов)',
+        'subscribe_cmd': '/subscribe - Включить ежедневные обновления новостей',
+        'unsubscribe_cmd': '/unsubscribe - Отключить ежедневные обновления',
+        'language_cmd': '/language - Выбрать язык кнопками',
+        'topics_cmd': '/topics - Выбрать интересующие темы',
+        'help_cmd': '/help - Показать все команды',
+        'status_cmd': '/status - Проверить статус бота и рынка',
+        'stats_cmd': '/stats - Просмотреть статистику использования бота',
+        'admin_features': 'Функции администратора:',
+        'first_user_admin': 'Первый пользователь автоматически становится администратором',
+        'fetching_news': '📰 Исследую последние новости рынка...',
+        'no_news': '❌ Не удалось получить новости в данный момент. Попробуйте позже.',
+        'error_fetching': '❌ Произошла ошибка при получении новостей. Попробуйте снова.',
+        'subscribed': '✅ Вы подписались на ежедневные обновления рынка!',
+        'already_subscribed': 'ℹ️ Вы уже подписаны на ежедневные обновления.',
+        'unsubscribed': '✅ Вы отписались от ежедневных обновлений.',
+        'not_subscribed': 'ℹ️ Вы в настоящее время не подписаны.',
+        'language_selection': '🌍 Выбор языка',
+        'current_language': 'Текущий язык',
+        'topic_selection': '🎯 Выбор тем',
+        'current_topics': 'Текущая тема',
+        'topics_updated': '✅ Предпочтения по темам обновлены!',
+        'notification_success': 'Ручное уведомление отправлено успешно!',
+        'no_subscribers': 'Подписчики не найдены.',
+        'error_notification': '❌ Ошибка отправки уведомлений.',
+        'results': 'Результаты',
+        'successfully_sent': 'Успешно отправлено',
+        'failed_to_send': 'Не удалось отправить',
+        'total_subscribers': 'Всего подписчиков',
+        'sent_at': 'Отправлено в',
+        'all_notified': 'Все подписчики уведомлены!',
+        'help_message': '''🤖 **AI-Only Нефтегазовый Бот**
+
+🛢️ **Специализация:** Профессиональные данные нефтегазовых рынков
+📊 **Источник:** Контент, генерируемый ИИ для демонстрации
+⏰ **Обновления:** Каждый час во время тестирования
+
+**📱 Доступные команды:**
+• `/news` - Получить последние новости нефтегазовых рынков
+• `/subscribe` - Включить ежечасные уведомления
+• `/unsubscribe` - Отключить уведомления
+• `/status` - Проверить статус бота
+• `/help` - Показать эту справку
+
+**🎯 Что вы получаете:**
+📰 Новости нефти и газа
+💰 Моделирование живых цен
+📈 Анализ фьючерсов (НОВОЕ!)
+🔮 Прогнозы рынка
+
+⚠️ **Отказ от ответственности:** Данные, генерируемые ИИ, только для демонстрации'''
+    }
+}
+
 @dataclass
 class NewsItem:
     title: str
@@ -42,42 +390,84 @@ class AssetItem:
     change_direction: str
     source: str = "AI Research"
 
+@dataclass
+class UserProfile:
+    language: str = 'ru'
+    topics: str = 'all'
+    subscribed: bool = False
+
+@dataclass
+class ScheduledJob:
+    name: str
+    next_run: datetime
+    interval: Optional[timedelta] = None  # None runs the job once
+
 class DatabaseManager:
     def __init__(self, db_path: str = "stock_bot.db"):
         self.db_path = db_path
+        # One connection, opened on first use; the scheduler is an asyncio task, so every
+        # DB call runs on the event loop's thread
+        self._connection = None
+        # Ordered dict of subscribed user IDs; None means it must be reloaded
+        self._subscribers_cache = None
+        self._subscribers_cache_time = 0.0
         self.init_database()
     
+    def _conn(self) -> sqlite3.Connection:
+        """Get the shared connection, opening it on first use"""
+        conn = self._connection
+        if conn is None:
+            # Autocommit mode: single statements commit on their own, groups use _transaction()
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA cache_size=-20000')
+            self._connection = conn
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """Run several statements as one write transaction"""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+    
     def init_database(self):
         """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Users table to store subscriber information
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY,
-                username TEXT,
-                first_name TEXT,
-                last_name TEXT,
-                subscribed BOOLEAN DEFAULT TRUE,
-                language TEXT DEFAULT 'ru',
-                topic_preferences TEXT DEFAULT 'oil_gas',
-                joined_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Admin users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS admin_users (
-                user_id INTEGER PRIMARY KEY,
-                added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self._transaction() as conn:
+            # Users table to store subscriber information
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id INTEGER PRIMARY KEY,
+                    username TEXT,
+                    first_name TEXT,
+                    last_name TEXT,
+                    subscribed BOOLEAN DEFAULT TRUE,
+                    language TEXT DEFAULT 'ru',
+                    topic_preferences TEXT DEFAULT 'oil_gas',
+                    joined_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Admin users table
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS admin_users (
+                    user_id INTEGER PRIMARY KEY,
+                    added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users (user_id)
+                )
+            ''')
+            
+            # Partial index holding only subscribers; its WHERE must match the queries' "subscribed = TRUE"
+            # exactly for SQLite to use it (admin_users.user_id is already covered by its primary key)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_users_subscribed ON users(user_id) WHERE subscribed = TRUE')
         
         # Run database migration for existing installations
         self._migrate_database()
@@ -85,40 +475,31 @@ class DatabaseManager:
     def _migrate_database(self):
         """Migrate existing database to add new columns if they don't exist"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get existing columns
-            cursor.execute('PRAGMA table_info(users)')
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            # Check if language column exists
-            if 'language' not in columns:
-                print("🔄 Adding language column to existing database...")
-                cursor.execute('ALTER TABLE users ADD COLUMN language TEXT DEFAULT "ru"')
-                cursor.execute('UPDATE users SET language = "ru" WHERE language IS NULL')
-                print("✅ Language column migration completed!")
-            
-            # Check if topic_preferences column exists
-            if 'topic_preferences' not in columns:
-                print("🔄 Adding topic_preferences column to existing database...")
-                cursor.execute('ALTER TABLE users ADD COLUMN topic_preferences TEXT DEFAULT "all"')
-                cursor.execute('UPDATE users SET topic_preferences = "all" WHERE topic_preferences IS NULL')
-                print("✅ Topic preferences column migration completed!")
-            
-            conn.commit()
-            conn.close()
+            with self._transaction() as conn:
+                # Get existing columns
+                columns = [column[1] for column in conn.execute('PRAGMA table_info(users)')]
+                
+                # Check if language column exists
+                if 'language' not in columns:
+                    print("🔄 Adding language column to existing database...")
+                    conn.execute('ALTER TABLE users ADD COLUMN language TEXT DEFAULT "ru"')
+                    conn.execute('UPDATE users SET language = "ru" WHERE language IS NULL')
+                    print("✅ Language column migration completed!")
+                
+                # Check if topic_preferences column exists
+                if 'topic_preferences' not in columns:
+                    print("🔄 Adding topic_preferences column to existing database...")
+                    conn.execute('ALTER TABLE users ADD COLUMN topic_preferences TEXT DEFAULT "all"')
+                    conn.execute('UPDATE users SET topic_preferences = "all" WHERE topic_preferences IS NULL')
+                    print("✅ Topic preferences column migration completed!")
             
         except Exception as e:
             print(f"⚠️ Database migration warning: {e}")
     
     def add_user(self, user_id: int, username: str = None, first_name: str = None, last_name: str = None):
         """Add or update a user in the database without resetting preferences"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Use UPSERT to preserve existing preferences
-        cursor.execute('''
+        self._conn().execute('''
             INSERT INTO users (user_id, username, first_name, last_name, last_active)
             VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
             ON CONFLICT(user_id) DO UPDATE SET
@@ -128,115 +509,278 @@ class DatabaseManager:
                 last_active=CURRENT_TIMESTAMP
         ''', (user_id, username, first_name, last_name))
         
-        conn.commit()
-        conn.close()
+        # New users are subscribed by default, so an unknown ID makes the cache stale
+        if self._subscribers_cache is not None and user_id not in self._subscribers_cache:
+            self._invalidate_subscribers_cache()
+    
+    def _invalidate_subscribers_cache(self):
+        """Drop the cached subscriber list so the next lookup hits the database"""
+        self._subscribers_cache = None
+    
+    def _subscribers_cache_valid(self) -> bool:
+        """Check whether the cached subscriber list can still be used"""
+        return (self._subscribers_cache is not None
+                and time.monotonic() - self._subscribers_cache_time < SUBSCRIBERS_CACHE_TTL)
     
     def get_subscribed_users(self) -> List[int]:
         """Get all subscribed user IDs"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT user_id FROM users WHERE subscribed = TRUE')
-        users = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        if self._subscribers_cache_valid():
+            return list(self._subscribers_cache)
+        
+        users = [row[0] for row in self._conn().execute('SELECT user_id FROM users WHERE subscribed = TRUE')]
+        
+        self._subscribers_cache = dict.fromkeys(users)
+        self._subscribers_cache_time = time.monotonic()
         return users
     
+    def get_subscriber_groups(self) -> Dict[Tuple[str, str], List[int]]:
+        """Group subscribed user IDs by (language, topic preferences) in one query"""
+        groups = defaultdict(list)
+        for user_id, language, topics in self._conn().execute(
+            'SELECT user_id, language, topic_preferences FROM users WHERE subscribed = TRUE'
+        ):
+            groups[(language, topics)].append(user_id)
+        return groups
+    
+    def iter_subscribed_users(self):
+        """Yield subscribed user IDs as they are read from the cursor, without building a list"""
+        for row in self._conn().execute('SELECT user_id FROM users WHERE subscribed = TRUE'):
+            yield row[0]
+    
     def subscribe_user(self, user_id: int):
         """Subscribe a user to daily updates"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('UPDATE users SET subscribed = TRUE WHERE user_id = ?', (user_id,))
-        conn.commit()
-        conn.close()
+        self._conn().execute('UPDATE users SET subscribed = TRUE WHERE user_id = ?', (user_id,))
+        self._invalidate_subscribers_cache()
     
     def unsubscribe_user(self, user_id: int):
         """Unsubscribe a user from daily updates"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('UPDATE users SET subscribed = FALSE WHERE user_id = ?', (user_id,))
-        conn.commit()
-        conn.close()
+        self._conn().execute('UPDATE users SET subscribed = FALSE WHERE user_id = ?', (user_id,))
+        self._invalidate_subscribers_cache()
+    
+    def unsubscribe_users(self, user_ids: List[int]):
+        """Unsubscribe several users in a single transaction"""
+        if not user_ids:
+            return
+        with self._transaction() as conn:
+            conn.executemany('UPDATE users SET subscribed = FALSE WHERE user_id = ?', [(user_id,) for user_id in user_ids])
+        self._invalidate_subscribers_cache()
+    
+    def get_known_users(self) -> Dict[int, tuple]:
+        """Get (username, first_name, last_name) for every stored user"""
+        cursor = self._conn().execute('SELECT user_id, username, first_name, last_name FROM users')
+        return {row[0]: row[1:] for row in cursor}
     
     def get_user_count(self) -> int:
         """Get total number of users"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM users')
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        return self._conn().execute('SELECT COUNT(*) FROM users').fetchone()[0]
     
     def add_admin(self, user_id: int):
         """Add a user as admin"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('INSERT OR IGNORE INTO admin_users (user_id) VALUES (?)', (user_id,))
-        conn.commit()
-        conn.close()
+        self._conn().execute('INSERT OR IGNORE INTO admin_users (user_id) VALUES (?)', (user_id,))
     
     def is_admin(self, user_id: int) -> bool:
         """Check if user is admin"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT user_id FROM admin_users WHERE user_id = ?', (user_id,))
-        result = cursor.fetchone()
-        conn.close()
+        result = self._conn().execute('SELECT user_id FROM admin_users WHERE user_id = ?', (user_id,)).fetchone()
         return result is not None
     
     def get_user_language(self, user_id: int) -> str:
         """Get user's preferred language"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT language FROM users WHERE user_id = ?', (user_id,))
-        result = cursor.fetchone()
-        conn.close()
+        result = self._conn().execute('SELECT language FROM users WHERE user_id = ?', (user_id,)).fetchone()
         return result[0] if result else 'ru'
     
     def set_user_language(self, user_id: int, language: str):
         """Set user's preferred language"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('UPDATE users SET language = ? WHERE user_id = ?', (language, user_id))
-        conn.commit()
-        conn.close()
+        self._conn().execute('UPDATE users SET language = ? WHERE user_id = ?', (language, user_id))
     
     def get_user_topics(self, user_id: int) -> str:
         """Get user's topic preferences"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT topic_preferences FROM users WHERE user_id = ?', (user_id,))
-        result = cursor.fetchone()
-        conn.close()
+        result = self._conn().execute('SELECT topic_preferences FROM users WHERE user_id = ?', (user_id,)).fetchone()
         return result[0] if result else 'all'
     
     def set_user_topics(self, user_id: int, topics: str):
         """Set user's topic preferences"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('UPDATE users SET topic_preferences = ? WHERE user_id = ?', (topics, user_id))
-        conn.commit()
-        conn.close()
+        self._conn().execute('UPDATE users SET topic_preferences = ? WHERE user_id = ?', (topics, user_id))
+    
+    def get_user_profile(self, user_id: int) -> UserProfile:
+        """Get user's language, topic preferences and subscription status in one query"""
+        result = self._conn().execute(
+            'SELECT language, topic_preferences, subscribed FROM users WHERE user_id = ?', (user_id,)
+        ).fetchone()
+        if not result:
+            return UserProfile()
+        return UserProfile(language=result[0], topics=result[1], subscribed=bool(result[2]))
     
     def is_subscribed(self, user_id: int) -> bool:
         """Check if user is subscribed"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT subscribed FROM users WHERE user_id = ?', (user_id,))
-        result = cursor.fetchone()
-        conn.close()
+        if self._subscribers_cache_valid():
+            return user_id in self._subscribers_cache
+        
+        result = self._conn().execute('SELECT subscribed FROM users WHERE user_id = ?', (user_id,)).fetchone()
         return result[0] if result else False
 
+class AsyncRateLimiter:
+    """Token bucket allowing `rate` acquisitions per `period` seconds, with bursts up to `rate`
+    
+    Implemented as a generic cell rate algorithm so it needs no asyncio.Lock. The state
+    update is not thread-safe: share it only between coroutines on the same event loop.
+    """
+    
+    def __init__(self, rate: float, period: float = 1.0):
+        self.interval = period / rate
+        self.burst = period - self.interval
+        self._theoretical_arrival = 0.0
+    
+    async def acquire(self):
+        """Wait until a token is available"""
+        now = time.monotonic()
+        arrival = max(self._theoretical_arrival, now)
+        self._theoretical_arrival = arrival + self.interval
+        delay = arrival - self.burst - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    def pause(self, seconds: float):
+        """Hold back every waiter for `seconds`, e.g. after a flood-control response"""
+        resume = time.monotonic() + seconds + self.burst
+        self._theoretical_arrival = max(self._theoretical_arrival, resume)
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+async def openai_with_retry(create, **kwargs):
+    """Call an OpenAI create() coroutine, retrying transient errors with randomized exponential backoff"""
+    for attempt in range(1, OPENAI_RETRY_ATTEMPTS + 1):
+        try:
+            return await create(**kwargs)
+        except OPENAI_RETRYABLE_ERRORS as e:
+            if attempt == OPENAI_RETRY_ATTEMPTS:
+                raise
+            delay = random.uniform(0, min(OPENAI_RETRY_MAX_DELAY, 2 ** attempt))
+            logger.warning(f"OpenAI request failed ({e.__class__.__name__}), retry {attempt} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+class ChatShardedUpdateProcessor(BaseUpdateProcessor):
+    """Process updates concurrently across chats while keeping each chat's updates in order
+    
+    Chats are hashed onto a fixed number of shards, each guarded by a lock, so a slow
+    handler (AI digest, /notify) only holds back chats that share its shard. PTB takes
+    a concurrency slot before do_process_update waits on the shard lock, so the slot
+    limit must be well above the shard count or a busy shard would starve the rest.
+    """
+    
+    def __init__(self, shards: int = UPDATE_SHARDS, max_concurrent_updates: int = MAX_CONCURRENT_UPDATES):
+        super().__init__(max_concurrent_updates=max_concurrent_updates)
+        self.shards = shards
+        self._locks = []
+    
+    async def do_process_update(self, update, coroutine):
+        chat = getattr(update, 'effective_chat', None)
+        chat_id = chat.id if chat else 0
+        async with self._locks[chat_id % self.shards]:
+            await coroutine
+    
+    async def initialize(self):
+        # Created here so the locks belong to the application's event loop
+        self._locks = [asyncio.Lock() for _ in range(self.shards)]
+    
+    async def shutdown(self):
+        pass
+
+def is_unreachable_chat(error: Exception) -> bool:
+    """Whether a send failed because the chat can never be reached again (blocked, deactivated, deleted)"""
+    if isinstance(error, Forbidden):
+        return True
+    return isinstance(error, BadRequest) and "chat not found" in error.message.lower()
+
+class StreamingMessage:
+    """Telegram message that is progressively edited while an AI response streams in
+    
+    Every send and edit goes through `rate_limited(method, *args, **kwargs)`, so streamed
+    edits share the bot-wide Telegram limit and flood-control pauses.
+    """
+    
+    def __init__(self, bot: Bot, chat_id: int, rate_limited):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.rate_limited = rate_limited
+        self.message = None
+        self._sent_text = ""
+        self._last_edit = 0.0
+    
+    async def update(self, text: str):
+        """Show partial text, throttled to avoid hitting Telegram edit limits"""
+        now = time.monotonic()
+        if self.message is not None and (
+            now - self._last_edit < STREAM_EDIT_INTERVAL
+            or len(text) - len(self._sent_text) < STREAM_EDIT_MIN_CHARS
+        ):
+            return
+        
+        try:
+            # Partial Markdown may be unbalanced, so intermediate updates are plain text
+            if self.message is None:
+                self.message = await self.rate_limited(self.bot.send_message, chat_id=self.chat_id, text=text)
+            else:
+                await self.rate_limited(self.message.edit_text, text)
+            self._sent_text = text
+            self._last_edit = now
+        except Exception as e:
+            logger.warning(f"Could not update streaming message for chat {self.chat_id}: {e}")
+    
+    async def finish(self, text: str):
+        """Replace the partial text with the final Markdown-formatted response"""
+        if self.message is None:
+            await self.rate_limited(self.bot.send_message, chat_id=self.chat_id, text=text, parse_mode=ParseMode.MARKDOWN)
+            return
+        
+        try:
+            await self.rate_limited(self.message.edit_text, text, parse_mode=ParseMode.MARKDOWN)
+        except BadRequest as e:
+            if "not modified" not in str(e).lower():
+                raise
+
 class StockNewsBot:
     def __init__(self, bot_token: str):
         self.bot_token = bot_token
-        self.bot = Bot(token=bot_token)
-        self.application = Application.builder().token(bot_token).build()
+        # One Bot and one keep-alive connection pool, sized for every notification worker
+        # to send at once, shared by handlers and scheduled notifications
+        self.application = (
+            Application.builder().token(bot_token)
+            .request(HTTPXRequest(connection_pool_size=DAILY_NOTIFICATION_CONCURRENCY, read_timeout=20))
+            .concurrent_updates(ChatShardedUpdateProcessor())
+            .post_init(self._start_scheduler)
+            .post_shutdown(self._stop_scheduler)
+            .build()
+        )
+        self.bot = self.application.bot
+        
+        # Notification jobs, run by a single asyncio task started with the application
+        self._jobs: List[ScheduledJob] = []
+        self._scheduler_task = None
         self.db = DatabaseManager()
+        self.telegram_limiter = AsyncRateLimiter(TELEGRAM_MESSAGES_PER_SECOND)
+        
+        # Only one broadcast (/notify, /testnotifications or scheduled) runs at a time
+        self._broadcast_lock = asyncio.Lock()
+        self._broadcast_progress = {'sent': 0, 'failed': 0, 'total': 0}
+        # Chats found unreachable during the current broadcast, unsubscribed together at the end
+        self._unreachable_chats: List[int] = []
+        
+        # Predictions digests keyed by (topic, language, ISO date)
+        self._predictions_cache = {}
+        
+        # Users already stored with their current names, so handlers can skip the upsert
+        self._known_users = self.db.get_known_users()
         
         # Initialize OpenAI client
         import os
         openai_api_key = os.getenv('OPENAI_API_KEY')
         if openai_api_key:
-            self.openai_client = AsyncOpenAI(api_key=openai_api_key)
+            self.openai_client = AsyncOpenAI(api_key=openai_api_key, max_retries=0)
         else:
             self.openai_client = None
             logger.warning("⚠️ OpenAI API key not found - AI features will be disabled")
@@ -253,132 +797,110 @@ class StockNewsBot:
         self.supported_languages = ['en', 'ru']
         self.default_language = 'ru'
         
-        # Translation dictionaries
-        self.translations = {
-            'en': {
-                'welcome_title': '🛢️ Oil & Gas AI Bot',
-                'welcome_message': 'Welcome, {name}! I am your AI-powered oil & gas market assistant.',
-                'what_i_do': 'What I offer:',
-                'daily_news': 'Hourly oil & gas market updates powered by AI',
-                'sentiment_analysis': 'AI-powered oil & gas market analysis',
-                'predictions': 'Oil futures analysis and market predictions',
-                'auto_updates': 'Automatic hourly updates for testing',
-                'commands': 'Commands:',
-                'news_cmd': '/news - Get latest market news',
-                'notify_cmd': '/notify - Manually trigger notifications for all subscribers (Admin only)',
-                'subscribe_cmd': '/subscribe - Enable daily news updates',
-                'unsubscribe_cmd': '/unsubscribe - Disable daily updates',
-                'language_cmd': '/language - Choose language with buttons',
-                'topics_cmd': '/topics - Choose topics of interest',
-                'help_cmd': '/help - Show all commands',
-                'status_cmd': '/status - Check bot and market status',
-                'stats_cmd': '/stats - View bot usage statistics',
-                'admin_features': 'Admin Features:',
-                'first_user_admin': 'First user automatically becomes admin',
-                'fetching_news': '📰 Researching latest market news...',
-                'no_news': '❌ Unable to fetch news at the moment. Please try again later.',
-                'error_fetching': '❌ Error occurred while fetching news. Please try again.',
-                'subscribed': '✅ You are now subscribed to daily market updates!',
-                'already_subscribed': 'ℹ️ You are already subscribed to daily updates.',
-                'unsubscribed': '✅ You have been unsubscribed from daily updates.',
-                'not_subscribed': 'ℹ️ You are not currently subscribed.',
-                'language_selection': '🌍 Language Selection',
-                'current_language': 'Current language',
-                'topic_selection': '🎯 Topic Selection',
-                'current_topics': 'Current topic',
-                'topics_updated': '✅ Topic preferences updated!',
-                'notification_success': 'Manual notification sent successfully!',
-                'no_subscribers': 'No subscribers found.',
-                'error_notification': '❌ Error sending notifications.',
-                'results': 'Results',
-                'successfully_sent': 'Successfully sent',
-                'failed_to_send': 'Failed to send',
-                'total_subscribers': 'Total subscribers',
-                'sent_at': 'Sent at',
-                'all_notified': 'All subscribers have been notified!',
-                'help_message': '''🤖 **AI-Only Oil & Gas Bot**
-
-🛢️ **Specialization:** Professional oil & gas market data
-📊 **Source:** AI-generated content for demonstration
-⏰ **Updates:** Hourly notifications during testing
+        # Keyboards only depend on language/topic, so build each variant once and reuse it
+        self._keyboard_cache = {}
+        self._topics_keyboard_cache = {}
+        self._language_keyboard = InlineKeyboardMarkup([
+            [
+                InlineKeyboardButton("🇷🇺 Русский", callback_data="lang_ru"),
+                InlineKeyboardButton("🇺🇸 English", callback_data="lang_en")
+            ]
+        ])
+        
+        # Main menu "cmd_*" callbacks dispatched by command name
+        self._command_handlers = {
+            "news": self._cmd_news,
+            "topics": self._cmd_topics,
+            "subscribe": self._cmd_subscribe,
+            "status": self._cmd_status,
+            "language": self._cmd_language,
+            "help": self._cmd_help,
+        }
+        
+        # Contextual navigation callbacks dispatched by callback_data
+        self._contextual_handlers = {
+            # Morning/Pre-market features
+            "morning_brief": self._send_morning_brief,
+            "premarket": self._send_premarket_data,
+            "market_open": self._send_market_open_info,
+            "today_events": self._send_today_events,
 
-**📱 Available Commands:**
-• `/news` - Get latest oil & gas market digest
-• `/subscribe` - Enable hourly notifications
-• `/unsubscribe` - Disable notifications  
-• `/status` - Check bot status
-• `/help` - Show this help
+            # Trading hours features
+            "live_feed": self._send_live_feed,
+            "active_alerts": self._send_active_alerts,
+            "top_movers": self._send_top_movers,
+            "breaking_news": self._send_breaking_news,
+            "watchlist": self._send_watchlist,
+            "live_prices": self._send_live_prices,
+            "search": self._send_search_interface,
+            "analysis": self._send_analysis,
 
-**🎯 What You Get:**
-📰 Oil & Gas News
-💰 Live Price Simulation
-📈 Futures Analysis (NEW!)
-🔮 Market Predictions
+            # Evening features
+            "day_summary": self._send_day_summary,
+            "after_hours": self._send_after_hours,
+            "tomorrow_prep": self._send_tomorrow_prep,
+            "evening_brief": self._send_evening_brief,
+            "daily_performance": self._send_daily_performance,
+            "forecasts": self._send_forecasts,
 
-⚠️ **Disclaimer:** AI-generated data for demonstration only'''
-            },
-            'ru': {
-                'welcome_title': '🛢️ Нефтегазовый AI-Бот',
-                'welcome_message': 'Добро пожаловать, {name}! Я ваш помощник по нефтегазовым рынкам на базе ИИ.',
-                'what_i_do': 'Что я предлагаю:',
-                'daily_news': 'Ежечасные обновления нефтегазовых рынков на базе ИИ',
-                'sentiment_analysis': 'Анализ нефтегазовых рынков с помощью ИИ',
-                'predictions': 'Анализ нефтяных фьючерсов и прогнозы рынка',
-                'auto_updates': 'Автоматические ежечасные обновления для тестирования',
-                'commands': 'Команды:',
-                'news_cmd': '/news - Получить последние новости рынка',
-                'notify_cmd': '/notify - Вручную отправить уведомления всем подписчикам (только для админов)',
-                'subscribe_cmd': '/subscribe - Включить ежедневные обновления новостей',
-                'unsubscribe_cmd': '/unsubscribe - Отключить ежедневные обновления',
-                'language_cmd': '/language - Выбрать язык кнопками',
-                'topics_cmd': '/topics - Выбрать интересующие темы',
-                'help_cmd': '/help - Показать все команды',
-                'status_cmd': '/status - Проверить статус бота и рынка',
-                'stats_cmd': '/stats - Просмотреть статистику использования бота',
-                'admin_features': 'Функции администратора:',
-                'first_user_admin': 'Первый пользователь автоматически становится администратором',
-                'fetching_news': '📰 Исследую последние новости рынка...',
-                'no_news': '❌ Не удалось получить новости в данный момент. Попробуйте позже.',
-                'error_fetching': '❌ Произошла ошибка при получении новостей. Попробуйте снова.',
-                'subscribed': '✅ Вы подписались на ежедневные обновления рынка!',
-                'already_subscribed': 'ℹ️ Вы уже подписаны на ежедневные обновления.',
-                'unsubscribed': '✅ Вы отписались от ежедневных обновлений.',
-                'not_subscribed': 'ℹ️ Вы в настоящее время не подписаны.',
-                'language_selection': '🌍 Выбор языка',
-                'current_language': 'Текущий язык',
-                'topic_selection': '🎯 Выбор тем',
-                'current_topics': 'Текущая тема',
-                'topics_updated': '✅ Предпочтения по темам обновлены!',
-                'notification_success': 'Ручное уведомление отправлено успешно!',
-                'no_subscribers': 'Подписчики не найдены.',
-                'error_notification': '❌ Ошибка отправки уведомлений.',
-                'results': 'Результаты',
-                'successfully_sent': 'Успешно отправлено',
-                'failed_to_send': 'Не удалось отправить',
-                'total_subscribers': 'Всего подписчиков',
-                'sent_at': 'Отправлено в',
-                'all_notified': 'Все подписчики уведомлены!',
-                'help_message': '''🤖 **AI-Only Нефтегазовый Бот**
+            # Weekend/Night features
+            "weekend_news": self._send_weekend_news,
+            "weekly_summary": self._send_weekly_summary,
+            "week_forecast": self._send_week_forecast,
+            "trends_overview": self._send_trends_overview,
+            "planning": self._send_planning,
+            "education": self._send_education,
+            "night_mode": self._send_night_mode,
+            "asian_markets": self._send_asian_markets,
 
-🛢️ **Специализация:** Профессиональные данные нефтегазовых рынков
-📊 **Источник:** Контент, генерируемый ИИ для демонстрации
-⏰ **Обновления:** Каждый час во время тестирования
+            # Portfolio and general features
+            "portfolio": self._send_portfolio,
+            "main_menu": self._send_main_menu,
+            "cmd_settings": self._send_settings,
 
-**📱 Доступные команды:**
-• `/news` - Получить последние новости нефтегазовых рынков
-• `/subscribe` - Включить ежечасные уведомления
-• `/unsubscribe` - Отключить уведомления
-• `/status` - Проверить статус бота
-• `/help` - Показать эту справку
+            # 🛢️ Oil & Gas specific features
+            "fuel_boxscore": self._send_fuel_boxscore,
+            "oil_futures": self._send_oil_futures,
+            "border_queues": self._send_border_queues,
+            "nbu_rates": self._send_nbu_rates,
+            "commodity_exchange": self._send_commodity_exchange,
+            "retail_fuel": self._send_retail_fuel,
+            "live_oil_prices": self._send_live_oil_prices,
+            "fuel_chain": self._send_fuel_chain,
+            "refinery_margins": self._send_refinery_margins,
+            "ice_lsgo": self._send_ice_lsgo,
+            "oil_logistics": self._send_oil_logistics,
+            "fx_hedging": self._send_fx_hedging,
+            "oil_technical": self._send_oil_technical,
+            "oil_analysis": self._send_oil_analysis,
+            "oil_breaking": self._send_oil_breaking,
 
-**🎯 Что вы получаете:**
-📰 Новости нефти и газа
-💰 Моделирование живых цен
-📈 Анализ фьючерсов (НОВОЕ!)
-🔮 Прогнозы рынка
+            # 💎 Mining & Metals specific features
+            "metals_today": self._send_metals_today,
+            "mining_news": self._send_mining_news,
+            "steel_iron": self._send_steel_iron,
+            "precious_metals": self._send_precious_metals,
+            "mining_logistics": self._send_mining_logistics,
+            "metal_exchanges": self._send_metal_exchanges,
+            "live_metals": self._send_live_metals,
+            "gold_silver": self._send_gold_silver,
+            "copper_aluminum": self._send_copper_aluminum,
+            "iron_ore": self._send_iron_ore,
+            "steel_scrap": self._send_steel_scrap,
+            "freight_costs": self._send_freight_costs,
+            "metals_hedging": self._send_metals_hedging,
+            "mining_breaking": self._send_mining_breaking,
 
-⚠️ **Отказ от ответственности:** Данные, генерируемые ИИ, только для демонстрации'''
-            }
+            # Common commodity features
+            "commodity_summary": self._send_commodity_summary,
+            "tomorrow_outlook": self._send_tomorrow_outlook,
+            "weekly_commodity": self._send_weekly_commodity,
+            "pnl_analysis": self._send_pnl_analysis,
+            "trading_plan": self._send_trading_plan,
+            "asian_commodities": self._send_asian_commodities,
+            "weekly_overview": self._send_weekly_overview,
+            "commodity_research": self._send_commodity_research,
+            "trading_strategies": self._send_trading_strategies,
         }
         
         # Set up command handlers
@@ -390,7 +912,24 @@ class StockNewsBot:
     def get_text(self, user_id: int, key: str) -> str:
         """Get translated text for user"""
         language = self.db.get_user_language(user_id)
-        return self.translations.get(language, self.translations['ru']).get(key, key)
+        return self.get_language_text(language, key)
+    
+    def get_translations(self, user_id: int) -> dict:
+        """Get the user's whole translation table, for handlers that need several strings"""
+        language = self.db.get_user_language(user_id)
+        return TRANSLATIONS.get(language, TRANSLATIONS['ru'])
+    
+    def _touch_user(self, user):
+        """Store the Telegram user unless they are already stored with the same names"""
+        names = (user.username, user.first_name, user.last_name)
+        if self._known_users.get(user.id) == names:
+            return
+        self.db.add_user(user.id, *names)
+        self._known_users[user.id] = names
+    
+    def get_language_text(self, language: str, key: str) -> str:
+        """Get translated text for a language"""
+        return TRANSLATIONS.get(language, TRANSLATIONS['ru']).get(key, key)
     
     def setup_handlers(self):
         """Set up command handlers"""
@@ -708,21 +1247,30 @@ class StockNewsBot:
     def create_persistent_keyboard(self, user_id: int):
         """Create persistent reply keyboard based on user's sector and time"""
         try:
-            user_topics = self.db.get_user_topics(user_id)
-            user_language = self.db.get_user_language(user_id)
-            
-            import datetime
-            hour = datetime.datetime.now().hour
+            profile = self.db.get_user_profile(user_id)
+            user_topics = profile.topics
+            user_language = profile.language
             
             # Check if user is focused on mining/oil sectors
             is_mining_oil_user = user_topics in ['oil_gas', 'metals_mining']
             
+            cache_key = (user_topics if is_mining_oil_user else None, user_language)
+            keyboard = self._keyboard_cache.get(cache_key)
+            if keyboard is not None:
+                return keyboard
+            
+            import datetime
+            hour = datetime.datetime.now().hour
+            
             if is_mining_oil_user:
                 logger.info(f"Creating commodity keyboard for user {user_id}, topic: {user_topics}")
-                return self.create_commodity_persistent_keyboard(user_id, user_topics, user_language, hour)
+                keyboard = self.create_commodity_persistent_keyboard(user_id, user_topics, user_language, hour)
             else:
                 logger.info(f"Creating general keyboard for user {user_id}")
-                return self.create_general_persistent_keyboard(user_id, user_language, hour)
+                keyboard = self.create_general_persistent_keyboard(user_id, user_language, hour)
+            
+            self._keyboard_cache[cache_key] = keyboard
+            return keyboard
         except Exception as e:
             logger.error(f"Error creating persistent keyboard for user {user_id}: {e}")
             # Fallback to simple keyboard
@@ -798,7 +1346,7 @@ class StockNewsBot:
         """Handle text messages from reply keyboard buttons"""
         user = update.effective_user
         message_text = update.message.text
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        self._touch_user(user)
         
         # Route based on button text
         if message_text in ["📰 Новости", "📰 News"]:
@@ -1106,8 +1654,15 @@ class StockNewsBot:
 
     def create_topics_keyboard(self, user_id: int):
         """Create topics selection keyboard"""
-        current_topics = self.db.get_user_topics(user_id)
-        user_language = self.db.get_user_language(user_id)
+        profile = self.db.get_user_profile(user_id)
+        return self.build_topics_keyboard(profile.language, profile.topics)
+
+    def build_topics_keyboard(self, user_language: str, current_topics: str):
+        """Build (or reuse) the topics keyboard for a language and selected topic"""
+        cache_key = (user_language, current_topics)
+        cached = self._topics_keyboard_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         keyboard = []
         row = []
@@ -1133,17 +1688,13 @@ class StockNewsBot:
         back_text = "🏠 Главное меню" if user_language == 'ru' else "🏠 Main Menu"
         keyboard.append([InlineKeyboardButton(back_text, callback_data="cmd_help")])
         
-        return InlineKeyboardMarkup(keyboard)
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        self._topics_keyboard_cache[cache_key] = reply_markup
+        return reply_markup
 
     def create_language_keyboard(self):
         """Create language selection keyboard"""
-        keyboard = [
-            [
-                InlineKeyboardButton("🇷🇺 Русский", callback_data="lang_ru"),
-                InlineKeyboardButton("🇺🇸 English", callback_data="lang_en")
-            ]
-        ]
-        return InlineKeyboardMarkup(keyboard)
+        return self._language_keyboard
 
     async def setup_bot_menu(self):
         """Remove the bot's command menu since we use persistent keyboards"""
@@ -1161,7 +1712,7 @@ class StockNewsBot:
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        self._touch_user(user)
         
         # Set up bot menu on first use
         if hasattr(self, '_menu_setup_needed') and self._menu_setup_needed:
@@ -1227,7 +1778,7 @@ class StockNewsBot:
         
         await update.message.reply_text(
             message, 
-            parse_mode='Markdown',
+            parse_mode=ParseMode.MARKDOWN,
             reply_markup=reply_markup
         )
     
@@ -1238,7 +1789,7 @@ class StockNewsBot:
     async def news_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /news command - get AI-powered market digest"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        self._touch_user(user)
         
         await update.message.reply_text(self.get_text(user.id, 'fetching_news'))
         
@@ -1251,27 +1802,55 @@ class StockNewsBot:
     
     async def generate_ai_digest(self, user_id: int) -> str:
         """Generate AI-powered market digest based on user's topic preferences"""
+        user_topics = self.db.get_user_topics(user_id)
+        user_language = self.db.get_user_language(user_id)
+        
+        logger.info(f"🎯 Generating AI digest for user {user_id}: topic='{user_topics}', language='{user_language}'")
+        
+        return await self.generate_topic_digest(user_topics, user_language)
+    
+    async def generate_topic_digest(self, topic: str, language: str) -> str:
+        """Generate AI-powered market digest for a topic/language pair"""
         try:
-            user_topics = self.db.get_user_topics(user_id)
-            user_language = self.db.get_user_language(user_id)
-            
-            logger.info(f"🎯 Generating AI digest for user {user_id}: topic='{user_topics}', language='{user_language}'")
-            
             # Get topic-specific news and assets
-            news_items = await self.fetch_ai_news(user_topics, user_language)
-            asset_items = await self.fetch_ai_assets(user_topics, user_language)
+            news_items = await self.fetch_ai_news(topic, language)
+            asset_items = await self.fetch_ai_assets(topic, language)
             
             # Generate unified digest using ChatGPT
-            digest = await self.generate_news_digest(news_items, user_topics, user_language)
+            digest = await self.generate_news_digest(news_items, topic, language)
             
             return digest
             
         except Exception as e:
             logger.error(f"Error generating AI digest: {e}")
-            return self.get_text(user_id, 'error_fetching')
+            return self.get_language_text(language, 'error_fetching')
     
-    async def send_ai_digest_parts(self, user_id: int, chat_id: int):
-        """Send AI-only oil & gas digest with enhanced templates"""
+    async def _rate_limited(self, method, *args, **kwargs):
+        """Call a Bot API method (send, edit) within the bot-wide Telegram rate limit
+        
+        A flood-control response pauses every sender sharing the limiter, then
+        the call is retried once.
+        """
+        try:
+            async with self.telegram_limiter:
+                return await method(*args, **kwargs)
+        except RetryAfter as e:
+            retry_after = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else e.retry_after
+            logger.warning(f"Telegram flood control, pausing sends for {retry_after}s")
+            self.telegram_limiter.pause(retry_after)
+            async with self.telegram_limiter:
+                return await method(*args, **kwargs)
+    
+    async def _send_message(self, **kwargs):
+        """Send a message within the bot-wide Telegram rate limit"""
+        return await self._rate_limited(self.bot.send_message, **kwargs)
+    
+    async def send_ai_digest_parts(self, user_id: int, chat_id: int, stream: bool = True):
+        """Send AI-only oil & gas digest with enhanced templates
+        
+        With stream=True each part is shown as soon as the first tokens arrive
+        and edited in place while the rest of the response streams in.
+        """
         try:
             user_language = self.db.get_user_language(user_id)
             
@@ -1303,33 +1882,35 @@ class StockNewsBot:
 
 Generating current data..."""
             
-            await self.bot.send_message(chat_id=chat_id, text=disclaimer, parse_mode='Markdown')
+            await self._send_message(chat_id=chat_id, text=disclaimer, parse_mode=ParseMode.MARKDOWN)
             await asyncio.sleep(1)
             
             # 🛢️ Generate oil & gas content with AI
-            # 1. Oil & Gas News
-            news_digest = await self.generate_oil_gas_news(user_language)
-            await self.bot.send_message(chat_id=chat_id, text=news_digest, parse_mode='Markdown')
-            await asyncio.sleep(0.5)
-            
-            # 2. Oil & Gas Prices
-            prices_digest = await self.generate_oil_gas_prices(user_language)
-            await self.bot.send_message(chat_id=chat_id, text=prices_digest, parse_mode='Markdown')
-            await asyncio.sleep(0.5)
-            
-            # 3. Oil Futures Analysis
-            futures_digest = await self.generate_oil_futures_analysis(user_language)
-            await self.bot.send_message(chat_id=chat_id, text=futures_digest, parse_mode='Markdown')
-            await asyncio.sleep(0.5)
-            
-            # 4. Oil & Gas Market Analysis & Predictions
-            analysis_digest = await self.generate_oil_gas_analysis(user_language)
-            await self.bot.send_message(chat_id=chat_id, text=analysis_digest, parse_mode='Markdown')
+            generators = [
+                self.generate_oil_gas_news,          # 1. Oil & Gas News
+                self.generate_oil_gas_prices,        # 2. Oil & Gas Prices
+                self.generate_oil_futures_analysis,  # 3. Oil Futures Analysis
+                self.generate_oil_gas_analysis,      # 4. Oil & Gas Market Analysis & Predictions
+            ]
+            for i, generate in enumerate(generators):
+                if i:
+                    await asyncio.sleep(0.5)
+                
+                if stream:
+                    message = StreamingMessage(self.bot, chat_id, self._rate_limited)
+                    digest = await generate(user_language, on_update=message.update)
+                    await message.finish(digest)
+                else:
+                    digest = await generate(user_language)
+                    await self._send_message(chat_id=chat_id, text=digest, parse_mode=ParseMode.MARKDOWN)
             
         except Exception as e:
+            if is_unreachable_chat(e):
+                # Bot blocked or chat gone, let the caller decide what to do with the user
+                raise
             logger.error(f"Error generating AI oil & gas content: {e}")
             error_msg = "❌ Ошибка генерации нефтегазовых данных" if user_language == 'ru' else "❌ Error generating oil & gas data"
-            await self.bot.send_message(chat_id=chat_id, text=error_msg)
+            await self._send_message(chat_id=chat_id, text=error_msg)
     
     async def fetch_real_news(self, topic: str, language: str) -> List[NewsItem]:
         """Fetch topic-specific news using AI research"""
@@ -1725,8 +2306,9 @@ Provide 5-6 educational sections about different asset categories.
 DO NOT include real prices, specific companies, or current market data."""
 
             # Generate asset data using AI
-            client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-            response = await client.chat.completions.create(
+            client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'), max_retries=0)
+            response = await openai_with_retry(
+                client.chat.completions.create,
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are a financial education specialist. Generate ONLY educational content about asset types and market concepts. NEVER provide real prices, specific company data, or current market information. Always include disclaimers. Focus on teaching how different asset classes work and general analysis principles."},
@@ -1863,8 +2445,9 @@ REQUIREMENTS:
 - Maximum 1000 characters"""
             
             # Process with ChatGPT
-            client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-            response = await client.chat.completions.create(
+            client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'), max_retries=0)
+            response = await openai_with_retry(
+                client.chat.completions.create,
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -1946,73 +2529,33 @@ REQUIREMENTS:
 
     
     async def generate_predictions_digest(self, topic: str, language: str) -> str:
-        """Generate market predictions and trends using ChatGPT"""
+        """Generate market predictions and trends using ChatGPT
+        
+        Results are reused for the same (topic, language) for the rest of the day.
+        """
+        now = datetime.now()
+        cache_key = (topic, language, now.date().isoformat())
+        cached = self._predictions_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            import random
             # Create enhanced professional predictions prompt
-            current_time = datetime.now().strftime("%B %d, %Y")
-            if language == 'ru':
-                system_prompt = f"""Ты - ведущий рыночный аналитик. Создай профессиональный прогноз для сектора "{topic}" на {current_time}.
-
-ФОРМАТ:
-🔮 **АНАЛИТИЧЕСКИЙ ПРОГНОЗ**
-*{current_time} | Стратегический обзор*
-
-📊 **ТЕКУЩИЕ ТРЕНДЫ:**
-• **Основной тренд:** направление рынка
-• **Уровни поддержки/сопротивления:** ключевые цифры
-• **Волатильность:** ожидаемые колебания
-
-⚡️ **КАТАЛИЗАТОРЫ:**
-• Ключевые события на горизонте
-• Риски и возможности
-
-🎯 **РЕКОМЕНДАЦИИ:**
-• Краткосрочная стратегия (1-2 недели)
-• Среднесрочный взгляд (1-3 месяца)
-
-💡 *Аналитика основана на текущих рыночных условиях*
-
-ТРЕБОВАНИЯ:
-- Профессиональный тон
-- Конкретные уровни цен (где применимо)
-- Эмодзи для структурирования: 📊⚡️🎯💡🔍📈📉🚀⚠️
-- Максимум 800 символов"""
-            else:
-                system_prompt = f"""You are a leading market analyst. Create a professional forecast for "{topic}" sector on {current_time}.
-
-FORMAT:
-🔮 **ANALYTICAL FORECAST**
-*{current_time} | Strategic Overview*
-
-📊 **CURRENT TRENDS:**
-• **Main trend:** market direction
-• **Support/resistance levels:** key figures
-• **Volatility:** expected fluctuations
-
-⚡️ **CATALYSTS:**
-• Key upcoming events
-• Risks and opportunities
-
-🎯 **RECOMMENDATIONS:**
-• Short-term strategy (1-2 weeks)
-• Medium-term outlook (1-3 months)
-
-💡 *Analysis based on current market conditions*
-
-REQUIREMENTS:
-- Professional tone
-- Specific price levels (where applicable)
-- Emojis for structure: 📊⚡️🎯💡🔍📈📉🚀⚠️
-- Maximum 800 characters"""
+            current_time = now.strftime("%B %d, %Y")
+            system_prompt = PREDICTIONS_SYSTEM_PROMPTS.get(language, PREDICTIONS_SYSTEM_PROMPTS['en']).format(
+                topic=topic, current_time=current_time
+            )
             
             # Process with ChatGPT
-            client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-            response = await client.chat.completions.create(
+            client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'), max_retries=0)
+            response = await openai_with_retry(
+                client.chat.completions.create,
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Generate UNIQUE market predictions and trends for {topic} sector based on current {datetime.now().strftime('%A, %Y-%m-%d')} market conditions. Session #{random.randint(1000,9999)}. Focus on different aspects than previous requests."}
+                    {"role": "user", "content": PREDICTIONS_USER_PROMPT.format(
+                        topic=topic, today=now.strftime('%A, %Y-%m-%d')
+                    )}
                 ],
                 max_tokens=500,  # Increased for detailed professional analysis
                 temperature=0.7  # Higher temperature for more variety
@@ -2020,6 +2563,10 @@ REQUIREMENTS:
             
             digest = response.choices[0].message.content
             logger.info(f"ChatGPT predictions digest generated for language: {language}")
+            
+            # Keep only today's entries
+            self._predictions_cache = {k: v for k, v in self._predictions_cache.items() if k[2] == cache_key[2]}
+            self._predictions_cache[cache_key] = digest
             return digest
             
         except Exception as e:
@@ -2033,11 +2580,10 @@ REQUIREMENTS:
     async def subscribe_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /subscribe command"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        self._touch_user(user)
         
         # Check if already subscribed
-        subscribed_users = self.db.get_subscribed_users()
-        if user.id in subscribed_users:
+        if self.db.is_subscribed(user.id):
             await update.message.reply_text(self.get_text(user.id, 'already_subscribed'))
         else:
             self.db.subscribe_user(user.id)
@@ -2046,11 +2592,10 @@ REQUIREMENTS:
     async def unsubscribe_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /unsubscribe command"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        self._touch_user(user)
         
         # Check if subscribed
-        subscribed_users = self.db.get_subscribed_users()
-        if user.id not in subscribed_users:
+        if not self.db.is_subscribed(user.id):
             await update.message.reply_text(self.get_text(user.id, 'not_subscribed'))
         else:
             self.db.unsubscribe_user(user.id)
@@ -2059,36 +2604,26 @@ REQUIREMENTS:
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        self._touch_user(user)
         
         user_count = self.db.get_user_count()
         subscriber_count = len(self.db.get_subscribed_users())
-        user_language = self.db.get_user_language(user.id)
-        user_topics = self.db.get_user_topics(user.id)
+        profile = self.db.get_user_profile(user.id)
+        user_language = profile.language
+        user_topics = profile.topics
         
         topic_name = self.available_topics[user_topics].get(user_language, self.available_topics[user_topics]['en'])
         language_name = "Русский" if user_language == 'ru' else "English"
         
-        status_message = f"""
-🤖 **Bot Status**
-
-📊 **Statistics:**
-• Total users: {user_count}
-• Active subscribers: {subscriber_count}
-• Uptime: ✅ Online
-
-👤 **Your Settings:**
-• Language: {language_name}
-• Topic: {topic_name}
-• Subscribed: {'✅ Yes' if user.id in self.db.get_subscribed_users() else '❌ No'}
-
-🔧 **System:**
-• AI Research: ✅ Operational
-• Database: ✅ Connected
-• Scheduler: ✅ Running
-        """
+        status_message = BOT_STATUS_TMPL.format(
+            user_count=user_count,
+            subscriber_count=subscriber_count,
+            language_name=language_name,
+            topic_name=topic_name,
+            subscribed='✅ Yes' if profile.subscribed else '❌ No'
+        )
         
-        await update.message.reply_text(status_message, parse_mode='Markdown')
+        await update.message.reply_text(status_message, parse_mode=ParseMode.MARKDOWN)
     
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stats command"""
@@ -2097,7 +2632,7 @@ REQUIREMENTS:
     async def language_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /language command - show language selection"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        self._touch_user(user)
         
         current_lang = self.db.get_user_language(user.id)
         current_lang_name = "Русский" if current_lang == 'ru' else "English"
@@ -2110,64 +2645,34 @@ REQUIREMENTS:
 Выберите язык / Choose language:
         """
         
-        # Create inline keyboard with language options
-        keyboard = [
-            [
-                InlineKeyboardButton("🇷🇺 Русский", callback_data="lang_ru"),
-                InlineKeyboardButton("🇺🇸 English", callback_data="lang_en")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        # Inline keyboard with language options
+        reply_markup = self.create_language_keyboard()
         
         await update.message.reply_text(
             language_message, 
-            parse_mode='Markdown',
+            parse_mode=ParseMode.MARKDOWN,
             reply_markup=reply_markup
         )
     
     async def topics_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /topics command - show topic selection"""
-        user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
-        
-        # Get current topics
-        current_topics = self.db.get_user_topics(user.id)
-        
-        # Create topic selection keyboard
-        keyboard = []
-        row = []
-        
-        for topic_key, topic_names in self.available_topics.items():
-            topic_name = topic_names.get(self.db.get_user_language(user.id), topic_names['en'])
-            callback_data = f"topic_{topic_key}"
-            
-            # Mark current selection
-            if topic_key == current_topics:
-                topic_name = f"✅ {topic_name}"
-            
-            row.append(InlineKeyboardButton(topic_name, callback_data=callback_data))
-            
-            if len(row) == 2:  # 2 buttons per row
-                keyboard.append(row)
-                row = []
-        
-        if row:  # Add remaining buttons
-            keyboard.append(row)
+        user = update.effective_user
+        self._touch_user(user)
         
-        # Add back to menu button
-        user_language = self.db.get_user_language(user.id)
-        back_text = "🏠 Главное меню" if user_language == 'ru' else "🏠 Main Menu"
-        keyboard.append([InlineKeyboardButton(back_text, callback_data="cmd_help")])
+        # Get current topics and language
+        profile = self.db.get_user_profile(user.id)
+        current_topics = profile.topics
+        user_language = profile.language
         
         # Add current topics info
-        current_topic_name = self.available_topics[current_topics][self.db.get_user_language(user.id)]
+        current_topic_name = self.available_topics[current_topics][user_language]
         
         message_text = (
-            f"{self.get_text(user.id, 'topic_selection')}\n\n"
-            f"{self.get_text(user.id, 'current_topics')}: {current_topic_name}"
+            f"{self.get_language_text(user_language, 'topic_selection')}\n\n"
+            f"{self.get_language_text(user_language, 'current_topics')}: {current_topic_name}"
         )
         
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = self.build_topics_keyboard(user_language, current_topics)
         await update.message.reply_text(message_text, reply_markup=reply_markup)
     
     async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -2176,11 +2681,11 @@ REQUIREMENTS:
         await query.answer()
         
         user = query.from_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        self._touch_user(user)
         
         # Handle command buttons from main menu
         if query.data.startswith("cmd_"):
-            await self._handle_command_callback(query, update)
+            await self._handle_command_callback(query)
         # Check if it's a language selection
         elif query.data.startswith("lang_"):
             await self._handle_language_selection(query)
@@ -2191,236 +2696,96 @@ REQUIREMENTS:
         else:
             await self._handle_contextual_callback(query, user.id, query.data)
     
-    async def _handle_command_callback(self, query, update):
+    async def _handle_command_callback(self, query):
         """Handle command button callbacks from main menu"""
         command = query.data.replace("cmd_", "")
         user_id = query.from_user.id
-        user_language = self.db.get_user_language(user_id)
-        
-        # Create a mock update for the command handlers
-        from telegram import Message
-        mock_message = query.message
-        mock_update = update
-        mock_update.message = mock_message
+        profile = self.db.get_user_profile(user_id)
         
         # Route to appropriate command handler
-        if command == "news":
-            await query.edit_message_text("📰 Получаю последние новости..." if user_language == 'ru' else "📰 Fetching latest news...")
-            # Send news to chat
-            await self.send_ai_digest_parts(user_id, query.message.chat_id)
-            
-        elif command == "topics":
-            # Create topics keyboard
-            topics_keyboard = self.create_topics_keyboard(user_id)
-            topics_text = self.get_text(user_id, 'topics_selection')
-            await query.edit_message_text(topics_text, reply_markup=topics_keyboard, parse_mode='Markdown')
-            
-        elif command == "subscribe":
-            current_status = self.db.is_subscribed(user_id)
-            if current_status:
-                self.db.unsubscribe_user(user_id)
-                message = "🔕 Автоматические уведомления отключены" if user_language == 'ru' else "🔕 Automatic notifications disabled"
-            else:
-                self.db.subscribe_user(user_id)
-                message = "🔔 Автоматические уведомления включены" if user_language == 'ru' else "🔔 Automatic notifications enabled"
-            
-            # Show main menu again
-            reply_markup = self.create_main_menu_keyboard(user_id)
-            await query.edit_message_text(message, reply_markup=reply_markup)
-            
-        elif command == "status":
-            subscription_status = "✅ Подписан" if self.db.is_subscribed(user_id) else "❌ Не подписан"
-            subscription_status_en = "✅ Subscribed" if self.db.is_subscribed(user_id) else "❌ Not subscribed"
-            
-            user_topics = self.db.get_user_topics(user_id) or "all"
-            
-            if user_language == 'ru':
-                status_message = f"""📊 **Ваш статус:**
-
-🔔 **Уведомления:** {subscription_status}
-🎯 **Темы:** {user_topics}
-🌐 **Язык:** {"🇷🇺 Русский" if user_language == 'ru' else "🇺🇸 English"}
-👤 **ID:** {user_id}"""
-            else:
-                status_message = f"""📊 **Your Status:**
-
-🔔 **Notifications:** {subscription_status_en}
-🎯 **Topics:** {user_topics}
-🌐 **Language:** {"🇷🇺 Russian" if user_language == 'ru' else "🇺🇸 English"}
-👤 **ID:** {user_id}"""
-            
-            reply_markup = self.create_main_menu_keyboard(user_id)
-            await query.edit_message_text(status_message, reply_markup=reply_markup, parse_mode='Markdown')
-            
-        elif command == "language":
-            # Create language keyboard
-            language_keyboard = self.create_language_keyboard()
-            language_text = "🌐 Выберите язык / Choose language:"
-            await query.edit_message_text(language_text, reply_markup=language_keyboard)
-            
-        elif command == "help":
-            help_text = self.get_text(user_id, 'help_message')
-            reply_markup = self.create_main_menu_keyboard(user_id)
-            await query.edit_message_text(help_text, reply_markup=reply_markup, parse_mode='Markdown')
+        handler = self._command_handlers.get(command)
+        if handler:
+            await handler(query, user_id, profile)
             
         # Handle new contextual navigation callbacks
         else:
             await self._handle_contextual_callback(query, user_id, query.data)
     
+    async def _send_digest_with_loading(self, query, user_id: int, loading_text: str):
+        """Show a loading note on the pressed message while the digest is generated"""
+        # The edit doesn't need to land before generation starts, and a failed edit
+        # (message too old or unchanged, flood control) must not abandon the digest
+        edit_result, digest_result = await asyncio.gather(
+            query.edit_message_text(loading_text),
+            self.send_ai_digest_parts(user_id, query.message.chat_id),
+            return_exceptions=True,
+        )
+        if isinstance(edit_result, Exception):
+            logger.warning(f"Could not show loading note for user {user_id}: {edit_result}")
+        if isinstance(digest_result, BaseException):
+            raise digest_result
+    
+    async def _cmd_news(self, query, user_id: int, profile: UserProfile):
+        """Main menu: fetch latest news"""
+        user_language = profile.language
+        await self._send_digest_with_loading(query, user_id, "📰 Получаю последние новости..." if user_language == 'ru' else "📰 Fetching latest news...")
+    
+    async def _cmd_topics(self, query, user_id: int, profile: UserProfile):
+        """Main menu: topic selection"""
+        # Create topics keyboard
+        topics_keyboard = self.build_topics_keyboard(profile.language, profile.topics)
+        topics_text = self.get_language_text(profile.language, 'topics_selection')
+        await query.edit_message_text(topics_text, reply_markup=topics_keyboard, parse_mode=ParseMode.MARKDOWN)
+    
+    async def _cmd_subscribe(self, query, user_id: int, profile: UserProfile):
+        """Main menu: toggle subscription"""
+        user_language = profile.language
+        if profile.subscribed:
+            self.db.unsubscribe_user(user_id)
+            message = "🔕 Автоматические уведомления отключены" if user_language == 'ru' else "🔕 Automatic notifications disabled"
+        else:
+            self.db.subscribe_user(user_id)
+            message = "🔔 Автоматические уведомления включены" if user_language == 'ru' else "🔔 Automatic notifications enabled"
+        
+        # Show main menu again
+        reply_markup = self.create_main_menu_keyboard(user_id)
+        await query.edit_message_text(message, reply_markup=reply_markup)
+    
+    async def _cmd_status(self, query, user_id: int, profile: UserProfile):
+        """Main menu: user status"""
+        user_language = profile.language if profile.language in STATUS_TMPL else 'en'
+        template, subscribed_text, not_subscribed_text = STATUS_TMPL[user_language]
+        
+        status_message = template.format(
+            sub=subscribed_text if profile.subscribed else not_subscribed_text,
+            topics=profile.topics or "all",
+            uid=user_id
+        )
+        
+        reply_markup = self.create_main_menu_keyboard(user_id)
+        await query.edit_message_text(status_message, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
+    
+    async def _cmd_language(self, query, user_id: int, profile: UserProfile):
+        """Main menu: language selection"""
+        # Create language keyboard
+        language_keyboard = self.create_language_keyboard()
+        language_text = "🌐 Выберите язык / Choose language:"
+        await query.edit_message_text(language_text, reply_markup=language_keyboard)
+    
+    async def _cmd_help(self, query, user_id: int, profile: UserProfile):
+        """Main menu: help"""
+        help_text = self.get_language_text(profile.language, 'help_message')
+        reply_markup = self.create_main_menu_keyboard(user_id)
+        await query.edit_message_text(help_text, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
+    
     async def _handle_contextual_callback(self, query, user_id: int, callback_data: str):
         """Handle contextual navigation button callbacks"""
         user_language = self.db.get_user_language(user_id)
         
         try:
-            # Morning/Pre-market features
-            if callback_data == "morning_brief":
-                await self._send_morning_brief(query, user_id)
-            elif callback_data == "premarket":
-                await self._send_premarket_data(query, user_id)
-            elif callback_data == "market_open":
-                await self._send_market_open_info(query, user_id)
-            elif callback_data == "today_events":
-                await self._send_today_events(query, user_id)
-                
-            # Trading hours features
-            elif callback_data == "live_feed":
-                await self._send_live_feed(query, user_id)
-            elif callback_data == "active_alerts":
-                await self._send_active_alerts(query, user_id)
-            elif callback_data == "top_movers":
-                await self._send_top_movers(query, user_id)
-            elif callback_data == "breaking_news":
-                await self._send_breaking_news(query, user_id)
-            elif callback_data == "watchlist":
-                await self._send_watchlist(query, user_id)
-            elif callback_data == "live_prices":
-                await self._send_live_prices(query, user_id)
-            elif callback_data == "search":
-                await self._send_search_interface(query, user_id)
-            elif callback_data == "analysis":
-                await self._send_analysis(query, user_id)
-                
-            # Evening features
-            elif callback_data == "day_summary":
-                await self._send_day_summary(query, user_id)
-            elif callback_data == "after_hours":
-                await self._send_after_hours(query, user_id)
-            elif callback_data == "tomorrow_prep":
-                await self._send_tomorrow_prep(query, user_id)
-            elif callback_data == "evening_brief":
-                await self._send_evening_brief(query, user_id)
-            elif callback_data == "daily_performance":
-                await self._send_daily_performance(query, user_id)
-            elif callback_data == "forecasts":
-                await self._send_forecasts(query, user_id)
-                
-            # Weekend/Night features
-            elif callback_data == "weekend_news":
-                await self._send_weekend_news(query, user_id)
-            elif callback_data == "weekly_summary":
-                await self._send_weekly_summary(query, user_id)
-            elif callback_data == "week_forecast":
-                await self._send_week_forecast(query, user_id)
-            elif callback_data == "trends_overview":
-                await self._send_trends_overview(query, user_id)
-            elif callback_data == "planning":
-                await self._send_planning(query, user_id)
-            elif callback_data == "education":
-                await self._send_education(query, user_id)
-            elif callback_data == "night_mode":
-                await self._send_night_mode(query, user_id)
-            elif callback_data == "asian_markets":
-                await self._send_asian_markets(query, user_id)
-                
-            # Portfolio and general features
-            elif callback_data == "portfolio":
-                await self._send_portfolio(query, user_id)
-            elif callback_data == "main_menu":
-                await self._send_main_menu(query, user_id)
-            elif callback_data == "cmd_settings":
-                await self._send_settings(query, user_id)
-                
-            # 🛢️ Oil & Gas specific features
-            elif callback_data == "fuel_boxscore":
-                await self._send_fuel_boxscore(query, user_id)
-            elif callback_data == "oil_futures":
-                await self._send_oil_futures(query, user_id)
-            elif callback_data == "border_queues":
-                await self._send_border_queues(query, user_id)
-            elif callback_data == "nbu_rates":
-                await self._send_nbu_rates(query, user_id)
-            elif callback_data == "commodity_exchange":
-                await self._send_commodity_exchange(query, user_id)
-            elif callback_data == "retail_fuel":
-                await self._send_retail_fuel(query, user_id)
-            elif callback_data == "live_oil_prices":
-                await self._send_live_oil_prices(query, user_id)
-            elif callback_data == "fuel_chain":
-                await self._send_fuel_chain(query, user_id)
-            elif callback_data == "refinery_margins":
-                await self._send_refinery_margins(query, user_id)
-            elif callback_data == "ice_lsgo":
-                await self._send_ice_lsgo(query, user_id)
-            elif callback_data == "oil_logistics":
-                await self._send_oil_logistics(query, user_id)
-            elif callback_data == "fx_hedging":
-                await self._send_fx_hedging(query, user_id)
-            elif callback_data == "oil_technical":
-                await self._send_oil_technical(query, user_id)
-            elif callback_data == "oil_analysis":
-                await self._send_oil_analysis(query, user_id)
-            elif callback_data == "oil_breaking":
-                await self._send_oil_breaking(query, user_id)
-                
-            # 💎 Mining & Metals specific features
-            elif callback_data == "metals_today":
-                await self._send_metals_today(query, user_id)
-            elif callback_data == "mining_news":
-                await self._send_mining_news(query, user_id)
-            elif callback_data == "steel_iron":
-                await self._send_steel_iron(query, user_id)
-            elif callback_data == "precious_metals":
-                await self._send_precious_metals(query, user_id)
-            elif callback_data == "mining_logistics":
-                await self._send_mining_logistics(query, user_id)
-            elif callback_data == "metal_exchanges":
-                await self._send_metal_exchanges(query, user_id)
-            elif callback_data == "live_metals":
-                await self._send_live_metals(query, user_id)
-            elif callback_data == "gold_silver":
-                await self._send_gold_silver(query, user_id)
-            elif callback_data == "copper_aluminum":
-                await self._send_copper_aluminum(query, user_id)
-            elif callback_data == "iron_ore":
-                await self._send_iron_ore(query, user_id)
-            elif callback_data == "steel_scrap":
-                await self._send_steel_scrap(query, user_id)
-            elif callback_data == "freight_costs":
-                await self._send_freight_costs(query, user_id)
-            elif callback_data == "metals_hedging":
-                await self._send_metals_hedging(query, user_id)
-            elif callback_data == "mining_breaking":
-                await self._send_mining_breaking(query, user_id)
-                
-            # Common commodity features
-            elif callback_data == "commodity_summary":
-                await self._send_commodity_summary(query, user_id)
-            elif callback_data == "tomorrow_outlook":
-                await self._send_tomorrow_outlook(query, user_id)
-            elif callback_data == "weekly_commodity":
-                await self._send_weekly_commodity(query, user_id)
-            elif callback_data == "pnl_analysis":
-                await self._send_pnl_analysis(query, user_id)
-            elif callback_data == "trading_plan":
-                await self._send_trading_plan(query, user_id)
-            elif callback_data == "asian_commodities":
-                await self._send_asian_commodities(query, user_id)
-            elif callback_data == "weekly_overview":
-                await self._send_weekly_overview(query, user_id)
-            elif callback_data == "commodity_research":
-                await self._send_commodity_research(query, user_id)
-            elif callback_data == "trading_strategies":
-                await self._send_trading_strategies(query, user_id)
+            handler = self._contextual_handlers.get(callback_data)
+            if handler:
+                await handler(query, user_id)
                 
             # Unknown callback
             else:
@@ -2438,95 +2803,36 @@ REQUIREMENTS:
     async def _send_morning_brief(self, query, user_id: int):
         """Send morning market brief"""
         user_language = self.db.get_user_language(user_id)
-        await query.edit_message_text("☕ Подготавливаю утренний обзор..." if user_language == 'ru' else "☕ Preparing morning brief...")
-        await self.send_ai_digest_parts(user_id, query.message.chat_id)
+        await self._send_digest_with_loading(query, user_id, "☕ Подготавливаю утренний обзор..." if user_language == 'ru' else "☕ Preparing morning brief...")
         
     async def _send_premarket_data(self, query, user_id: int):
         """Send pre-market data"""
         user_language = self.db.get_user_language(user_id)
         
-        message = """📊 **ПРЕМАРКЕТ**
-*Данные до открытия торгов*
-
-🇺🇸 **US Futures:**
-• S&P 500: +0.2% 📈
-• Nasdaq: +0.1% 📈  
-• Dow Jones: +0.3% 📈
-
-🌍 **Global Markets:**
-• FTSE 100: +0.4% 📈
-• DAX: +0.1% 📈
-• Nikkei: -0.2% 📉
-
-⏰ **До открытия:** 2ч 30мин
-🔄 **Обновлено:** каждые 5 минут""" if user_language == 'ru' else """📊 **PRE-MARKET**
-*Data before market open*
-
-🇺🇸 **US Futures:**
-• S&P 500: +0.2% 📈
-• Nasdaq: +0.1% 📈  
-• Dow Jones: +0.3% 📈
-
-🌍 **Global Markets:**
-• FTSE 100: +0.4% 📈
-• DAX: +0.1% 📈
-• Nikkei: -0.2% 📉
-
-⏰ **Until open:** 2h 30min
-🔄 **Updated:** every 5 minutes"""
+        message = PREMARKET_MSG.get(user_language, PREMARKET_MSG['en'])
 
         reply_markup = self.create_main_menu_keyboard(user_id)
-        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
         
     async def _send_market_open_info(self, query, user_id: int):
         """Send market opening information"""
         user_language = self.db.get_user_language(user_id)
-        await query.edit_message_text("🌅 Получаю данные об открытии рынков..." if user_language == 'ru' else "🌅 Getting market opening data...")
-        await self.send_ai_digest_parts(user_id, query.message.chat_id)
+        await self._send_digest_with_loading(query, user_id, "🌅 Получаю данные об открытии рынков..." if user_language == 'ru' else "🌅 Getting market opening data...")
         
     async def _send_today_events(self, query, user_id: int):
         """Send today's events"""
         user_language = self.db.get_user_language(user_id)
         
-        message = """📅 **СОБЫТИЯ ДНЯ**
-*Ключевые события сегодня*
-
-🕘 **09:00** - Данные по инфляции ЕС
-🕘 **14:30** - Отчет по занятости США
-🕘 **16:00** - Решение ФРС по ставкам
-
-🏢 **Отчетность:**
-• Apple - до открытия
-• Tesla - после закрытия
-• Microsoft - завтра
-
-⚠️ **Важно:**
-• Волатильность ожидается высокая
-• Следите за объемами торгов""" if user_language == 'ru' else """📅 **TODAY'S EVENTS**
-*Key events today*
-
-🕘 **09:00** - EU Inflation Data
-🕘 **14:30** - US Employment Report
-🕘 **16:00** - Fed Rate Decision
-
-🏢 **Earnings:**
-• Apple - before open
-• Tesla - after close
-• Microsoft - tomorrow
-
-⚠️ **Important:**
-• High volatility expected
-• Watch trading volumes"""
+        message = TODAY_EVENTS_MSG.get(user_language, TODAY_EVENTS_MSG['en'])
 
         reply_markup = self.create_main_menu_keyboard(user_id)
-        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
 
     # More contextual handlers - implementing core ones first
     async def _send_live_feed(self, query, user_id: int):
         """Send live news feed"""
         user_language = self.db.get_user_language(user_id)
-        await query.edit_message_text("⚡ Загружаю живую ленту..." if user_language == 'ru' else "⚡ Loading live feed...")
-        await self.send_ai_digest_parts(user_id, query.message.chat_id)
+        await self._send_digest_with_loading(query, user_id, "⚡ Загружаю живую ленту..." if user_language == 'ru' else "⚡ Loading live feed...")
 
     async def _send_main_menu(self, query, user_id: int):
         """Return to main menu"""
@@ -2646,7 +2952,7 @@ Platts: $89.15/bbl
 ⚠️ **Risks:** USD/UAH volatility"""
 
         reply_markup = self.create_main_menu_keyboard(user_id)
-        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
 
     async def _send_border_queues(self, query, user_id: int):
         """Send border crossing queue information"""
@@ -2700,7 +3006,7 @@ Platts: $89.15/bbl
 🟢 = up to 3h | 🟡 = 3-8h | 🔴 = over 8h"""
 
         reply_markup = self.create_main_menu_keyboard(user_id)
-        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
 
     async def _send_nbu_rates(self, query, user_id: int):
         """Send NBU exchange rates"""
@@ -2754,7 +3060,7 @@ Platts: $89.15/bbl
 📱 **Source:** bank.gov.ua"""
 
         reply_markup = self.create_main_menu_keyboard(user_id)
-        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
 
     async def _send_ice_lsgo(self, query, user_id: int):
         """Send ICE Low Sulphur Gasoil futures data"""
@@ -2822,7 +3128,7 @@ JUN25: $879.80 ↗️ +0.69%
 ⏰ **Updated:** real-time"""
 
         reply_markup = self.create_main_menu_keyboard(user_id)
-        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
 
     # Placeholder implementations for other commodity features
     async def _send_oil_futures(self, query, user_id: int): await self._feature_under_development(query, user_id)
@@ -2936,7 +3242,7 @@ Platts: $89.15/bbl
 📈 **Trend:** Upward (+2.1% weekly)
 ⚠️ **Risks:** USD/UAH volatility"""
 
-        await update.message.reply_text(message, reply_markup=keyboard, parse_mode='Markdown')
+        await update.message.reply_text(message, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
 
     async def _send_border_queues_text(self, update, user_id: int):
         """Send border queues via text message"""
@@ -2990,7 +3296,7 @@ Platts: $89.15/bbl
 
 🟢 = up to 3h | 🟡 = 3-8h | 🔴 = over 8h"""
 
-        await update.message.reply_text(message, reply_markup=keyboard, parse_mode='Markdown')
+        await update.message.reply_text(message, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
 
     async def _send_nbu_rates_text(self, update, user_id: int):
         """Send NBU rates via text message"""
@@ -3044,7 +3350,7 @@ Platts: $89.15/bbl
 ⏰ **Updated:** today, 11:00 AM
 📱 **Source:** bank.gov.ua"""
 
-        await update.message.reply_text(message, reply_markup=keyboard, parse_mode='Markdown')
+        await update.message.reply_text(message, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
 
     async def _send_ice_lsgo_text(self, update, user_id: int):
         """Send ICE LSGO via text message"""
@@ -3112,7 +3418,7 @@ JUN25: $879.80 ↗️ +0.69%
 📱 **Data:** ICE Futures Europe
 ⏰ **Updated:** real-time"""
 
-        await update.message.reply_text(message, reply_markup=keyboard, parse_mode='Markdown')
+        await update.message.reply_text(message, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
 
     # Placeholder text handlers for mining
     async def _send_oil_futures_text(self, update, user_id: int): 
@@ -3145,20 +3451,10 @@ JUN25: $879.80 ↗️ +0.69%
     async def _feature_under_development(self, query, user_id: int):
         """Show feature under development message"""
         user_language = self.db.get_user_language(user_id)
-        message = """🚧 **Функция в разработке**
-
-⚡ Эта функция скоро будет доступна!
-📈 Мы работаем над улучшением вашего опыта
-
-🔄 Попробуйте другие функции из меню""" if user_language == 'ru' else """🚧 **Feature Under Development**
-
-⚡ This feature will be available soon!
-📈 We're working to improve your experience
-
-🔄 Try other features from the menu"""
+        message = UNDER_DEV_MSG.get(user_language, UNDER_DEV_MSG['en'])
 
         reply_markup = self.create_main_menu_keyboard(user_id)
-        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
     
     async def _handle_language_selection(self, query):
         """Handle language selection from inline buttons"""
@@ -3198,7 +3494,7 @@ JUN25: $879.80 ↗️ +0.69%
         
         # Show main menu with new language
         reply_markup = self.create_main_menu_keyboard(user.id)
-        await query.edit_message_text(confirmation, reply_markup=reply_markup, parse_mode='Markdown')
+        await query.edit_message_text(confirmation, reply_markup=reply_markup, parse_mode=ParseMode.MARKDOWN)
     
     async def _handle_topic_selection(self, query):
         """Handle topic selection callbacks"""
@@ -3214,32 +3510,7 @@ JUN25: $879.80 ↗️ +0.69%
             topic_name = self.available_topics[topic_key].get(user_language, self.available_topics[topic_key]['en'])
             
             # Update the message to show selection
-            keyboard = []
-            row = []
-            
-            for t_key, t_names in self.available_topics.items():
-                t_name = t_names.get(user_language, t_names['en'])
-                callback_data = f"topic_{t_key}"
-                
-                # Mark current selection
-                if t_key == topic_key:
-                    t_name = f"✅ {t_name}"
-                
-                row.append(InlineKeyboardButton(t_name, callback_data=callback_data))
-                
-                if len(row) == 2:
-                    keyboard.append(row)
-                    row = []
-            
-            if row:
-                keyboard.append(row)
-            
-            # Add back to menu button
-            user_language = self.db.get_user_language(user_id)
-            back_text = "🏠 Главное меню" if user_language == 'ru' else "🏠 Main Menu"
-            keyboard.append([InlineKeyboardButton(back_text, callback_data="cmd_help")])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = self.build_topics_keyboard(user_language, topic_key)
             
             await query.edit_message_text(
                 f"{self.get_text(user_id, 'topics_updated')}\n\n"
@@ -3250,7 +3521,7 @@ JUN25: $879.80 ↗️ +0.69%
     async def notify_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /notify command - manually trigger notification to all subscribers"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        self._touch_user(user)
         
         # Check if user is admin
         if not self.is_admin(user.id):
@@ -3261,63 +3532,95 @@ JUN25: $879.80 ↗️ +0.69%
             )
             return
         
-        await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
+        # Coalesce repeated triggers instead of doubling the outbound rate; no await between
+        # the check and taking the lock, so a scheduled batch cannot slip in and run first
+        if self._broadcast_lock.locked():
+            await self._reply_broadcast_in_progress(update)
+            return
         
-        try:
-            # Get all subscribed users
-            subscribers = self.db.get_subscribed_users()
-            
-            if not subscribers:
-                await update.message.reply_text(self.get_text(user.id, 'no_subscribers'))
-                return
-            
-            # Send notification to all subscribers
-            successful_sends = 0
-            failed_sends = 0
-            
-            for user_id in subscribers:
-                try:
-                    # Generate personalized digest for each user
-                    digest = await self.generate_ai_digest(user_id)
-                    await self.bot.send_message(
-                        chat_id=user_id, 
-                        text=f"🔔 **{self.get_text(user_id, 'notification_success')}**\n\n{digest}", 
-                        parse_mode='Markdown'
-                    )
-                    successful_sends += 1
-                    
-                    # Rate limiting - Telegram allows ~30 messages per second
-                    await asyncio.sleep(0.05)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to send manual notification to user {user_id}: {e}")
-                    failed_sends += 1
+        async with self._broadcast_lock:
+            try:
+                await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
+                
+                # Group subscribers by (language, topic) so each distinct digest is generated once
+                groups = self.db.get_subscriber_groups()
+                total_subscribers = sum(len(user_ids) for user_ids in groups.values())
+                
+                if not total_subscribers:
+                    await update.message.reply_text(self.get_text(user.id, 'no_subscribers'))
+                    return
+                self._broadcast_progress = {'sent': 0, 'failed': 0, 'total': total_subscribers}
+                
+                # Send notification to all subscribers
+                successful_sends = 0
+                failed_sends = 0
+                
+                # Generate the distinct digests concurrently rather than one after another
+                digests = await asyncio.gather(*(
+                    self.generate_topic_digest(topic, language) for language, topic in groups
+                ))
+                
+                for ((language, topic), user_ids), digest in zip(groups.items(), digests):
+                    text = f"🔔 **{self.get_language_text(language, 'notification_success')}**\n\n{digest}"
                     
-                    # If user blocked bot, unsubscribe them
-                    if "bot was blocked" in str(e).lower():
-                        self.db.unsubscribe_user(user_id)
-            
-            # Send confirmation to the user who triggered the notification
-            confirmation = f"""
-✅ **{self.get_text(user.id, 'notification_success')}**
-
-📊 **{self.get_text(user.id, 'results')}:**
-• {self.get_text(user.id, 'successfully_sent')}: {successful_sends} users
-• {self.get_text(user.id, 'failed_to_send')}: {failed_sends} users
-• {self.get_text(user.id, 'total_subscribers')}: {len(subscribers)} users
-
-⏰ **{self.get_text(user.id, 'sent_at')}:** {datetime.now().strftime('%B %d, %Y at %H:%M:%S')} EST
-
-🔔 {self.get_text(user.id, 'all_notified')}
-            """
-            
-            await update.message.reply_text(confirmation, parse_mode='Markdown')
-            
-            logger.info(f"Manual notification triggered by user {user.id} - sent to {successful_sends} users, {failed_sends} failed")
+                    # Fan out concurrently; the shared limiter keeps us under Telegram's rate limit
+                    results = await asyncio.gather(*(self._send_manual_notification(user_id, text) for user_id in user_ids))
+                    successful_sends += sum(results)
+                    failed_sends += len(results) - sum(results)
+                    self._broadcast_progress.update(sent=successful_sends, failed=failed_sends)
+                
+                # Send confirmation to the user who triggered the notification
+                t = self.get_translations(user.id)
+                confirmation = NOTIFY_CONFIRMATION_TMPL.format(
+                    **t,
+                    sent=successful_sends,
+                    failed=failed_sends,
+                    total=total_subscribers,
+                    timestamp=datetime.now().strftime('%B %d, %Y at %H:%M:%S'),
+                )
+                
+                await update.message.reply_text(confirmation, parse_mode=ParseMode.MARKDOWN)
+                
+                logger.info(f"Manual notification triggered by user {user.id} - sent to {successful_sends} users, {failed_sends} failed")
+                
+            except Exception as e:
+                logger.error(f"Error sending manual notification: {e}")
+                await update.message.reply_text(self.get_text(user.id, 'error_notification'))
+            finally:
+                self._flush_unreachable_chats()
+    
+    def _flush_unreachable_chats(self):
+        """Unsubscribe every chat the current broadcast could not reach"""
+        if self._unreachable_chats:
+            self.db.unsubscribe_users(self._unreachable_chats)
+            logger.info(f"🚫 Unsubscribed {len(self._unreachable_chats)} unreachable users")
+            self._unreachable_chats = []
+    
+    async def _reply_broadcast_in_progress(self, update: Update):
+        """Tell an admin that a broadcast is already running and how far it got"""
+        progress = self._broadcast_progress
+        await update.message.reply_text(
+            f"⚠️ Notification already in progress: {progress['sent']} sent, "
+            f"{progress['failed']} failed of {progress['total']} subscribers"
+        )
+    
+    async def _send_manual_notification(self, user_id: int, text: str) -> bool:
+        """Send one manual notification, returning whether it was delivered"""
+        try:
+            await self._send_message(
+                chat_id=user_id, 
+                text=text, 
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return True
             
         except Exception as e:
-            logger.error(f"Error sending manual notification: {e}")
-            await update.message.reply_text(self.get_text(user.id, 'error_notification'))
+            logger.error(f"Failed to send manual notification to user {user_id}: {e}")
+            
+            # If user blocked bot or the chat is gone, unsubscribe them once the broadcast ends
+            if is_unreachable_chat(e):
+                self._unreachable_chats.append(user_id)
+            return False
     
     async def add_admin_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /addadmin command - add a new admin user"""
@@ -3345,7 +3648,7 @@ JUN25: $879.80 ↗️ +0.69%
     async def make_admin_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /makeadmin command - make yourself admin (if first user)"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        self._touch_user(user)
         
         # Check if user is already admin
         if self.db.is_admin(user.id):
@@ -3384,7 +3687,9 @@ JUN25: $879.80 ↗️ +0.69%
         
         try:
             logger.info(f"Admin {user_id} testing notifications to all users")
-            await self.send_daily_notifications()
+            if not await self.send_daily_notifications():
+                await self._reply_broadcast_in_progress(update)
+                return
             await update.message.reply_text("✅ Test notifications sent to all users!")
         except Exception as e:
             logger.error(f"Error in test notifications: {e}")
@@ -3399,21 +3704,20 @@ JUN25: $879.80 ↗️ +0.69%
             return
         
         try:
-            import schedule
-            jobs = schedule.jobs
+            jobs = sorted(self._jobs, key=lambda job: job.next_run)
             
             if not jobs:
                 status_msg = "❌ **No scheduled jobs found!**\n\nScheduler may not be running properly."
             else:
                 status_msg = f"📅 **Scheduled Jobs ({len(jobs)} active):**\n\n"
                 for i, job in enumerate(jobs, 1):
-                    next_run = job.next_run.strftime('%Y-%m-%d %H:%M:%S') if job.next_run else "Not scheduled"
-                    job_type = "Startup Test" if hasattr(job, 'tags') and 'startup_test' in job.tags else "Regular Notifications"
-                    interval = f"{job.interval} {job.unit}" if job.interval != 1 else job.unit
-                    status_msg += f"{i}. **{job_type}**\n"
-                    status_msg += f"   ⏰ Next run: {next_run}\n"
-                    status_msg += f"   🔄 Frequency: Every {interval}\n"
-                    status_msg += f"   🏷️ Tags: {getattr(job, 'tags', 'None')}\n\n"
+                    frequency = f"Every {job.interval}" if job.interval else "Once"
+                    status_msg += f"{i}. **{job.name}**\n"
+                    status_msg += f"   ⏰ Next run: {job.next_run.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    status_msg += f"   🔄 Frequency: {frequency}\n\n"
+                
+                running = self._scheduler_task is not None and not self._scheduler_task.done()
+                status_msg += f"⚙️ **Scheduler task:** {'running' if running else 'stopped'}\n"
                 
                 # Add current time info
                 from datetime import datetime
@@ -3421,48 +3725,66 @@ JUN25: $879.80 ↗️ +0.69%
                 status_msg += f"🕒 **Current time:** {now.strftime('%Y-%m-%d %H:%M:%S')}\n"
                 status_msg += f"📍 **Server timezone:** {now.astimezone().tzinfo}\n"
             
-            await update.message.reply_text(status_msg, parse_mode='Markdown')
+            await update.message.reply_text(status_msg, parse_mode=ParseMode.MARKDOWN)
             
         except Exception as e:
             logger.error(f"Error checking schedule status: {e}")
             await update.message.reply_text(f"❌ Error checking schedule: {e}")
     
-    async def send_daily_notifications(self):
-        """Send daily AI-powered notifications to all subscribers"""
+    async def send_daily_notifications(self) -> bool:
+        """Send daily AI-powered notifications to all subscribers
+        
+        Returns False without sending anything if another broadcast is still running.
+        """
+        if self._broadcast_lock.locked():
+            logger.warning(f"⚠️ Skipping notification batch, broadcast already in progress: {self._broadcast_progress}")
+            return False
+        
+        async with self._broadcast_lock:
+            await self._run_daily_notifications()
+        return True
+    
+    async def _run_daily_notifications(self):
+        """Send the daily digest to every subscriber through a pool of workers"""
         try:
             from datetime import datetime
             start_time = datetime.now()
             logger.info(f"🔔 Starting notification batch at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
             
-            subscribers = self.db.get_subscribed_users()
-            if not subscribers:
-                logger.info("No subscribers found for daily notifications")
-                return
+            self._broadcast_progress = {'sent': 0, 'failed': 0, 'total': 0}
             
-            logger.info(f"📤 Sending notifications to {len(subscribers)} subscribers: {subscribers}")
+            # A fixed pool of workers drains the queue, so OpenAI and Telegram aren't flooded
+            queue = asyncio.Queue(maxsize=DAILY_NOTIFICATION_CONCURRENCY * 2)
+            workers = [
+                asyncio.create_task(self._daily_notification_worker(queue))
+                for _ in range(DAILY_NOTIFICATION_CONCURRENCY)
+            ]
             
-            successful_sends = 0
-            failed_sends = 0
+            try:
+                # Feed subscribers straight from the database cursor, so sending starts
+                # before the whole list is read and memory stays bounded by the queue
+                for user_id in self.db.iter_subscribed_users():
+                    await queue.put(user_id)
+                    self._broadcast_progress['total'] += 1
+                
+                # One stop marker per worker, queued after the last subscriber
+                for _ in workers:
+                    await queue.put(None)
+                
+                results = await asyncio.gather(*workers)
+            finally:
+                # Like a TaskGroup: no worker outlives the batch if it fails or is cancelled
+                for worker in workers:
+                    worker.cancel()
+                self._flush_unreachable_chats()
             
-            for user_id in subscribers:
-                try:
-                    logger.info(f"📨 Sending notification to user {user_id}")
-                    # Send personalized AI digest parts for each user
-                    await self.send_ai_digest_parts(user_id, user_id)
-                    successful_sends += 1
-                    logger.info(f"✅ Successfully sent to user {user_id}")
-                    
-                    # Rate limiting
-                    await asyncio.sleep(0.1)
-                    
-                except Exception as e:
-                    logger.error(f"❌ Failed to send daily notification to user {user_id}: {e}")
-                    failed_sends += 1
-                    
-                    # If user blocked bot, unsubscribe them
-                    if "bot was blocked" in str(e).lower():
-                        self.db.unsubscribe_user(user_id)
-                        logger.info(f"🚫 Unsubscribed user {user_id} (bot was blocked)")
+            subscriber_count = self._broadcast_progress['total']
+            if not subscriber_count:
+                logger.info("No subscribers found for daily notifications")
+                return
+            
+            successful_sends = sum(results)
+            failed_sends = subscriber_count - successful_sends
             
             end_time = datetime.now()
             duration = (end_time - start_time).total_seconds()
@@ -3473,63 +3795,49 @@ JUN25: $879.80 ↗️ +0.69%
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
     
+    async def _daily_notification_worker(self, queue: asyncio.Queue) -> int:
+        """Send daily digests to queued users until a None stop marker, returning the number delivered"""
+        delivered = 0
+        while True:
+            user_id = await queue.get()
+            if user_id is None:
+                return delivered
+            if await self._send_daily_notification(user_id):
+                delivered += 1
+                self._broadcast_progress['sent'] += 1
+            else:
+                self._broadcast_progress['failed'] += 1
+    
+    async def _send_daily_notification(self, user_id: int) -> bool:
+        """Send one subscriber's daily digest, returning whether it was delivered"""
+        try:
+            logger.info(f"📨 Sending notification to user {user_id}")
+            # Send personalized AI digest parts for each user
+            await self.send_ai_digest_parts(user_id, user_id, stream=False)
+            logger.info(f"✅ Successfully sent to user {user_id}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to send daily notification to user {user_id}: {e}")
+            
+            # If user blocked bot or the chat is gone, unsubscribe them once the batch ends
+            if is_unreachable_chat(e):
+                self._unreachable_chats.append(user_id)
+            return False
+    
     def schedule_daily_summaries(self):
         """Schedule hourly oil & gas updates for testing"""
-        
-        def run_async_notification():
-            """Helper to run async notification in thread"""
-            try:
-                # Create new event loop for this thread
-                import asyncio
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                # Run the notification
-                try:
-                    loop.run_until_complete(self.send_daily_notifications())
-                    logger.info("✅ Scheduled notification sent successfully")
-                finally:
-                    loop.close()
-                    
-            except Exception as e:
-                logger.error(f"Error in scheduled notification: {e}")
-                import traceback
-                logger.error(f"Traceback: {traceback.format_exc()}")
-        
-        def run_startup_test():
-            """One-time startup test notification"""
-            try:
-                # Create new event loop for this thread
-                import asyncio
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                # Run the notification
-                try:
-                    loop.run_until_complete(self.send_daily_notifications())
-                    logger.info("✅ Startup test notification sent successfully")
-                finally:
-                    loop.close()
-                
-                # Clear startup test after first run
-                schedule.clear('startup_test')
-                logger.info("✅ Startup test notification completed, cleared from schedule")
-                    
-            except Exception as e:
-                logger.error(f"Error in startup test notification: {e}")
-                import traceback
-                logger.error(f"Traceback: {traceback.format_exc()}")
-        
-        # 🛢️ TESTING MODE: Send oil & gas updates every 10 minutes for debugging
-        schedule.every(10).minutes.do(run_async_notification)
-        
-        # For immediate testing - send first notification in 30 seconds for faster testing
-        schedule.every(30).seconds.do(run_startup_test).tag('startup_test')
+        now = datetime.now()
+        self._jobs = [
+            # 🛢️ TESTING MODE: Send oil & gas updates every 10 minutes for debugging
+            ScheduledJob("Regular Notifications", now + timedelta(minutes=10), interval=timedelta(minutes=10)),
+            # For immediate testing - send first notification in 30 seconds for faster testing
+            ScheduledJob("Startup Test", now + timedelta(seconds=30)),
+        ]
         
         # Add debug logging
-        import schedule as sched_module
-        logger.info(f"📅 Scheduled jobs count: {len(sched_module.jobs)}")
-        for i, job in enumerate(sched_module.jobs):
+        logger.info(f"📅 Scheduled jobs count: {len(self._jobs)}")
+        for i, job in enumerate(self._jobs):
             logger.info(f"   Job {i+1}: {job}")
         
         logger.info("🛢️ Oil & Gas Bot - TESTING MODE")
@@ -3538,6 +3846,40 @@ JUN25: $879.80 ↗️ +0.69%
         logger.info("   • First test notification in 30 seconds")
         logger.info("   • AI-powered mocked data from ChatGPT")
     
+    async def _run_scheduler(self):
+        """Sleep until the next job is due and run it; nothing wakes up in between"""
+        logger.info("🔄 Scheduler loop started")
+        while self._jobs:
+            job = min(self._jobs, key=lambda j: j.next_run)
+            delay = (job.next_run - datetime.now()).total_seconds()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            if job.interval is None:
+                self._jobs.remove(job)
+            else:
+                job.next_run = datetime.now() + job.interval
+            
+            # Jobs run one at a time, so a slow batch delays the next run instead of overlapping it
+            try:
+                logger.info(f"⏰ Running scheduled job: {job.name}")
+                await self.send_daily_notifications()
+                logger.info(f"✅ {job.name} sent successfully")
+            except Exception as e:
+                logger.error(f"Error in scheduled notification: {e}")
+                import traceback
+                logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.info("Scheduler loop finished, no jobs left")
+    
+    async def _start_scheduler(self, application: Application):
+        """post_init hook: run the scheduler on the application's event loop"""
+        self._scheduler_task = asyncio.create_task(self._run_scheduler())
+        logger.info("✅ Scheduler task started")
+    
+    async def _stop_scheduler(self, application: Application):
+        """post_shutdown hook: stop the scheduler task"""
+        if self._scheduler_task is not None:
+            self._scheduler_task.cancel()
 
     def start(self):
         """Start the bot with scheduler"""
@@ -3549,45 +3891,41 @@ JUN25: $879.80 ↗️ +0.69%
         logger.info("Bot started successfully! AI-powered market research is operational.")
         logger.info(f"Current subscriber count: {len(self.db.get_subscribed_users())}")
         
-        # Start scheduler in background thread
-        import threading
-        def run_scheduler():
-            logger.info("🔄 Scheduler loop started")
-            loop_count = 0
-            while True:
-                try:
-                    jobs_before = len(schedule.jobs)
-                    schedule.run_pending()
-                    jobs_after = len(schedule.jobs)
-                    
-                    # Log frequently in first 5 minutes, then every minute
-                    loop_count += 1
-                    if loop_count <= 300:  # First 5 minutes
-                        if loop_count % 30 == 0:  # Every 30 seconds
-                            logger.info(f"🔄 Scheduler heartbeat: {loop_count}s, {jobs_before} jobs checked")
-                    elif loop_count % 60 == 0:  # Every minute after that
-                        logger.info(f"🔄 Scheduler heartbeat: {loop_count//60} min, {jobs_before} jobs checked")
-                    
-                    if jobs_before != jobs_after:
-                        logger.info(f"📅 Jobs count changed: {jobs_before} -> {jobs_after}")
-                    
-                    time.sleep(1)
-                except Exception as e:
-                    logger.error(f"Error in scheduler loop: {e}")
-                    import traceback
-                    logger.error(f"Scheduler traceback: {traceback.format_exc()}")
-                    time.sleep(5)  # Wait before retrying
-        
-        scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-        scheduler_thread.start()
-        logger.info("✅ Background scheduler thread started")
-        
-        # Start the bot polling
+        # Start the bot polling; the scheduler task starts in post_init
         self.application.run_polling(drop_pending_updates=True)
 
     # 🛢️ AI-ONLY OIL & GAS CONTENT GENERATION METHODS
     
-    async def generate_oil_gas_news(self, language: str) -> str:
+    async def _create_completion(self, prompt: str, max_tokens: int, on_update=None) -> str:
+        """Run a ChatGPT completion, streaming partial text to on_update when given"""
+        if on_update is None:
+            response = await openai_with_retry(
+                self.openai_client.chat.completions.create,
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.7,
+                max_tokens=max_tokens
+            )
+            return response.choices[0].message.content
+        
+        stream = await openai_with_retry(
+            self.openai_client.chat.completions.create,
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.7,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        
+        parts = []
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                await on_update("".join(parts))
+        
+        return "".join(parts)
+    
+    async def generate_oil_gas_news(self, language: str, on_update=None) -> str:
         """Generate enhanced oil & gas news using ChatGPT"""
         try:
             if not self.openai_client:
@@ -3645,14 +3983,7 @@ Use real companies (Shell, BP, ExxonMobil, Gazprom, Lukoil) and exchanges (ICE,
 Add emojis for visual appeal.
 """
             
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=1000
-            )
-            
-            content = response.choices[0].message.content
+            content = await self._create_completion(prompt, max_tokens=1000, on_update=on_update)
             
             return content
             
@@ -3663,7 +3994,7 @@ Add emojis for visual appeal.
             else:
                 return "❌ Error generating oil & gas news"
     
-    async def generate_oil_gas_prices(self, language: str) -> str:
+    async def generate_oil_gas_prices(self, language: str, on_update=None) -> str:
         """Generate enhanced oil & gas prices using ChatGPT"""
         try:
             if not self.openai_client:
@@ -3732,14 +4063,7 @@ Add beautiful emojis and clear structure.
 Make it professional but appealing.
 """
             
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=800
-            )
-            
-            content = response.choices[0].message.content
+            content = await self._create_completion(prompt, max_tokens=800, on_update=on_update)
             
             return content
             
@@ -3750,7 +4074,7 @@ Make it professional but appealing.
             else:
                 return "❌ Error generating oil & gas prices"
     
-    async def generate_oil_futures_analysis(self, language: str) -> str:
+    async def generate_oil_futures_analysis(self, language: str, on_update=None) -> str:
         """Generate oil futures analysis - NEW FUNCTIONALITY"""
         try:
             if not self.openai_client:
@@ -3825,14 +4149,7 @@ Create professional oil futures analysis for {current_month}:
 Make this highly realistic with specific numbers.
 """
             
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=900
-            )
-            
-            content = response.choices[0].message.content
+            content = await self._create_completion(prompt, max_tokens=900, on_update=on_update)
             
             return content
             
@@ -3843,7 +4160,7 @@ Make this highly realistic with specific numbers.
             else:
                 return "❌ Error generating oil futures analysis"
     
-    async def generate_oil_gas_analysis(self, language: str) -> str:
+    async def generate_oil_gas_analysis(self, language: str, on_update=None) -> str:
         """Generate enhanced oil & gas market analysis using ChatGPT"""
         try:
             if not self.openai_client:
@@ -3926,14 +4243,7 @@ Use specific numbers and professional terminology.
 Length: 200-250 words.
 """
             
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=900
-            )
-            
-            content = response.choices[0].message.content
+            content = await self._create_completion(prompt, max_tokens=900, on_update=on_update)
             
             return content
             
@@ -3981,23 +4291,8 @@ def main():
     bot = StockNewsBot(BOT_TOKEN)
     
     try:
-        # Clear webhook before starting to prevent conflicts
-        try:
-            logger.info("🧹 Clearing webhook to prevent conflicts...")
-            import requests
-            webhook_url = f"https://api.telegram.org/bot{BOT_TOKEN}/deleteWebhook?drop_pending_updates=true"
-            response = requests.post(webhook_url, timeout=10)
-            if response.status_code == 200:
-                logger.info("✅ Webhook cleared successfully")
-            else:
-                logger.warning(f"Webhook clear response: {response.status_code}")
-        except Exception as e:
-            logger.warning(f"Could not clear webhook: {e}")
-        
-        # Wait a moment for Telegram to process
-        time.sleep(2)
-        
-        # Start the bot with scheduler
+        # Start the bot with scheduler; run_polling(drop_pending_updates=True) deletes any
+        # webhook on the application's own HTTP client before polling starts
         try:
             logger.info("🚀 Starting bot with hourly notifications...")
             bot.start()
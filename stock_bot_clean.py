@@ -2,6 +2,7 @@ import asyncio
 import logging
 from datetime import datetime, timedelta
 from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, Forbidden, RetryAfter
 from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler
 import schedule
 import time
@@ -38,6 +39,8 @@ class AssetItem:
 class DatabaseManager:
     def __init__(self, db_path: str = "stock_bot.db"):
         self.db_path = db_path
+        # Ordered dict of subscribed user IDs; None means it must be reloaded
+        self._subscribers_cache = None
         self.init_database()
     
     def init_database(self):
@@ -123,14 +126,23 @@ class DatabaseManager:
         
         conn.commit()
         conn.close()
+        
+        # New users are subscribed by default, so an unknown ID makes the cache stale
+        if self._subscribers_cache is not None and user_id not in self._subscribers_cache:
+            self._subscribers_cache = None
     
     def get_subscribed_users(self) -> List[int]:
         """Get all subscribed user IDs"""
+        if self._subscribers_cache is not None:
+            return list(self._subscribers_cache)
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute('SELECT user_id FROM users WHERE subscribed = TRUE')
         users = [row[0] for row in cursor.fetchall()]
         conn.close()
+        
+        self._subscribers_cache = dict.fromkeys(users)
         return users
     
     def subscribe_user(self, user_id: int):
@@ -140,6 +152,7 @@ class DatabaseManager:
         cursor.execute('UPDATE users SET subscribed = TRUE WHERE user_id = ?', (user_id,))
         conn.commit()
         conn.close()
+        self._subscribers_cache = None
     
     def unsubscribe_user(self, user_id: int):
         """Unsubscribe a user from daily updates"""
@@ -148,6 +161,7 @@ class DatabaseManager:
         cursor.execute('UPDATE users SET subscribed = FALSE WHERE user_id = ?', (user_id,))
         conn.commit()
         conn.close()
+        self._subscribers_cache = None
     
     def get_user_count(self) -> int:
         """Get total number of users"""
@@ -209,6 +223,12 @@ class DatabaseManager:
         conn.commit()
         conn.close()
 
+def is_unreachable_chat(error: Exception) -> bool:
+    """Whether a send failed because the chat can never be reached again (blocked, deactivated, deleted)"""
+    if isinstance(error, Forbidden):
+        return True
+    return isinstance(error, BadRequest) and "chat not found" in error.message.lower()
+
 class StockNewsBot:
     def __init__(self, bot_token: str):
         self.bot_token = bot_token
@@ -1050,9 +1070,12 @@ Use emojis, structure information for easy reading, and make the analysis profes
                     logger.error(f"Failed to send manual notification to user {user_id}: {e}")
                     failed_sends += 1
                     
-                    # If user blocked bot, unsubscribe them
-                    if "bot was blocked" in str(e).lower():
+                    # If user blocked bot or the chat is gone, unsubscribe them
+                    if is_unreachable_chat(e):
                         self.db.unsubscribe_user(user_id)
+                    elif isinstance(e, RetryAfter):
+                        # Flood control: hold off before the next user
+                        await asyncio.sleep(e.retry_after)
             
             # Send confirmation to the user who triggered the notification
             confirmation = f"""
@@ -1129,9 +1152,12 @@ Use emojis, structure information for easy reading, and make the analysis profes
                     logger.error(f"Failed to send daily notification to user {user_id}: {e}")
                     failed_sends += 1
                     
-                    # If user blocked bot, unsubscribe them
-                    if "bot was blocked" in str(e).lower():
+                    # If user blocked bot or the chat is gone, unsubscribe them
+                    if is_unreachable_chat(e):
                         self.db.unsubscribe_user(user_id)
+                    elif isinstance(e, RetryAfter):
+                        # Flood control: hold off before the next user
+                        await asyncio.sleep(e.retry_after)
             
             logger.info(f"Daily notifications sent to {successful_sends} users, {failed_sends} failed")
             
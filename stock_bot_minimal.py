@@ -9,6 +9,7 @@ import logging
 import os
 import sqlite3
 import sys
+from collections import OrderedDict
 from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler
@@ -20,11 +21,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Max users kept in each in-process lookup cache
+USER_CACHE_SIZE = 10000
+
+# callback_data of the language buttons -> language code
+LANGUAGE_CALLBACKS = {"lang_en": "en", "lang_ru": "ru"}
+
+# UI strings per language, shared by every bot instance
+TRANSLATIONS = {
+    'en': {
+        'welcome': 'Welcome to Кофе и Котировки! 🤖\n\nI\'m your AI-powered stock market assistant.\n\nCommands:\n/start - This message\n/language - Change language\n/help - Show help\n/status - Bot status',
+        'language_changed': '✅ Language changed to English',
+        'choose_language': '🌍 Choose your language:',
+        'status_message': '🤖 Bot Status: Online\n📊 Users: {users}\n🕐 Time: {time}',
+        'help_message': '📖 Available Commands:\n\n/start - Welcome message\n/language - Change language\n/help - This help\n/status - Bot status\n\n🤖 Bot is working!'
+    },
+    'ru': {
+        'welcome': 'Добро пожаловать в Кофе и Котировки! 🤖\n\nЯ ваш ИИ-помощник по фондовому рынку.\n\nКоманды:\n/start - Это сообщение\n/language - Изменить язык\n/help - Показать помощь\n/status - Статус бота',
+        'language_changed': '✅ Язык изменен на русский',
+        'choose_language': '🌍 Выберите язык:',
+        'status_message': '🤖 Статус бота: Онлайн\n📊 Пользователей: {users}\n🕐 Время: {time}',
+        'help_message': '📖 Доступные команды:\n\n/start - Приветственное сообщение\n/language - Изменить язык\n/help - Эта справка\n/status - Статус бота\n\n🤖 Бот работает!'
+    }
+}
+
 class DatabaseManager:
     def __init__(self, db_path="bot.db"):
         self.db_path = db_path
+        # LRU caches for per-user lookups, kept in sync by the setters below
+        self._lang_cache = OrderedDict()
+        self._admin_cache = OrderedDict()
         self.init_database()
     
+    def _cache_get(self, cache, user_id):
+        """Return a cached value (None if missing), marking it recently used"""
+        value = cache.get(user_id)
+        if value is not None:
+            cache.move_to_end(user_id)
+        return value
+    
+    def _cache_put(self, cache, user_id, value):
+        """Store a value, evicting the least recently used entry when full"""
+        cache[user_id] = value
+        cache.move_to_end(user_id)
+        if len(cache) > USER_CACHE_SIZE:
+            cache.popitem(last=False)
+    
     def init_database(self):
         """Initialize database tables"""
         try:
@@ -82,13 +124,19 @@ class DatabaseManager:
     
     def get_user_language(self, user_id):
         """Get user's preferred language"""
+        language = self._cache_get(self._lang_cache, user_id)
+        if language is not None:
+            return language
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             cursor.execute('SELECT language FROM users WHERE id = ?', (user_id,))
             result = cursor.fetchone()
             conn.close()
-            return result[0] if result else 'ru'
+            if not result:
+                return 'ru'
+            self._cache_put(self._lang_cache, user_id, result[0])
+            return result[0]
         except:
             return 'ru'
     
@@ -98,20 +146,27 @@ class DatabaseManager:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             cursor.execute('UPDATE users SET language = ? WHERE id = ?', (language, user_id))
+            updated = cursor.rowcount
             conn.commit()
             conn.close()
+            if updated:
+                self._cache_put(self._lang_cache, user_id, language)
             logger.info(f"✅ Language set to {language} for user {user_id}")
         except Exception as e:
             logger.error(f"❌ Error setting language for user {user_id}: {e}")
     
     def is_admin(self, user_id):
         """Check if user is admin"""
+        admin = self._cache_get(self._admin_cache, user_id)
+        if admin is not None:
+            return admin
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             cursor.execute('SELECT 1 FROM admin_users WHERE user_id = ?', (user_id,))
             result = cursor.fetchone()
             conn.close()
+            self._cache_put(self._admin_cache, user_id, result is not None)
             return result is not None
         except:
             return False
@@ -124,6 +179,7 @@ class DatabaseManager:
             cursor.execute('INSERT OR IGNORE INTO admin_users (user_id) VALUES (?)', (user_id,))
             conn.commit()
             conn.close()
+            self._cache_put(self._admin_cache, user_id, True)
             logger.info(f"✅ User {user_id} added as admin")
         except Exception as e:
             logger.error(f"❌ Error adding admin {user_id}: {e}")
@@ -148,24 +204,6 @@ class MinimalStockBot:
         # Create application
         self.application = Application.builder().token(bot_token).build()
         
-        # Translations
-        self.translations = {
-            'en': {
-                'welcome': 'Welcome to Кофе и Котировки! 🤖\n\nI\'m your AI-powered stock market assistant.\n\nCommands:\n/start - This message\n/language - Change language\n/help - Show help\n/status - Bot status',
-                'language_changed': '✅ Language changed to English',
-                'choose_language': '🌍 Choose your language:',
-                'status_message': '🤖 Bot Status: Online\n📊 Users: {users}\n🕐 Time: {time}',
-                'help_message': '📖 Available Commands:\n\n/start - Welcome message\n/language - Change language\n/help - This help\n/status - Bot status\n\n🤖 Bot is working!'
-            },
-            'ru': {
-                'welcome': 'Добро пожаловать в Кофе и Котировки! 🤖\n\nЯ ваш ИИ-помощник по фондовому рынку.\n\nКоманды:\n/start - Это сообщение\n/language - Изменить язык\n/help - Показать помощь\n/status - Статус бота',
-                'language_changed': '✅ Язык изменен на русский',
-                'choose_language': '🌍 Выберите язык:',
-                'status_message': '🤖 Статус бота: Онлайн\n📊 Пользователей: {users}\n🕐 Время: {time}',
-                'help_message': '📖 Доступные команды:\n\n/start - Приветственное сообщение\n/language - Изменить язык\n/help - Эта справка\n/status - Статус бота\n\n🤖 Бот работает!'
-            }
-        }
-        
         # Setup handlers
         self.setup_handlers()
         
@@ -174,7 +212,7 @@ class MinimalStockBot:
     def get_text(self, user_id, key):
         """Get translated text"""
         language = self.db.get_user_language(user_id)
-        return self.translations.get(language, self.translations['ru']).get(key, key)
+        return TRANSLATIONS.get(language, TRANSLATIONS['ru']).get(key, key)
     
     def setup_handlers(self):
         """Setup command handlers"""
@@ -275,8 +313,8 @@ class MinimalStockBot:
             
             logger.info(f"📥 Callback {data} from user {user.id}")
             
-            if data.startswith("lang_"):
-                language = data.split("_")[1]
+            language = LANGUAGE_CALLBACKS.get(data)
+            if language:
                 self.db.set_user_language(user.id, language)
                 
                 success_text = self.get_text(user.id, 'language_changed')
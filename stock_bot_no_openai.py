@@ -4,19 +4,14 @@ Temporary fallback version without OpenAI to test basic bot functionality
 """
 
 import asyncio
+import html
 import logging
-import re
-import signal
-import sys
-from datetime import datetime, timedelta
-from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup, BotCommand
-from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler
-import schedule
-import time
-from typing import List, Dict
+from telegram import Update
+from telegram.ext import Application, CommandHandler, ContextTypes
+from typing import Iterator, Tuple
 import os
-from dataclasses import dataclass
 import sqlite3
+import threading
 
 # Configure logging
 logging.basicConfig(
@@ -25,124 +20,173 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
-class NewsItem:
-    title: str
-    summary: str
-    source: str
-    published: str
-    url: str = ""
+# Static /start and /status texts, built once; only the dynamic fields are filled in per call
+START_MESSAGE_TMPL = """
+🎉 <b>Добро пожаловать в Кофе и Котировки!</b> 🎉
 
-@dataclass
-class AssetItem:
-    symbol: str
-    name: str
-    price: float
-    change: float
-    change_direction: str
-    source: str = "Market Data"
+Привет, {name}!
+
+📈 <b>Что я умею:</b>
+• 📰 Рыночные новости и анализ
+• 📊 Котировки активов  
+• 🔮 Прогнозы и тенденции
+• ⏰ Автоматические уведомления
+
+<b>📱 Команды:</b>
+/news - Получить новости (временно отключено - исправляем OpenAI)
+/status - Проверить статус
+/help - Помощь
+
+⚠️ <b>Статус</b>: Временно работаем без OpenAI из-за технических проблем.
+🔧 Исправляем совместимость библиотек...
+
+Готов к работе! 🚀
+"""
+
+STATUS_MESSAGE_TMPL = """
+📊 <b>Статус бота</b>
+
+👤 <b>Ваш статус</b>: {role}
+📈 <b>Всего пользователей</b>: {total_users}
+🤖 <b>Статус бота</b>: ✅ Запущен (без OpenAI)
+⚠️ <b>OpenAI</b>: 🔧 Исправляем совместимость
+
+<b>🔧 Техническая информация:</b>
+• Telegram Bot API: ✅ Работает
+• База данных: ✅ Работает  
+• Планировщик: ✅ Работает
+• OpenAI API: ❌ Проблема совместимости
+"""
 
 class DatabaseManager:
     def __init__(self, db_path: str = "stock_bot.db"):
         self.db_path = db_path
+        # One long-lived connection shared by all calls, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, cached_statements=256)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+        self._conn.execute('PRAGMA cache_size=-64000')
         self.init_database()
+        
+        # In-process copies so /start and /status don't query the DB
+        self._admin_ids = set(row[0] for row in self._conn.execute('SELECT user_id FROM admin_users'))
+        self._user_count = self._conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
     
     def init_database(self):
         """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Users table to store subscriber information
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY,
-                username TEXT,
-                first_name TEXT,
-                last_name TEXT,
-                subscribed BOOLEAN DEFAULT TRUE,
-                language TEXT DEFAULT 'ru',
-                topic_preferences TEXT DEFAULT 'all',
-                joined_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Admin users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS admin_users (
-                user_id INTEGER PRIMARY KEY,
-                added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self._lock:
+            cursor = self._conn.cursor()
+            
+            # Users table to store subscriber information
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id INTEGER PRIMARY KEY,
+                    username TEXT,
+                    first_name TEXT,
+                    last_name TEXT,
+                    subscribed BOOLEAN DEFAULT TRUE,
+                    language TEXT DEFAULT 'ru',
+                    topic_preferences TEXT DEFAULT 'all',
+                    joined_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Admin users table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS admin_users (
+                    user_id INTEGER PRIMARY KEY,
+                    added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users (user_id)
+                )
+            ''')
+            
+            # Partial index for broadcasts: its WHERE must match the query text exactly
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_subscribed ON users(user_id) WHERE subscribed = TRUE')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_last_active ON users(last_active)')
     
-    def add_user(self, user_id: int, username: str = None, first_name: str = None, last_name: str = None):
-        """Add or update a user in the database without resetting preferences"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Use UPSERT to preserve existing preferences
-        cursor.execute('''
-            INSERT INTO users (user_id, username, first_name, last_name, last_active)
-            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(user_id) DO UPDATE SET
-                username=excluded.username,
-                first_name=excluded.first_name,
-                last_name=excluded.last_name,
-                last_active=CURRENT_TIMESTAMP
-        ''', (user_id, username, first_name, last_name))
-        
-        conn.commit()
-        conn.close()
+    def add_user(self, user_id: int, username: str = None, first_name: str = None, last_name: str = None) -> int:
+        """Add or update a user without resetting preferences; returns the user count after the write"""
+        with self._lock:
+            cursor = self._conn.execute('''
+                INSERT OR IGNORE INTO users (user_id, username, first_name, last_name, last_active)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (user_id, username, first_name, last_name))
+            if cursor.rowcount:
+                self._user_count += 1
+                return self._user_count
+            
+            # Existing user: refresh profile fields only, preferences stay as they are
+            self._conn.execute('''
+                UPDATE users SET username = ?, first_name = ?, last_name = ?, last_active = CURRENT_TIMESTAMP
+                WHERE user_id = ?
+            ''', (username, first_name, last_name, user_id))
+            return self._user_count
     
-    def get_subscribed_users(self) -> List[int]:
-        """Get all subscribed user IDs"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT user_id FROM users WHERE subscribed = TRUE')
-        users = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return users
+    def iter_subscribed_users(self, batch_size: int = 500) -> Iterator[int]:
+        """Yield subscribed user IDs, fetching them from the cursor in batches"""
+        with self._lock:
+            cursor = self._conn.execute('SELECT user_id FROM users WHERE subscribed = TRUE')
+        while True:
+            # The lock is held per batch only, so the consumer may use the DB between batches
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for (user_id,) in rows:
+                yield user_id
     
     def get_user_count(self) -> int:
         """Get total number of users"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM users')
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        return self._user_count
     
     def is_admin(self, user_id: int) -> bool:
         """Check if user is admin"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT 1 FROM admin_users WHERE user_id = ?', (user_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result is not None
+        return user_id in self._admin_ids
+    
+    def get_status_for(self, user_id: int) -> Tuple[int, bool]:
+        """Get the user count and the user's admin flag in one call
+        
+        Both are in-memory copies, read without the DB lock: writers hold that lock in worker
+        threads across SQLite I/O, and waiting on it here would block the event loop.
+        """
+        return self._user_count, user_id in self._admin_ids
     
     def add_admin(self, user_id: int):
         """Add user as admin"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('INSERT OR IGNORE INTO admin_users (user_id) VALUES (?)', (user_id,))
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute('INSERT OR IGNORE INTO admin_users (user_id) VALUES (?)', (user_id,))
+            self._admin_ids.add(user_id)
+    
+    def close(self):
+        """Refresh planner statistics and close the shared connection"""
+        with self._lock:
+            # Cheap, incremental ANALYZE so the next start picks the right indexes
+            self._conn.execute('PRAGMA optimize')
+            self._conn.close()
 
 class StockNewsBot:
     def __init__(self, bot_token: str):
         self.bot_token = bot_token
-        self.bot = Bot(token=bot_token)
-        self.application = Application.builder().token(bot_token).build()
         self.db = DatabaseManager()
+        self.application = (
+            Application.builder()
+            .token(bot_token)
+            .post_shutdown(self._close_database)
+            .build()
+        )
+        # Reuse the application's bot instead of a second Bot with its own HTTPX pool
+        self.bot = self.application.bot
         
         # Set up command handlers
         self.setup_handlers()
     
+    async def _close_database(self, application: Application):
+        """post_shutdown hook: close the DB once polling has stopped"""
+        self.db.close()
+    
     def setup_handlers(self):
         """Set up command handlers"""
         self.application.add_handler(CommandHandler("start", self.start_command))
@@ -150,42 +194,25 @@ class StockNewsBot:
         self.application.add_handler(CommandHandler("news", self.news_command))
         self.application.add_handler(CommandHandler("status", self.status_command))
     
+    def _render_welcome(self, user) -> str:
+        """Render the welcome/help text for a user"""
+        return START_MESSAGE_TMPL.format(name=html.escape(user.first_name or user.username or "Друг"))
+    
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        # DB writes run in a worker thread so they don't block the event loop
+        user_count = await asyncio.to_thread(self.db.add_user, user.id, user.username, user.first_name, user.last_name)
         
-        # Make first user admin automatically
-        if self.db.get_user_count() == 1:
-            self.db.add_admin(user.id)
+        # Make first user admin automatically; the count is taken under the same lock as the insert
+        if user_count == 1:
+            await asyncio.to_thread(self.db.add_admin, user.id)
         
-        message = f"""
-🎉 **Добро пожаловать в Кофе и Котировки!** 🎉
-
-Привет, {user.first_name or user.username or "Друг"}!
-
-📈 **Что я умею:**
-• 📰 Рыночные новости и анализ
-• 📊 Котировки активов  
-• 🔮 Прогнозы и тенденции
-• ⏰ Автоматические уведомления
-
-**📱 Команды:**
-/news - Получить новости (временно отключено - исправляем OpenAI)
-/status - Проверить статус
-/help - Помощь
-
-⚠️ **Статус**: Временно работаем без OpenAI из-за технических проблем.
-🔧 Исправляем совместимость библиотек...
-
-Готов к работе! 🚀
-        """
-        
-        await update.message.reply_text(message, parse_mode='Markdown')
+        await update.message.reply_text(self._render_welcome(user), parse_mode='HTML')
     
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /help command"""
-        await self.start_command(update, context)
+        """Handle /help command - same text as /start, without the DB writes"""
+        await update.message.reply_text(self._render_welcome(update.effective_user), parse_mode='HTML')
     
     async def news_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /news command - temporarily disabled"""
@@ -199,30 +226,14 @@ class StockNewsBot:
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command"""
         user = update.effective_user
-        total_users = self.db.get_user_count()
-        is_admin = self.db.is_admin(user.id)
+        total_users, is_admin = self.db.get_status_for(user.id)
         
-        message = f"""
-📊 **Статус бота**
-
-👤 **Ваш статус**: {'👑 Администратор' if is_admin else '👤 Пользователь'}
-📈 **Всего пользователей**: {total_users}
-🤖 **Статус бота**: ✅ Запущен (без OpenAI)
-⚠️ **OpenAI**: 🔧 Исправляем совместимость
-
-**🔧 Техническая информация:**
-• Telegram Bot API: ✅ Работает
-• База данных: ✅ Работает  
-• Планировщик: ✅ Работает
-• OpenAI API: ❌ Проблема совместимости
-        """
+        message = STATUS_MESSAGE_TMPL.format(
+            role='👑 Администратор' if is_admin else '👤 Пользователь',
+            total_users=total_users,
+        )
         
-        await update.message.reply_text(message, parse_mode='Markdown')
-
-# Signal handler for graceful shutdown
-def signal_handler(signum, frame):
-    logger.info(f"Received signal {signum}. Initiating graceful shutdown...")
-    sys.exit(0)
+        await update.message.reply_text(message, parse_mode='HTML')
 
 # Main execution
 def main():
@@ -243,10 +254,6 @@ def main():
     
     logger.info(f"✅ Bot token loaded")
     
-    # Set up signal handlers for graceful shutdown
-    signal.signal(signal.SIGTERM, signal_handler)
-    signal.signal(signal.SIGINT, signal_handler)
-    
     # Create and start bot
     bot = StockNewsBot(BOT_TOKEN)
     
@@ -254,7 +261,7 @@ def main():
         logger.info("Bot started successfully! (Fallback mode without OpenAI)")
         logger.info(f"Current user count: {bot.db.get_user_count()}")
         
-        # Start the bot
+        # Start the bot; run_polling stops the application on SIGINT/SIGTERM via loop.add_signal_handler
         try:
             logger.info("🚀 Starting Telegram bot polling...")
             bot.application.run_polling(
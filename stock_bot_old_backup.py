@@ -1,19 +1,40 @@
 import asyncio
+import calendar
+import hashlib
 import logging
-from datetime import datetime, timedelta
+import random
+import re
+import ssl
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timedelta, timezone
 import aiohttp
 import feedparser
-from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, ContextTypes
-import schedule
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.helpers import escape_markdown
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler, ContextTypes
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError
+from telegram.request import HTTPXRequest
 import time
-from typing import List, Dict, Set
+from typing import Iterator, List, Dict, Optional, Set, Tuple
 import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import sqlite3
+import threading
+from collections import Counter, OrderedDict
+from itertools import chain, islice
+from xml.etree import ElementTree
 from contextlib import asynccontextmanager
-from openai import AsyncOpenAI
+from zoneinfo import ZoneInfo
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+# orjson parses response bodies several times faster; it is optional
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +43,946 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bumped whenever _migrate_database gains a step; stored in PRAGMA user_version
+SCHEMA_VERSION = 2
+
+# Max users kept in each in-process lookup cache
+USER_CACHE_SIZE = 4096
+
+# Max translated snippets kept in memory (headlines repeat across users and days)
+TRANSLATION_CACHE_SIZE = 4096
+# Translations are also kept in SQLite, so a restart starts with a warm cache; older rows are pruned at startup
+TRANSLATION_MAX_AGE_DAYS = 7
+
+# LibreTranslate API endpoint (free service)
+LIBRETRANSLATE_URL = "https://libretranslate.de/translate"
+
+# RSS requests get a longer budget than the shared session default, but must connect quickly
+RSS_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5)
+
+# Seconds the merged news list from fetch_all_news is shared by all callers
+NEWS_CACHE_TTL = 120
+
+# Bounds (seconds) for how long a feed's items are reused before it is requested again
+FEED_MIN_CHECK_INTERVAL = 60
+FEED_MAX_CHECK_INTERVAL = 3600
+
+# Articles kept from each feed; downloading and parsing stop once this many entries have been read
+FEED_ITEMS_PER_SOURCE = 5
+FEED_READ_CHUNK_SIZE = 16384
+# Feed bodies are never read past this many bytes, whichever parser handles them
+FEED_MAX_BYTES = 2 * 1024 * 1024
+
+# News items whose 64-bit SimHashes (title + summary) differ in at most this many bits are the same story
+SIMHASH_MAX_DISTANCE = 6
+
+# Telegram allows about 30 messages per second per bot
+TELEGRAM_MESSAGES_PER_SECOND = 30
+
+# Subscribers processed at once during a broadcast
+BROADCAST_CONCURRENCY = 30
+
+# Connections to the Bot API; more than BROADCAST_CONCURRENCY so command replies aren't starved mid-broadcast
+TELEGRAM_CONNECTION_POOL_SIZE = 64
+
+# Subscribers read from the DB per batch during a broadcast
+SUBSCRIBER_BATCH_SIZE = 500
+
+# A broadcast is aborted once this many sends failed and failures outnumber successes 3:1 (e.g. a Telegram outage)
+BROADCAST_ABORT_MIN_FAILURES = 50
+
+# Seconds a ChatGPT topic-asset answer is reused for every user with the same topic and language
+TOPIC_ASSETS_TTL = 180
+
+# Seconds a unified digest is reused for every user with the same language and topics
+DIGEST_TTL = 300
+
+# Seconds a ChatGPT news enhancement is reused for the same topic, language and set of articles
+ENHANCED_NEWS_TTL = 600
+ENHANCED_NEWS_CACHE_SIZE = 256
+
+# Output budget for the JSON asset answer (7 short entries); metals have longer names and units
+TOPIC_ASSETS_MAX_TOKENS = 300
+TOPIC_ASSETS_MAX_TOKENS_METALS = 450
+# Output budget for the JSON unified digest (up to 5 headlines, assets and a forecast)
+DIGEST_MAX_TOKENS = 500
+
+# ChatGPT requests per minute across the whole bot (the SDK itself retries 429s with Retry-After)
+OPENAI_REQUESTS_PER_MINUTE = 60
+# ChatGPT requests in flight at once, so a cold digest cache doesn't fire every segment in parallel
+OPENAI_CONCURRENCY = 5
+# Seconds a ChatGPT request may take (the SDK default is 10 minutes), and the keep-alive pool to api.openai.com
+OPENAI_TIMEOUT = httpx.Timeout(45.0, connect=5.0)
+OPENAI_CONNECTION_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=60)
+
+# Longest the scheduler sleeps between checks, so wall-clock jumps are noticed within the hour
+SCHEDULER_MAX_SLEEP = 3600
+
+# Timezone of every scheduled time below, independent of the host's local timezone
+MARKET_TIMEZONE = ZoneInfo('America/New_York')
+
+# (market, action, New York time) for weekday market notifications
+MARKET_NOTIFICATION_TIMES = (
+    # NYSE/NASDAQ (US Markets)
+    ("NYSE", "open", "09:15"),
+    ("NYSE", "close", "16:15"),
+)
+
+# English -> Russian keywords for the offline fallback in translate_news_content
+FALLBACK_TRANSLATIONS = {
+    # Market terms
+    'gain': 'рост',
+    'rise': 'подъем',
+    'up': 'вверх',
+    'bull': 'бычий',
+    'growth': 'рост',
+    'profit': 'прибыль',
+    'surge': 'всплеск',
+    'rally': 'ралли',
+    'boom': 'бум',
+    'strong': 'сильный',
+    'beat': 'превзойти',
+    'exceed': 'превысить',
+    'positive': 'позитивный',
+    'upgrade': 'повышение',
+    'buy': 'покупка',
+    'optimistic': 'оптимистичный',
+    'fall': 'падение',
+    'drop': 'снижение',
+    'down': 'вниз',
+    'bear': 'медвежий',
+    'loss': 'потери',
+    'crash': 'крах',
+    'decline': 'снижение',
+    'recession': 'рецессия',
+    'slump': 'спад',
+    'weak': 'слабый',
+    'miss': 'пропустить',
+    'disappointing': 'разочаровывающий',
+    'negative': 'негативный',
+    'downgrade': 'понижение',
+    'sell': 'продажа',
+    'pessimistic': 'пессимистичный',
+    
+    # Sectors
+    'technology': 'технологии',
+    'tech': 'технологии',
+    'energy': 'энергия',
+    'finance': 'финансы',
+    'healthcare': 'здравоохранение',
+    'crypto': 'криптовалюта',
+    'inflation': 'инфляция',
+    'fed': 'ФРС',
+    'interest': 'процентная ставка',
+    'earnings': 'доходы',
+    'china': 'Китай',
+    'europe': 'Европа',
+    'jobs': 'рабочие места',
+    'gdp': 'ВВП',
+    
+    # Common words
+    'the': 'the',  # Keep articles
+    'and': 'и',
+    'or': 'или',
+    'but': 'но',
+    'in': 'в',
+    'on': 'на',
+    'at': 'в',
+    'to': 'к',
+    'for': 'для',
+    'with': 'с',
+    'by': 'от',
+    'from': 'от',
+    'about': 'о',
+    'market': 'рынок',
+    'stock': 'акция',
+    'shares': 'акции',
+    'trading': 'торговля',
+    'investor': 'инвестор',
+    'company': 'компания',
+    'business': 'бизнес',
+    'economy': 'экономика',
+    'financial': 'финансовый',
+    'economic': 'экономический',
+    'global': 'глобальный',
+    'world': 'мир',
+    'news': 'новости',
+    'report': 'отчет',
+    'data': 'данные',
+    'quarter': 'квартал',
+    'year': 'год',
+    'month': 'месяц',
+    'week': 'неделя',
+    'day': 'день',
+    'today': 'сегодня',
+    'yesterday': 'вчера',
+    'tomorrow': 'завтра',
+    'morning': 'утро',
+    'afternoon': 'день',
+    'evening': 'вечер',
+    'night': 'ночь',
+    'time': 'время',
+    'price': 'цена',
+    'value': 'стоимость',
+    'increase': 'увеличение',
+    'decrease': 'уменьшение',
+    'high': 'высокий',
+    'low': 'низкий',
+    'new': 'новый',
+    'old': 'старый',
+    'big': 'большой',
+    'small': 'маленький',
+    'good': 'хороший',
+    'bad': 'плохой',
+    'important': 'важный',
+    'major': 'крупный',
+    'minor': 'незначительный'
+}
+
+def trie_pattern(words) -> str:
+    """Regex alternation for `words` factored into a prefix trie
+    
+    Each position tries at most one branch per next character instead of
+    every word in turn, so the scan cost barely grows with the word list.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = '(?:' + '|'.join(branches) + ')' if len(branches) > 1 or '' in node else branches[0]
+        return pattern + '?' if '' in node else pattern
+    
+    return build(trie)
+
+# All keywords in one trie-shaped pattern, so the text is scanned once
+FALLBACK_TRANSLATION_RE = re.compile(r'\b' + trie_pattern(FALLBACK_TRANSLATIONS) + r'\b', re.IGNORECASE)
+
+# One match per enhanced story in a ChatGPT reply; impact and insights must appear before the next story starts
+ENHANCED_NEWS_RE = re.compile(
+    r'Enhanced Summary:\s*(?P<summary>[^\n]+)'
+    r'(?:(?:(?!Title:|Enhanced Summary:).)*?Market Impact:\s*(?P<impact>[^\n]+))?'
+    r'(?:(?:(?!Title:|Enhanced Summary:).)*?Key Insights:\s*(?P<insights>[^\n]+))?',
+    re.DOTALL
+)
+
+# News sources RSS feeds (with fallback options)
+NEWS_SOURCES = {
+    'Yahoo Finance': 'https://feeds.finance.yahoo.com/rss/2.0/headline',
+    'MarketWatch': 'https://feeds.marketwatch.com/marketwatch/topstories/',
+    'CNBC': 'https://www.cnbc.com/id/100003114/device/rss/rss.html',
+    'Reuters Business': 'https://feeds.reuters.com/reuters/businessNews',
+    'Bloomberg': 'https://feeds.bloomberg.com/markets/news.rss',
+    'Financial Times': 'https://www.ft.com/rss/home/us',
+    'Seeking Alpha': 'https://seekingalpha.com/feed.xml',
+    'Investing.com': 'https://www.investing.com/rss/news_301.rss',
+    'Barron\'s': 'https://www.barrons.com/feed',
+    'Wall Street Journal': 'https://feeds.a.dj.com/rss/RSSMarketsMain.xml'
+}
+
+# Alternative RSS feeds that are more reliable
+FALLBACK_SOURCES = {
+    'Yahoo Finance Alt': 'https://feeds.finance.yahoo.com/rss/2.0/headline',
+    'MarketWatch Alt': 'https://feeds.marketwatch.com/marketwatch/topstories/',
+    'CNBC Alt': 'https://www.cnbc.com/id/100003114/device/rss/rss.html',
+    'Reuters Alt': 'https://feeds.reuters.com/reuters/businessNews',
+    'Bloomberg Alt': 'https://feeds.bloomberg.com/markets/news.rss'
+}
+
+# Market schedule for notifications
+MARKET_SCHEDULE = {
+    'NYSE': {'open': '09:30', 'close': '16:00', 'timezone': 'America/New_York'},
+    'NASDAQ': {'open': '09:30', 'close': '16:00', 'timezone': 'America/New_York'},
+    'LSE': {'open': '08:00', 'close': '16:30', 'timezone': 'Europe/London'},
+    'TSE': {'open': '09:00', 'close': '15:30', 'timezone': 'Asia/Tokyo'},
+    'HKEX': {'open': '09:30', 'close': '16:00', 'timezone': 'Asia/Hong_Kong'}
+}
+
+# Major stocks to track for price changes
+MAJOR_STOCKS = {
+    'AAPL': 'Apple Inc.',
+    'MSFT': 'Microsoft Corporation',
+    'GOOGL': 'Alphabet Inc.',
+    'AMZN': 'Amazon.com Inc.',
+    'TSLA': 'Tesla Inc.',
+    'NVDA': 'NVIDIA Corporation',
+    'META': 'Meta Platforms Inc.',
+    'BRK.A': 'Berkshire Hathaway Inc.',
+    'JPM': 'JPMorgan Chase & Co.',
+    'JNJ': 'Johnson & Johnson'
+}
+
+# Topic-specific keywords (lowercase) for filtering news, per topic and language
+TOPIC_KEYWORDS = {
+    'all': {
+        'en': ['market', 'stock', 'economy', 'financial', 'trading', 'investment', 'earnings', 'revenue', 'profit', 'growth', 'company', 'business', 'industry', 'sector', 'price', 'index', 'dow', 'nasdaq', 'sp500', 'fed', 'inflation', 'interest', 'rate', 'oil', 'gas', 'gold', 'silver', 'tech', 'bank', 'energy', 'mining'],
+        'ru': ['рынок', 'акции', 'экономика', 'финансы', 'торговля', 'инвестиции', 'доходы', 'выручка', 'прибыль', 'рост', 'компания', 'бизнес', 'отрасль', 'сектор', 'цена', 'индекс', 'dow', 'nasdaq', 'sp500', 'фрс', 'инфляция', 'процент', 'ставка', 'нефть', 'газ', 'золото', 'серебро', 'технологии', 'банк', 'энергия', 'добыча']
+    },
+    'oil_gas': {
+        'en': ['oil', 'gas', 'energy', 'petroleum', 'crude', 'brent', 'wti', 'opec', 'pipeline', 'refinery', 'exxon', 'chevron', 'shell', 'bp', 'energy', 'fuel', 'drilling', 'shale'],
+        'ru': ['нефть', 'газ', 'энергия', 'нефтепродукты', 'сырая', 'брент', 'wti', 'опек', 'трубопровод', 'нефтепереработка', 'эксон', 'шеврон', 'шелл', 'бп', 'энергия', 'топливо', 'бурение', 'сланцы']
+    },
+    'metals_mining': {
+        'en': ['gold', 'silver', 'copper', 'aluminum', 'nickel', 'zinc', 'platinum', 'palladium', 'mining', 'commodity', 'ore', 'mineral', 'bhp', 'rio tinto', 'vale', 'glencore', 'mining', 'extraction'],
+        'ru': ['золото', 'серебро', 'медь', 'алюминий', 'никель', 'цинк', 'платина', 'палладий', 'добыча', 'сырье', 'руда', 'минерал', 'bhp', 'rio tinto', 'vale', 'glencore', 'добыча', 'извлечение']
+    },
+    'technology': {
+        'en': ['tech', 'technology', 'ai', 'artificial intelligence', 'semiconductor', 'chip', 'software', 'digital', 'innovation', 'apple', 'microsoft', 'google', 'amazon', 'meta', 'tesla', 'nvidia', 'amd', 'intel'],
+        'ru': ['технологии', 'искусственный интеллект', 'полупроводники', 'чип', 'программное обеспечение', 'цифровой', 'инновации', 'apple', 'microsoft', 'google', 'amazon', 'meta', 'tesla', 'nvidia', 'amd', 'intel']
+    },
+    'finance': {
+        'en': ['bank', 'banking', 'financial', 'finance', 'credit', 'loan', 'mortgage', 'interest rate', 'federal reserve', 'fed', 'jpmorgan', 'goldman', 'morgan stanley', 'credit suisse', 'ubs', 'regulation', 'compliance'],
+        'ru': ['банк', 'банковское дело', 'финансы', 'кредит', 'ссуда', 'ипотека', 'процентная ставка', 'федеральная резервная система', 'фрс', 'jpmorgan', 'goldman', 'morgan stanley', 'credit suisse', 'ubs', 'регулирование', 'соответствие']
+    }
+}
+
+def build_keyword_index(topic_keywords: Dict[str, Dict[str, List[str]]]) -> Dict[str, Tuple[Tuple[str, str], ...]]:
+    """Map each distinct keyword to the (topic, language) lists containing it, once per occurrence"""
+    index = {}
+    for topic, by_language in topic_keywords.items():
+        for language, keywords in by_language.items():
+            for keyword in keywords:
+                index.setdefault(keyword, []).append((topic, language))
+    return {keyword: tuple(keys) for keyword, keys in index.items()}
+
+# Keyword -> (topic, language) pairs, so one pass scores every topic; single words and phrases are matched differently
+TOPIC_KEYWORD_INDEX = build_keyword_index(TOPIC_KEYWORDS)
+TOPIC_WORD_INDEX = {keyword: keys for keyword, keys in TOPIC_KEYWORD_INDEX.items() if ' ' not in keyword}
+TOPIC_PHRASE_INDEX = {keyword: keys for keyword, keys in TOPIC_KEYWORD_INDEX.items() if ' ' in keyword}
+TOPIC_SCORE_KEYS = tuple((topic, language) for topic, by_language in TOPIC_KEYWORDS.items() for language in by_language)
+
+# Asset classes ChatGPT is asked to price, per topic and language
+TOPIC_ASSET_DESCRIPTIONS = {
+    'all': {
+        'en': 'stocks, commodities, and major market indices',
+        'ru': 'акции, сырьевые товары и основные рыночные индексы'
+    },
+    'oil_gas': {
+        'en': 'oil prices (WTI, Brent), natural gas, major oil companies, and energy ETFs',
+        'ru': 'цены на нефть (WTI, Brent), природный газ, крупные нефтяные компании и энергетические ETF'
+    },
+    'metals_mining': {
+        'en': 'precious metals (gold, silver, platinum), industrial metals (copper, aluminum, nickel), mining companies, and commodity ETFs',
+        'ru': 'драгоценные металлы (золото, серебро, платина), промышленные металлы (медь, алюминий, никель), горнодобывающие компании и товарные ETF'
+    },
+    'technology': {
+        'en': 'major tech stocks, semiconductor companies, software firms, and tech ETFs',
+        'ru': 'крупные технологические акции, компании-производители полупроводников, программные фирмы и технологические ETF'
+    },
+    'finance': {
+        'en': 'major banks, financial services companies, insurance firms, and financial ETFs',
+        'ru': 'крупные банки, компании финансовых услуг, страховые фирмы и финансовые ETF'
+    }
+}
+
+# Base prices for generated fallback quotes when ChatGPT research fails
+FALLBACK_ASSET_PRICES = {
+    'all': {
+        'AAPL': 150.0, 'MSFT': 300.0, 'GOOGL': 120.0, 'AMZN': 140.0, 'TSLA': 250.0
+    },
+    'oil_gas': {
+        'WTI': 75.0, 'BRENT': 80.0, 'XOM': 100.0, 'CVX': 150.0, 'NGAS': 3.5
+    },
+    'metals_mining': {
+        'GOLD': 1950.0, 'SILVER': 25.0, 'COPPER': 4.2, 'PLAT': 950.0, 'NICKEL': 20.0
+    },
+    'technology': {
+        'NVDA': 400.0, 'META': 200.0, 'NFLX': 450.0, 'ADBE': 500.0, 'CRM': 200.0
+    },
+    'finance': {
+        'JPM': 160.0, 'BAC': 30.0, 'WFC': 45.0, 'GS': 350.0, 'MS': 85.0
+    }
+}
+
+# Sector name used in the ChatGPT news-enhancement prompt, per topic and language
+TOPIC_SECTOR_NAMES = {
+    'all': {'en': 'general financial markets', 'ru': 'общие финансовые рынки'},
+    'oil_gas': {'en': 'oil and gas sector', 'ru': 'нефтегазовый сектор'},
+    'metals_mining': {'en': 'metals and mining sector', 'ru': 'металлургия и добыча'},
+    'technology': {'en': 'technology sector', 'ru': 'технологический сектор'},
+    'finance': {'en': 'finance and banking sector', 'ru': 'финансовый и банковский сектор'}
+}
+
+# Keywords for analyze_news_sentiment (lowercase; matched as substrings of the lowercased text)
+POSITIVE_KEYWORDS = ('gain', 'rise', 'up', 'bull', 'growth', 'profit', 'surge', 'rally', 'boom',
+                     'strong', 'beat', 'exceed', 'positive', 'upgrade', 'buy', 'optimistic')
+NEGATIVE_KEYWORDS = ('fall', 'drop', 'down', 'bear', 'loss', 'crash', 'decline', 'recession',
+                     'slump', 'weak', 'miss', 'disappointing', 'negative', 'downgrade', 'sell', 'pessimistic')
+TRENDING_WORDS = ('inflation', 'fed', 'interest', 'earnings', 'china', 'europe', 'jobs', 'gdp')
+SECTOR_KEYWORDS = {
+    'tech': ('technology', 'tech', 'apple', 'microsoft', 'google', 'amazon', 'meta', 'tesla', 'nvidia'),
+    'energy': ('oil', 'gas', 'energy', 'exxon', 'chevron', 'renewable'),
+    'finance': ('bank', 'finance', 'jpmorgan', 'goldman', 'credit', 'loan'),
+    'healthcare': ('health', 'pharma', 'drug', 'medical', 'pfizer', 'johnson'),
+    'crypto': ('bitcoin', 'crypto', 'ethereum', 'blockchain', 'digital currency')
+}
+
+# Topic definitions
+AVAILABLE_TOPICS = {
+    'all': {
+        'en': 'All Topics',
+        'ru': 'Все темы'
+    },
+    'oil_gas': {
+        'en': 'Oil & Gas',
+        'ru': 'Нефть и газ'
+    },
+    'metals_mining': {
+        'en': 'Metals & Mining',
+        'ru': 'Металлы и добыча'
+    },
+    'technology': {
+        'en': 'Technology',
+        'ru': 'Технологии'
+    },
+    'finance': {
+        'en': 'Finance & Banking',
+        'ru': 'Финансы и банкинг'
+    }
+}
+
+# UI strings per language, shared by every bot instance
+TRANSLATIONS = {
+    'en': {
+        'welcome_title': 'Кофе и Котировки',
+        'welcome_message': 'Welcome, {name}! I am your personal financial markets news assistant.',
+        'what_i_do': 'What I offer:',
+        'daily_news': 'Daily market news summaries from leading financial sources',
+        'sentiment_analysis': 'AI-powered market sentiment analysis',
+        'predictions': 'Trending topics and market predictions',
+        'auto_updates': 'Automatic daily updates (9:00 AM & 9:30 AM ET)',
+        'commands': 'Commands:',
+        'news_cmd': '/news - Get latest market news',
+        'notify_cmd': '/notify - Manually trigger notifications for all subscribers (Admin only)',
+        'subscribe_cmd': '/subscribe - Enable daily news updates',
+        'unsubscribe_cmd': '/unsubscribe - Disable daily updates',
+        'language_cmd': '/language - Choose language with buttons',
+        'topics_cmd': '/topics - Choose topics of interest',
+        'help_cmd': '/help - Show all commands',
+        'status_cmd': '/status - Check bot and market status',
+        'stats_cmd': '/stats - View bot usage statistics',
+        'admin_features': 'Admin Features:',
+        'first_user_admin': 'First user automatically becomes admin',
+        'addadmin_info': 'Use /addadmin to grant admin access to others',
+        'notify_info': 'Admins can trigger manual notifications anytime',
+        'auto_subscribe': 'Auto-Subscribe:',
+        'subscribed_message': 'You\'re automatically subscribed to daily updates! Use /unsubscribe if you want to disable them.',
+        'ready_message': 'Ready to stay informed about the markets? Try /news to get started!',
+        'daily_intelligence': 'DAILY STOCK MARKET INTELLIGENCE',
+        'market_sentiment': 'MARKET SENTIMENT ANALYSIS',
+        'positive_news': 'Positive News',
+        'negative_news': 'Negative News',
+        'neutral_news': 'Neutral News',
+        'articles': 'articles',
+        'top_headlines': 'TOP MARKET HEADLINES',
+        'market_predictions': 'MARKET PREDICTIONS & ANALYSIS',
+        'digest_title': 'MARKET DIGEST',
+        'digest_top_news': 'TOP NEWS BY TOPIC',
+        'digest_key_assets': 'KEY ASSETS',
+        'digest_forecasts': 'FORECASTS & TRENDS',
+        'market_outlook': 'Market Outlook',
+        'key_focus': 'Key Focus Areas:',
+        'sector_spotlight': 'Sector Spotlight:',
+        'trading_considerations': 'Trading Considerations:',
+        'risk_level': 'Risk Level',
+        'reminder': 'Reminder: Analysis based on news sentiment. Not financial advice. Always do your own research.',
+        'manual_notification': 'MANUAL NOTIFICATION TRIGGERED',
+        'notification_success': 'Manual Notification Sent Successfully!',
+        'results': 'Results:',
+        'successfully_sent': 'Successfully sent to',
+        'failed_to_send': 'Failed to send',
+        'total_subscribers': 'Total subscribers',
+        'sent_at': 'Sent at',
+        'all_notified': 'All subscribed users have been notified with the latest market news and predictions.',
+        'access_denied': 'Access Denied',
+        'admin_only': 'Only administrators can trigger manual notifications.',
+        'contact_admin': 'Contact the bot administrator to request access.',
+        'language_selection': 'Language Selection',
+        'choose_language': 'Please choose your preferred language:',
+        'english': 'English',
+        'russian': 'Russian',
+        'language_changed': 'Language changed successfully!',
+        'current_language': 'Current language',
+        'topics_cmd': '/topics - Choose topics of interest',
+        'topic_selection': 'Choose topics that interest you:',
+        'topic_all': 'All Topics',
+        'topic_oil_gas': 'Oil & Gas',
+        'topic_metals_mining': 'Metals & Mining',
+        'topic_technology': 'Technology',
+        'topic_finance': 'Finance & Banking',
+        'topics_updated': 'Your topics have been updated!',
+        'current_topics': 'Your current topics:',
+        'no_subscribers': 'No subscribers found to notify.',
+        'fetching_news': 'Fetching latest market news and analysis...',
+        'error_fetching': 'Sorry, there was an error fetching the news. Our team has been notified. Please try again in a few minutes.',
+        'error_notification': 'Sorry, I couldn\'t send the notification right now. Please try again later.',
+        'no_news': 'Unable to fetch news at this time. Please try again later.',
+        'no_users': 'No users found.',
+        'user_count': 'User count',
+        'subscriber_count': 'Subscriber count',
+        'bot_health': 'Bot Health:',
+        'status_operational': 'Status: Fully operational',
+        'news_sources': 'News Sources',
+        'active': 'active',
+        'database': 'Database: Connected',
+        'updates': 'Updates: Real-time',
+        'today_summary': 'Today\'s Summary:',
+        'available': 'Available',
+        'generating': 'Generating...',
+        'use_news': 'Use /news to get the latest market analysis!',
+        'market_open_title': '🚀 **{market} Opening**',
+        'market_open_subtitle': 'Market opens in 15 minutes',
+        'market_open_header': '📈 **Key Assets:**',
+        'market_close_title': '🔚 **{market} Closing**',
+        'market_close_subtitle': 'Market closed 15 minutes ago',
+        'market_close_header': '📊 **Trading Summary:**',
+        'market_price': 'Price',
+        'market_time': 'Time'
+    },
+    'ru': {
+        'welcome_title': 'Кофе и Котировки',
+        'welcome_message': 'Привет {name}! Я ваш личный помощник по новостям рынка акций.',
+        'what_i_do': 'Что я делаю:',
+        'daily_news': 'Ежедневные сводки новостей рынка от ведущих финансовых источников',
+        'sentiment_analysis': 'Анализ настроений рынка на основе ИИ',
+        'predictions': 'Трендовые темы и прогнозы рынка',
+        'auto_updates': 'Автоматические ежедневные обновления (9:00 AM и 9:30 AM ET)',
+        'commands': 'Команды:',
+        'news_cmd': '/news - Получить последние новости рынка',
+        'notify_cmd': '/notify - Вручную отправить уведомления всем подписчикам (только для админов)',
+        'subscribe_cmd': '/subscribe - Включить ежедневные обновления новостей',
+        'unsubscribe_cmd': '/unsubscribe - Отключить ежедневные обновления',
+        'language_cmd': '/language - Выбрать язык кнопками',
+        'help_cmd': '/help - Показать все команды',
+        'status_cmd': '/status - Проверить статус бота и рынка',
+        'stats_cmd': '/stats - Просмотр статистики использования бота',
+        'admin_features': 'Функции администратора:',
+        'first_user_admin': 'Первый пользователь автоматически становится администратором',
+        'addadmin_info': 'Используйте /addadmin для предоставления прав администратора другим',
+        'notify_info': 'Администраторы могут вручную отправлять уведомления в любое время',
+        'auto_subscribe': 'Автоподписка:',
+        'subscribed_message': 'Вы автоматически подписаны на ежедневные обновления! Используйте /unsubscribe, если хотите их отключить.',
+        'ready_message': 'Готовы быть в курсе событий на рынках? Попробуйте /news для начала!',
+        'daily_intelligence': 'ЕЖЕДНЕВНАЯ РАЗВЕДКА РЫНКА АКЦИЙ',
+        'market_sentiment': 'АНАЛИЗ НАСТРОЕНИЙ РЫНКА',
+        'positive_news': 'Позитивные новости',
+        'negative_news': 'Негативные новости',
+        'neutral_news': 'Нейтральные новости',
+        'articles': 'статей',
+        'top_headlines': 'ГЛАВНЫЕ НОВОСТИ РЫНКА',
+        'market_predictions': 'ПРОГНОЗЫ И АНАЛИЗ РЫНКА',
+        'digest_title': 'РЫНОЧНЫЙ ДАЙДЖЕСТ',
+        'digest_top_news': 'ГЛАВНЫЕ НОВОСТИ ПО ТЕМЕ',
+        'digest_key_assets': 'КЛЮЧЕВЫЕ АКТИВЫ',
+        'digest_forecasts': 'ПРОГНОЗЫ И ТЕНДЕНЦИИ',
+        'market_outlook': 'Прогноз рынка',
+        'key_focus': 'Ключевые области внимания:',
+        'sector_spotlight': 'В центре внимания сектора:',
+        'trading_considerations': 'Соображения по торговле:',
+        'risk_level': 'Уровень риска',
+        'reminder': 'Напоминание: Анализ основан на настроениях новостей. Не является финансовой консультацией. Всегда проводите собственное исследование.',
+        'manual_notification': 'ВРУЧНУЮ ЗАПУЩЕНО УВЕДОМЛЕНИЕ',
+        'notification_success': 'Ручное уведомление успешно отправлено!',
+        'results': 'Результаты:',
+        'successfully_sent': 'Успешно отправлено',
+        'failed_to_send': 'Не удалось отправить',
+        'total_subscribers': 'Всего подписчиков',
+        'sent_at': 'Отправлено в',
+        'all_notified': 'Все подписчики получили уведомления с последними новостями рынка и прогнозами.',
+        'access_denied': 'Доступ запрещен',
+        'admin_only': 'Только администраторы могут запускать ручные уведомления.',
+        'contact_admin': 'Обратитесь к администратору бота для получения доступа.',
+        'language_selection': 'Выбор языка',
+        'choose_language': 'Пожалуйста, выберите предпочитаемый язык:',
+        'english': 'Английский',
+        'russian': 'Русский',
+        'language_changed': 'Язык успешно изменен!',
+        'current_language': 'Текущий язык',
+        'topics_cmd': '/topics - Выбрать интересующие темы',
+        'topic_selection': 'Выберите интересующие вас темы:',
+        'topic_all': 'Все темы',
+        'topic_oil_gas': 'Нефть и газ',
+        'topic_metals_mining': 'Металлы и добыча',
+        'topic_technology': 'Технологии',
+        'topic_finance': 'Финансы и банкинг',
+        'topics_updated': 'Ваши темы обновлены!',
+        'current_topics': 'Ваши текущие темы:',
+        'no_subscribers': 'Подписчики не найдены для уведомления.',
+        'fetching_news': 'Получение последних новостей рынка и анализа...',
+        'error_fetching': 'Извините, произошла ошибка при получении новостей. Наша команда уведомлена. Пожалуйста, попробуйте снова через несколько минут.',
+        'error_notification': 'Извините, не удалось отправить уведомление прямо сейчас. Пожалуйста, попробуйте снова позже.',
+        'no_news': 'Не удалось получить новости в данный момент. Пожалуйста, попробуйте снова позже.',
+        'no_users': 'Пользователи не найдены.',
+        'user_count': 'Количество пользователей',
+        'subscriber_count': 'Количество подписчиков',
+        'bot_health': 'Состояние бота:',
+        'status_operational': 'Статус: Полностью работает',
+        'news_sources': 'Источники новостей',
+        'active': 'активны',
+        'database': 'База данных: Подключена',
+        'updates': 'Обновления: В реальном времени',
+        'today_summary': 'Сегодняшняя сводка:',
+        'available': 'Доступна',
+        'generating': 'Генерируется...',
+        'use_news': 'Используйте /news для получения последнего анализа рынка!',
+        'market_open_title': '🚀 **{market} открывается**',
+        'market_open_subtitle': 'Рынок открывается через 15 минут',
+        'market_open_header': '📈 **Ключевые активы:**',
+        'market_close_title': '🔚 **{market} закрывается**',
+        'market_close_subtitle': 'Рынок закрылся 15 минут назад',
+        'market_close_header': '📊 **Итоги торгов:**',
+        'market_price': 'Цена',
+        'market_time': 'Время'
+    }
+}
+
+def render_welcome_template(texts: Dict[str, str]) -> str:
+    """Render the /start message for one language; only {name} is left to fill in"""
+    return f"""
+🤖 **{texts['welcome_title']}** 🤖
+
+{texts['welcome_message']}
+
+**🚀 {texts['what_i_do']}**
+📈 {texts['daily_news']}
+🔮 {texts['sentiment_analysis']}
+📊 {texts['predictions']}
+⏰ {texts['auto_updates']}
+🕐 Market open/close notifications with stock prices
+
+**📱 {texts['commands']}**
+{texts['news_cmd']}
+{texts['topics_cmd']}
+{texts['notify_cmd']}
+{texts['subscribe_cmd']}
+{texts['unsubscribe_cmd']}
+{texts['language_cmd']}
+{texts['help_cmd']}
+{texts['status_cmd']}
+{texts['stats_cmd']}
+
+**🔐 {texts['admin_features']}**
+• {texts['first_user_admin']}
+• {texts['addadmin_info']}
+• {texts['notify_info']}
+• /testmarket - Test market notifications
+
+**🔔 {texts['auto_subscribe']}**
+{texts['subscribed_message']}
+
+{texts['ready_message']} 📊
+        """
+
+def render_help_text(texts: Dict[str, str]) -> str:
+    """Render the /help message for one language"""
+    return f"""
+**📚 {texts['welcome_title']} - Help**
+
+**🔧 {texts['commands']}**
+
+/start - Welcome message and bot introduction
+/news - {texts['news_cmd']}
+/topics - {texts['topics_cmd']}
+/notify - {texts['notify_cmd']}
+/subscribe - {texts['subscribe_cmd']}
+/unsubscribe - {texts['unsubscribe_cmd']}
+/language - {texts['language_cmd']}
+/help - {texts['help_cmd']}
+/status - {texts['status_cmd']}
+/stats - {texts['stats_cmd']}
+
+**🔐 Admin Commands:**
+/addadmin <user_id> - Add a new admin user (Admin only)
+/testmarket - Test market notifications (Admin only)
+/testchatgpt - Test ChatGPT integration (Admin only)
+
+**⏰ Automatic Features:**
+• Daily market summary at 9:00 AM ET
+• Market opening summary at 9:30 AM ET (weekdays)
+• **NEW: Market notifications 15 min before/after open/close**
+• **NEW: Major stock price changes included in notifications**
+• News from 10+ major financial sources
+• Sentiment analysis and trend detection
+• Market predictions based on news analysis
+
+**📊 News Sources:**
+• Yahoo Finance
+• MarketWatch  
+• CNBC
+• Reuters Business
+• Bloomberg
+• Financial Times
+• Seeking Alpha
+• Investing.com
+• Barron's
+• Wall Street Journal
+
+**💡 Tips:**
+- Use /news anytime for the latest market summary
+- Subscribe for automatic daily updates
+- Check /status for current market sentiment
+- All predictions are for educational purposes only
+
+**⚠️ Disclaimer:** This bot provides news summaries and analysis for informational purposes only. Not financial advice.
+
+Need help? The bot is fully automated and runs 24/7!
+        """
+
+# /start and /help texts per language, rendered once instead of per command
+WELCOME_TEMPLATES = {language: render_welcome_template(texts) for language, texts in TRANSLATIONS.items()}
+HELP_TEXTS = {language: render_help_text(texts) for language, texts in TRANSLATIONS.items()}
+
+def render_summary_header_template(texts: Dict[str, str]) -> str:
+    """Render the daily summary header for one language, leaving the figures as str.format fields"""
+    return f"""
+📊 **{texts['daily_intelligence']}**
+📅 {{timestamp}}
+
+**📈 {texts['market_sentiment']}**
+• {texts['positive_news']}: {{positive}} {texts['articles']} ({{positive_pct:.1f}}%)
+• {texts['negative_news']}: {{negative}} {texts['articles']} ({{negative_pct:.1f}}%)
+• {texts['neutral_news']}: {{neutral}} {texts['articles']} ({{neutral_pct:.1f}}%)
+
+**🚨 {texts['top_headlines']}**
+"""
+
+# Summary headers with every translated label baked in; per summary only the figures are filled in
+SUMMARY_HEADER_TEMPLATES = {language: render_summary_header_template(texts) for language, texts in TRANSLATIONS.items()}
+
+def render_digest(texts: Dict[str, str], digest: Dict[str, any]) -> str:
+    """Render ChatGPT's JSON digest as the Markdown message, skipping malformed entries
+    
+    Every model-written field is escaped: one stray `_` or `*` would make Telegram reject
+    the digest for the whole (language, topics) segment.
+    """
+    def md(value) -> str:
+        return escape_markdown(str(value), version=1)
+    
+    parts = [f"📊 **{texts['digest_title']}** 📊\n\n📰 **{texts['digest_top_news']}**\n"]
+    for headline in (digest.get('headlines') or ())[:5]:
+        if not isinstance(headline, dict) or not headline.get('title'):
+            continue
+        impact = f" — {md(headline['impact'])}" if headline.get('impact') else ""
+        link = f"\n  {md(headline['url'])}" if headline.get('url') else ""
+        parts.append(f"• *{md(headline['title'])}*{impact}{link}\n")
+    
+    asset_lines = [
+        f"• **{md(asset['symbol'])}**: {md(asset.get('trend') or '')}\n"
+        for asset in (digest.get('assets') or ())[:7]
+        if isinstance(asset, dict) and asset.get('symbol')
+    ]
+    if asset_lines:
+        parts.append(f"\n📈 **{texts['digest_key_assets']}**\n")
+        parts.extend(asset_lines)
+    
+    if digest.get('forecast'):
+        parts.append(f"\n🔮 **{texts['digest_forecasts']}**\n{md(digest['forecast'])}\n")
+    return ''.join(parts)
+
+def render_topic_keyboard(language: str, selected: str) -> InlineKeyboardMarkup:
+    """Build the /topics keyboard for one language, with the selected topic ticked"""
+    buttons = [
+        InlineKeyboardButton(
+            # Mark current selection
+            f"✅ {topic_names.get(language, topic_names['en'])}" if topic_key == selected else topic_names.get(language, topic_names['en']),
+            callback_data=f"topic_{topic_key}"
+        )
+        for topic_key, topic_names in AVAILABLE_TOPICS.items()
+    ]
+    # 2 buttons per row; the last row may hold one
+    return InlineKeyboardMarkup([buttons[i:i + 2] for i in range(0, len(buttons), 2)])
+
+# Every (language, selected topic) keyboard, built once; handlers just pick one
+TOPIC_KEYBOARDS = {
+    (language, selected): render_topic_keyboard(language, selected)
+    for language in TRANSLATIONS
+    for selected in AVAILABLE_TOPICS
+}
+
+def truncate(text: str, limit: int = 100) -> str:
+    """text cut to `limit` characters, with '...' appended only when something was cut"""
+    return text if len(text) <= limit else text[:limit] + '...'
+
+def percentage(count: int, total: int) -> float:
+    """count as a percentage of total; 0.0 when there is nothing to count"""
+    return count * 100 / total if total else 0.0
+
+def chat_unreachable(error: Exception) -> bool:
+    """True for permanent send failures: bot blocked, account deactivated, chat not found"""
+    if isinstance(error, Forbidden):
+        return True
+    return isinstance(error, BadRequest) and 'chat not found' in error.message.lower()
+
+def is_mostly_cyrillic(text: str) -> bool:
+    """Cheap language guess: True when most letters in the text are Cyrillic"""
+    letters = cyrillic = 0
+    for ch in text:
+        if ch.isalpha():
+            letters += 1
+            if '\u0400' <= ch <= '\u04FF':
+                cyrillic += 1
+    return cyrillic * 2 > letters
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of the words in `text`; near-identical texts get hashes a few bits apart"""
+    weights = [0] * 64
+    for token in re.findall(r'\w+', text.lower()):
+        token_hash = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += 1 if token_hash >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+def drop_near_duplicates(news_items: List['NewsItem']) -> List['NewsItem']:
+    """Keep the first of each group of near-duplicate items (syndicated copies)"""
+    kept, hashes = [], []
+    for item in news_items:
+        item_hash = simhash(item.search_text)
+        if any(bin(item_hash ^ seen).count('1') <= SIMHASH_MAX_DISTANCE for seen in hashes):
+            continue
+        kept.append(item)
+        hashes.append(item_hash)
+    return kept
+
+WORD_RE = re.compile(r'\w+')
+
+def score_topics(text: str) -> Dict[Tuple[str, str], int]:
+    """Keyword relevance of a lowercased text for every (topic, language) at once
+    
+    Keywords match whole words only ('oil' not in 'toilet', 'ai' not in 'said');
+    a trailing plural 's' is ignored so 'stocks' still counts for 'stock'.
+    """
+    tokens = WORD_RE.findall(text)
+    words = set(tokens)
+    words.update(token[:-1] for token in tokens if len(token) > 3 and token[-1] == 's')
+    
+    scores = dict.fromkeys(TOPIC_SCORE_KEYS, 0)
+    for word in words:
+        for key in TOPIC_WORD_INDEX.get(word, ()):
+            scores[key] += 1
+    
+    if TOPIC_PHRASE_INDEX:
+        # Phrases are checked against the tokens re-joined by single spaces, padded so both ends are word boundaries
+        joined = ' ' + ' '.join(tokens) + ' '
+        for phrase, keys in TOPIC_PHRASE_INDEX.items():
+            if f' {phrase} ' in joined or f' {phrase}s ' in joined:
+                for key in keys:
+                    scores[key] += 1
+    return scores
+
+def scan_sentiment(text: str) -> Tuple[str, Tuple[str, ...], Tuple[str, ...]]:
+    """(sentiment, trending words, sectors) found in a lowercased text"""
+    # Count sentiment
+    pos_score = sum(1 for word in POSITIVE_KEYWORDS if word in text)
+    neg_score = sum(1 for word in NEGATIVE_KEYWORDS if word in text)
+    sentiment = 'positive' if pos_score > neg_score else 'negative' if neg_score > pos_score else 'neutral'
+    
+    return (
+        sentiment,
+        # Trending general topics
+        tuple(word for word in TRENDING_WORDS if word in text),
+        # Sector mentions
+        tuple(sector for sector, keywords in SECTOR_KEYWORDS.items() if any(keyword in text for keyword in keywords))
+    )
+
+def dedupe_and_scan(news_items: List['NewsItem']) -> List['NewsItem']:
+    """Drop near-duplicates and fill in every remaining item's topic scores and sentiment scan
+    
+    Pure CPU work over the whole batch, meant to run in a worker thread once per news fetch.
+    """
+    unique_news = drop_near_duplicates(news_items)
+    for item in unique_news:
+        if not item.topic_scores:
+            item.topic_scores.update(score_topics(item.search_text))
+        if item.sentiment_scan is None:
+            item.sentiment_scan = scan_sentiment(item.search_text)
+    return unique_news
+
+def _local_name(tag: str) -> str:
+    """Element tag without its XML namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+def _feed_timestamp(published: str) -> Optional[float]:
+    """Epoch seconds for an RSS (RFC 822) or Atom (ISO 8601) date, or None
+    
+    RFC 822 zone names such as EST or PDT are understood; dates without a zone are taken as UTC.
+    """
+    try:
+        if published[:4].isdigit():
+            parsed = datetime.fromisoformat(published.replace('Z', '+00:00'))
+        else:
+            parsed = parsedate_to_datetime(published)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def _feed_entry(element: ElementTree.Element) -> Dict[str, any]:
+    """Title, summary, published, link and timestamp (epoch seconds or None) of an RSS item / Atom entry"""
+    fields = {}
+    for child in element:
+        name = _local_name(child.tag)
+        if name == 'link' and child.get('href'):
+            # Atom: the article is the alternate link; self/enclosure links are skipped
+            if child.get('rel', 'alternate') == 'alternate':
+                fields.setdefault('link', child.get('href'))
+        else:
+            fields.setdefault(name, (child.text or '').strip())
+    published = fields.get('pubDate') or fields.get('published') or fields.get('updated') or fields.get('date')
+    
+    return {
+        'title': fields.get('title', 'No title'),
+        'summary': fields.get('summary', fields.get('description', 'No summary')),
+        'published': published or 'Unknown',
+        'link': fields.get('link', ''),
+        'timestamp': _feed_timestamp(published) if published else None
+    }
+
+class FeedHeadParser:
+    """Incremental feed parser that collects the first `limit` entries as the body arrives"""
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.entries = []
+        self._parser = ElementTree.XMLPullParser(events=('end',))
+        self._tail = b''
+    
+    def feed(self, data: bytes) -> bool:
+        """Parse another chunk; True once `limit` entries were read
+        
+        Raises ElementTree.ParseError for malformed XML and ValueError for entity
+        declarations, which feeds never need and entity-expansion attacks rely on.
+        """
+        # The previous chunk's tail catches a declaration split across two chunks
+        if b'<!ENTITY' in self._tail + data:
+            raise ValueError("feed declares XML entities")
+        self._tail = data[-7:]
+        self._parser.feed(data)
+        for _, element in self._parser.read_events():
+            if _local_name(element.tag) in ('item', 'entry'):
+                self.entries.append(_feed_entry(element))
+                element.clear()
+                if len(self.entries) >= self.limit:
+                    return True
+        return False
+
+def feedparser_entries(body: bytes, limit: int) -> List[Dict[str, any]]:
+    """First `limit` entries via feedparser, which copes with broken markup and unusual formats"""
+    feed = feedparser.parse(body)
+    return [{
+        'title': entry.get('title', 'No title'),
+        'summary': entry.get('summary', entry.get('description', 'No summary')),
+        'published': entry.get('published', 'Unknown'),
+        'link': entry.get('link', ''),
+        'timestamp': calendar.timegm(entry.published_parsed) if entry.get('published_parsed') else None
+    } for entry in feed.entries[:limit]]
+
 @dataclass
 class NewsItem:
     title: str
@@ -29,701 +990,733 @@ class NewsItem:
     source: str
     published: str
     url: str
+    # `published` parsed once at ingest (UTC), so items can be sorted and filtered by age; None if unparseable
+    published_at: Optional[datetime] = None
+    # Keyword relevance for every (topic, language), filled in on first use by fetch_topic_news
+    topic_scores: Dict[tuple, int] = field(default_factory=dict, repr=False, compare=False)
+    # (sentiment, trending words, sectors) found by analyze_news_sentiment, computed once per item
+    sentiment_scan: Optional[Tuple[str, Tuple[str, ...], Tuple[str, ...]]] = field(default=None, repr=False, compare=False)
+    _search_text: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def search_text(self) -> str:
+        """Lowercased title + summary shared by every keyword pass, computed once"""
+        if self._search_text is None:
+            self._search_text = (self.title + ' ' + self.summary).lower()
+        return self._search_text
+
+class AsyncRateLimiter:
+    """Token bucket allowing `rate` acquisitions per `period` seconds, with bursts up to `rate`
+    
+    Implemented as a generic cell rate algorithm so it needs no asyncio.Lock.
+    """
+    
+    def __init__(self, rate: float, period: float = 1.0):
+        self.interval = period / rate
+        self.burst = period - self.interval
+        self._theoretical_arrival = 0.0
+    
+    async def acquire(self):
+        """Wait until a token is available"""
+        now = time.monotonic()
+        arrival = max(self._theoretical_arrival, now)
+        self._theoretical_arrival = arrival + self.interval
+        delay = arrival - self.burst - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    def pause(self, seconds: float):
+        """Hold back every waiter for `seconds`, e.g. after a flood-control response"""
+        resume = time.monotonic() + seconds + self.burst
+        self._theoretical_arrival = max(self._theoretical_arrival, resume)
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+class TelegramRequest(HTTPXRequest):
+    """HTTPXRequest that decodes Bot API responses with json_loads (orjson when installed)"""
+    
+    @staticmethod
+    def parse_json_payload(payload: bytes) -> Dict[str, any]:
+        try:
+            return json_loads(payload)
+        except ValueError as exc:
+            raise TelegramError("Invalid server response") from exc
 
 class DatabaseManager:
     def __init__(self, db_path: str = "stock_bot.db"):
         self.db_path = db_path
+        # One long-lived connection shared by all calls (keeps SQLite's page cache warm), serialized by a lock
+        # Async handlers call writes and full-table reads through asyncio.to_thread so the loop never blocks on disk
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, cached_statements=256)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA wal_autocheckpoint=1000')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+        self._conn.execute('PRAGMA cache_size=-64000')
+        # LRU caches for per-user lookups, kept in sync by the setters below
+        self._lang_cache = OrderedDict()
+        self._topics_cache = OrderedDict()
         self.init_database()
     
+    def _cache_get(self, cache, user_id):
+        """Return a cached value (None if missing), marking it recently used"""
+        value = cache.get(user_id)
+        if value is not None:
+            cache.move_to_end(user_id)
+        return value
+    
+    def _cache_put(self, cache, user_id, value):
+        """Store a value, evicting the least recently used entry when full"""
+        cache[user_id] = value
+        cache.move_to_end(user_id)
+        if len(cache) > USER_CACHE_SIZE:
+            cache.popitem(last=False)
+    
     def init_database(self):
         """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Users table to store subscriber information
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY,
-                username TEXT,
-                first_name TEXT,
-                last_name TEXT,
-                subscribed BOOLEAN DEFAULT TRUE,
-                language TEXT DEFAULT 'ru',
-                topic_preferences TEXT DEFAULT 'all',
-                joined_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # News cache table to avoid sending duplicate news
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS news_cache (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT,
-                url TEXT UNIQUE,
-                sent_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Check if language column exists, if not add it (migration for existing databases)
-        self._migrate_database(conn, cursor)
-        
-        conn.commit()
-        conn.close()
-    
-    def _migrate_database(self, conn, cursor):
-        """Migrate existing database to add new columns"""
-        try:
-            # Check if language column exists
-            cursor.execute("PRAGMA table_info(users)")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            if 'language' not in columns:
-                print("🔄 Adding language column to existing database...")
-                cursor.execute('ALTER TABLE users ADD COLUMN language TEXT DEFAULT "ru"')
+        with self._lock:
+            conn = self._conn
+            cursor = conn.cursor()
+            # Schema setup and migration commit together
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                # Users table to store subscriber information
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS users (
+                        user_id INTEGER PRIMARY KEY,
+                        username TEXT,
+                        first_name TEXT,
+                        last_name TEXT,
+                        subscribed BOOLEAN DEFAULT TRUE,
+                        language TEXT DEFAULT 'ru',
+                        topic_preferences TEXT DEFAULT 'all',
+                        joined_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
                 
-                # Update existing users to have Russian as default language
-                cursor.execute('UPDATE users SET language = "ru" WHERE language IS NULL')
-                print("✅ Language column migration completed!")
-            
-            # Check if topic_preferences column exists
-            if 'topic_preferences' not in columns:
-                print("🔄 Adding topic_preferences column to existing database...")
-                cursor.execute('ALTER TABLE users ADD COLUMN topic_preferences TEXT DEFAULT "all"')
+                # News cache table to avoid sending duplicate news
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS news_cache (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        title TEXT,
+                        url TEXT UNIQUE,
+                        sent_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
                 
-                # Update existing users to have 'all' topics by default
-                cursor.execute('UPDATE users SET topic_preferences = "all" WHERE topic_preferences IS NULL')
-                print("✅ Topic preferences column migration completed!")
-            
-        except Exception as e:
-            print(f"⚠️ Database migration warning: {e}")
-            # Continue even if migration fails
+                # Admin users table, loaded into the bot's in-memory admin set at startup
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS admin_users (
+                        user_id INTEGER PRIMARY KEY,
+                        added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Translation cache persisted across restarts, keyed like the in-memory one
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS translations (
+                        language TEXT NOT NULL,
+                        digest BLOB NOT NULL,
+                        text TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (language, digest)
+                    ) WITHOUT ROWID
+                ''')
+                
+                # Column migrations for existing databases; user_version records that they already ran
+                cursor.execute('PRAGMA user_version')
+                if cursor.fetchone()[0] < SCHEMA_VERSION:
+                    self._migrate_database(conn, cursor)
+                    cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+            cursor.execute('COMMIT')
+    
+    def _migrate_database(self, conn, cursor):
+        """Migrate existing database to add new columns
+        
+        Errors propagate, so init_database rolls back and user_version stays unchanged
+        until the migration succeeds on a later start.
+        """
+        # Check if language column exists
+        cursor.execute("PRAGMA table_info(users)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        if 'language' not in columns:
+            print("🔄 Adding language column to existing database...")
+            cursor.execute('ALTER TABLE users ADD COLUMN language TEXT DEFAULT "ru"')
+            
+            # Update existing users to have Russian as default language
+            cursor.execute('UPDATE users SET language = "ru" WHERE language IS NULL')
+            print("✅ Language column migration completed!")
+        
+        # Check if topic_preferences column exists
+        if 'topic_preferences' not in columns:
+            print("🔄 Adding topic_preferences column to existing database...")
+            cursor.execute('ALTER TABLE users ADD COLUMN topic_preferences TEXT DEFAULT "all"')
+            
+            # Update existing users to have 'all' topics by default
+            cursor.execute('UPDATE users SET topic_preferences = "all" WHERE topic_preferences IS NULL')
+            print("✅ Topic preferences column migration completed!")
+    
+    def load_translations(self, limit: int) -> List[Tuple[str, bytes, str]]:
+        """Drop expired translations and return up to `limit` recent ones, oldest first"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM translations WHERE created_at < datetime('now', ?)", (f'-{TRANSLATION_MAX_AGE_DAYS} days',)
+            )
+            rows = self._conn.execute(
+                'SELECT language, digest, text FROM translations ORDER BY created_at DESC LIMIT ?', (limit,)
+            ).fetchall()
+        rows.reverse()
+        return rows
+    
+    def save_translations(self, rows: List[Tuple[str, bytes, str]]):
+        """Store (language, digest, text) translations in a single transaction"""
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO translations (language, digest, text) VALUES (?, ?, ?)', rows
+                )
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
     
     def add_user(self, user_id: int, username: str = None, first_name: str = None, last_name: str = None):
         """Add or update a user in the database without resetting preferences"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Use UPSERT so that existing preference columns (language, topic_preferences, subscribed, etc.) are preserved
-        cursor.execute('''
-            INSERT INTO users (user_id, username, first_name, last_name, last_active)
-            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(user_id) DO UPDATE SET
-                username=excluded.username,
-                first_name=excluded.first_name,
-                last_name=excluded.last_name,
-                last_active=CURRENT_TIMESTAMP
-        ''', (user_id, username, first_name, last_name))
-        
-        conn.commit()
-        conn.close()
-    
-    def get_subscribed_users(self) -> List[int]:
-        """Get all subscribed user IDs"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT user_id FROM users WHERE subscribed = TRUE')
-        users = [row[0] for row in cursor.fetchall()]
-        
-        conn.close()
-        return users
+        with self._lock:
+            self._conn.execute('''
+                INSERT INTO users (user_id, username, first_name, last_name, last_active)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    username=excluded.username,
+                    first_name=excluded.first_name,
+                    last_name=excluded.last_name,
+                    last_active=CURRENT_TIMESTAMP
+            ''', (user_id, username, first_name, last_name))
+    
+    def iter_subscriber_batches(self, batch_size: int = SUBSCRIBER_BATCH_SIZE) -> Iterator[List[Tuple[int, str, str]]]:
+        """Yield lists of (user_id, language, topic preferences) for subscribed users, batch_size at a time"""
+        with self._lock:
+            cursor = self._conn.execute('SELECT user_id, language, topic_preferences FROM users WHERE subscribed = TRUE')
+        while True:
+            # The lock is held per batch only, so the consumer may use the DB between batches
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+    
+    def get_subscriber_segments(self) -> Dict[Tuple[str, str], int]:
+        """Map each distinct (language, topic preferences) among subscribers to one of its user IDs"""
+        with self._lock:
+            cursor = self._conn.execute('''
+                SELECT language, topic_preferences, MIN(user_id) FROM users
+                WHERE subscribed = TRUE GROUP BY language, topic_preferences
+            ''')
+            return {(language, topics): user_id for language, topics, user_id in cursor.fetchall()}
+    
+    def cache_user_prefs(self, user_id: int, language: str, topics: str):
+        """Seed the lookup caches with preferences already fetched in bulk"""
+        with self._lock:
+            self._cache_put(self._lang_cache, user_id, language)
+            self._cache_put(self._topics_cache, user_id, topics)
     
     def subscribe_user(self, user_id: int):
         """Subscribe a user to daily updates"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('UPDATE users SET subscribed = TRUE WHERE user_id = ?', (user_id,))
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute('UPDATE users SET subscribed = TRUE WHERE user_id = ?', (user_id,))
     
     def unsubscribe_user(self, user_id: int):
         """Unsubscribe a user from daily updates"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('UPDATE users SET subscribed = FALSE WHERE user_id = ?', (user_id,))
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute('UPDATE users SET subscribed = FALSE WHERE user_id = ?', (user_id,))
+    
+    def unsubscribe_users(self, user_ids: List[int]):
+        """Unsubscribe several users in a single transaction"""
+        if not user_ids:
+            return
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany('UPDATE users SET subscribed = FALSE WHERE user_id = ?', [(user_id,) for user_id in user_ids])
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
     
     def get_user_count(self) -> int:
         """Get total number of users"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) FROM users')
-        count = cursor.fetchone()[0]
-        
-        conn.close()
-        return count
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
     
     def get_subscriber_count(self) -> int:
         """Get number of subscribed users"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) FROM users WHERE subscribed = TRUE')
-        count = cursor.fetchone()[0]
-        
-        conn.close()
-        return count
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM users WHERE subscribed = TRUE').fetchone()[0]
     
-    def get_all_users(self) -> List[tuple]:
-        """Get all users from database"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT user_id, username, first_name, last_name, subscribed, language FROM users')
-        users = cursor.fetchall()
-        
-        conn.close()
-        return users
+    def get_admin_ids(self) -> Set[int]:
+        """Get the IDs of all admin users"""
+        with self._lock:
+            return set(row[0] for row in self._conn.execute('SELECT user_id FROM admin_users'))
+    
+    def add_admin(self, user_id: int):
+        """Add user as admin"""
+        with self._lock:
+            self._conn.execute('INSERT OR IGNORE INTO admin_users (user_id) VALUES (?)', (user_id,))
+    
+    def is_subscribed(self, user_id: int) -> bool:
+        """Check whether a user is subscribed"""
+        with self._lock:
+            row = self._conn.execute('SELECT subscribed FROM users WHERE user_id = ?', (user_id,)).fetchone()
+            return bool(row and row[0])
+    
+    def user_exists(self, user_id: int) -> bool:
+        """Check whether a user is registered"""
+        with self._lock:
+            # Users are never deleted, so anyone in a preference cache is known to exist
+            if user_id in self._lang_cache or user_id in self._topics_cache:
+                return True
+            return self._conn.execute('SELECT 1 FROM users WHERE user_id = ?', (user_id,)).fetchone() is not None
     
     def get_user_language(self, user_id: int) -> str:
         """Get user's preferred language"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT language FROM users WHERE user_id = ?', (user_id,))
-        result = cursor.fetchone()
-        
-        conn.close()
-        return result[0] if result else 'en'
+        with self._lock:
+            language = self._cache_get(self._lang_cache, user_id)
+            if language is not None:
+                return language
+            result = self._conn.execute('SELECT language FROM users WHERE user_id = ?', (user_id,)).fetchone()
+            if not result:
+                return 'en'
+            self._cache_put(self._lang_cache, user_id, result[0])
+            return result[0]
     
     def set_user_language(self, user_id: int, language: str):
         """Set user's preferred language"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('UPDATE users SET language = ? WHERE user_id = ?', (language, user_id))
-        conn.commit()
-        
-        conn.close()
+        with self._lock:
+            cursor = self._conn.execute('UPDATE users SET language = ? WHERE user_id = ?', (language, user_id))
+            if cursor.rowcount:
+                self._cache_put(self._lang_cache, user_id, language)
     
     def get_user_topics(self, user_id: int) -> str:
         """Get user's topic preferences"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT topic_preferences FROM users WHERE user_id = ?', (user_id,))
-        result = cursor.fetchone()
-        
-        conn.close()
-        return result[0] if result else 'all'
+        with self._lock:
+            topics = self._cache_get(self._topics_cache, user_id)
+            if topics is not None:
+                return topics
+            result = self._conn.execute('SELECT topic_preferences FROM users WHERE user_id = ?', (user_id,)).fetchone()
+            if not result:
+                return 'all'
+            self._cache_put(self._topics_cache, user_id, result[0])
+            return result[0]
+    
+    def get_user_prefs(self, user_id: int) -> Tuple[str, str]:
+        """Get user's (language, topic preferences) with at most one query"""
+        with self._lock:
+            language = self._cache_get(self._lang_cache, user_id)
+            topics = self._cache_get(self._topics_cache, user_id)
+            if language is not None and topics is not None:
+                return language, topics
+            result = self._conn.execute(
+                'SELECT language, topic_preferences FROM users WHERE user_id = ?', (user_id,)
+            ).fetchone()
+            if not result:
+                return 'en', 'all'
+            self._cache_put(self._lang_cache, user_id, result[0])
+            self._cache_put(self._topics_cache, user_id, result[1])
+            return result[0], result[1]
     
     def set_user_topics(self, user_id: int, topics: str):
         """Set user's topic preferences"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('UPDATE users SET topic_preferences = ? WHERE user_id = ?', (topics, user_id))
-        conn.commit()
-        
-        conn.close()
+        with self._lock:
+            cursor = self._conn.execute('UPDATE users SET topic_preferences = ? WHERE user_id = ?', (topics, user_id))
+            if cursor.rowcount:
+                self._cache_put(self._topics_cache, user_id, topics)
+    
+    def close(self):
+        """Close the shared connection"""
+        with self._lock:
+            self._conn.close()
 
 class PublicStockNewsBot:
     def __init__(self, bot_token: str):
         self.bot_token = bot_token
-        self.bot = Bot(token=bot_token)
-        self.application = Application.builder().token(bot_token).build()
+        self.application = (
+            Application.builder()
+            .token(bot_token)
+            .request(TelegramRequest(connection_pool_size=TELEGRAM_CONNECTION_POOL_SIZE))
+            .build()
+        )
+        # Reuse the application's bot instead of a second Bot with its own single-connection pool
+        self.bot = self.application.bot
         self.db = DatabaseManager()
-        self.db.init_database()  # Initialize database with tables and migration
-        
-        # News sources RSS feeds (with fallback options)
-        self.news_sources = {
-            'Yahoo Finance': 'https://feeds.finance.yahoo.com/rss/2.0/headline',
-            'MarketWatch': 'https://feeds.marketwatch.com/marketwatch/topstories/',
-            'CNBC': 'https://www.cnbc.com/id/100003114/device/rss/rss.html',
-            'Reuters Business': 'https://feeds.reuters.com/reuters/businessNews',
-            'Bloomberg': 'https://feeds.bloomberg.com/markets/news.rss',
-            'Financial Times': 'https://www.ft.com/rss/home/us',
-            'Seeking Alpha': 'https://seekingalpha.com/feed.xml',
-            'Investing.com': 'https://www.investing.com/rss/news_301.rss',
-            'Barron\'s': 'https://www.barrons.com/feed',
-            'Wall Street Journal': 'https://feeds.a.dj.com/rss/RSSMarketsMain.xml'
-        }
-        
-        # Alternative RSS feeds that are more reliable
-        self.fallback_sources = {
-            'Yahoo Finance Alt': 'https://feeds.finance.yahoo.com/rss/2.0/headline',
-            'MarketWatch Alt': 'https://feeds.marketwatch.com/marketwatch/topstories/',
-            'CNBC Alt': 'https://www.cnbc.com/id/100003114/device/rss/rss.html',
-            'Reuters Alt': 'https://feeds.reuters.com/reuters/businessNews',
-            'Bloomberg Alt': 'https://feeds.bloomberg.com/markets/news.rss'
-        }
+        # Shared by every broadcast so concurrent sends stay under Telegram's limit
+        self.telegram_limiter = AsyncRateLimiter(TELEGRAM_MESSAGES_PER_SECOND)
+        self.openai_limiter = AsyncRateLimiter(OPENAI_REQUESTS_PER_MINUTE, 60)
+        self.openai_semaphore = asyncio.Semaphore(OPENAI_CONCURRENCY)
         
         # Cache for news summaries to avoid regenerating
         self.daily_summary_cache = None
         self.last_summary_time = None
         
-        # Market schedule for notifications
-        self.market_schedule = {
-            'NYSE': {'open': '09:30', 'close': '16:00', 'timezone': 'America/New_York'},
-            'NASDAQ': {'open': '09:30', 'close': '16:00', 'timezone': 'America/New_York'},
-            'LSE': {'open': '08:00', 'close': '16:30', 'timezone': 'Europe/London'},
-            'TSE': {'open': '09:00', 'close': '15:30', 'timezone': 'Asia/Tokyo'},
-            'HKEX': {'open': '09:30', 'close': '16:00', 'timezone': 'Asia/Hong_Kong'}
-        }
+        # LRU of LibreTranslate results keyed by (language, text digest), so long texts aren't kept as keys;
+        # seeded from the translations table and written through to it
+        self._translation_cache = OrderedDict(
+            ((language, digest), text) for language, digest, text in self.db.load_translations(TRANSLATION_CACHE_SIZE)
+        )
         
-        # Major stocks to track for price changes
-        self.major_stocks = {
-            'AAPL': 'Apple Inc.',
-            'MSFT': 'Microsoft Corporation',
-            'GOOGL': 'Alphabet Inc.',
-            'AMZN': 'Amazon.com Inc.',
-            'TSLA': 'Tesla Inc.',
-            'NVDA': 'NVIDIA Corporation',
-            'META': 'Meta Platforms Inc.',
-            'BRK.A': 'Berkshire Hathaway Inc.',
-            'JPM': 'JPMorgan Chase & Co.',
-            'JNJ': 'Johnson & Johnson'
-        }
+        # One pooled HTTP session for translation and RSS requests, created on first use inside the loop
+        self._http = None
+        # RSS feeds often have broken certificates, so they get a permissive SSL context per request
+        self._rss_ssl_context = ssl.create_default_context()
+        self._rss_ssl_context.check_hostname = False
+        self._rss_ssl_context.verify_mode = ssl.CERT_NONE
+        # Per-feed state: url -> {'etag', 'last_modified', 'items', 'interval', 'next_check'}
+        self._feed_meta = {}
+        # (expires_at, task) for the merged, de-duplicated result of fetch_all_news
+        self._news_cache = None
+        # (news cache entry, analysis, predictions, headlines) derived from that fetch, see _news_snapshot
+        self._news_analysis = None
+        # One OpenAI client (and its connection pool) for all ChatGPT calls, created on first use
+        self._openai = None
+        # (topic, language) -> (expires_at, task researching the assets); concurrent callers share the task
+        self._topic_assets_cache = {}
+        # (topic, language, sorted article URLs) -> (expires_at, task enhancing those articles)
+        self._enhanced_news_cache = {}
+        # (language, topics, include_stocks) -> (expires_at, task building the unified digest)
+        self._digest_cache = {}
+        # (chat_id, message_id) -> task applying the latest inline-button edit to that message
+        self._pending_edits = {}
         
         # Setup handlers
         self.setup_handlers()
         
-        # Admin user IDs (you can customize this list)
-        self.admin_users = set()
-        # Add admin user IDs here, for example:
-        # self.admin_users = {123456789, 987654321}
+        # Admin user IDs, loaded once from the DB; is_admin is a set lookup and /addadmin keeps both in sync
+        self.admin_users = self.db.get_admin_ids()
         
         # Language support
         self.supported_languages = ['en', 'ru']
         self.default_language = 'ru'  # Russian is now default
+    
+    def _http_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it if needed"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, limit_per_host=8, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._http
+    
+    def _openai_client(self) -> AsyncOpenAI:
+        """Get the shared OpenAI client, creating it if needed"""
+        if self._openai is None:
+            self._openai = AsyncOpenAI(
+                api_key=os.getenv('OPENAI_API_KEY'),
+                timeout=OPENAI_TIMEOUT,
+                max_retries=3,
+                http_client=DefaultAsyncHttpxClient(limits=OPENAI_CONNECTION_LIMITS)
+            )
+        return self._openai
+    
+    async def _chat_completion(self, **kwargs):
+        """Create a ChatGPT completion within the bot-wide OpenAI rate and concurrency limits"""
+        async with self.openai_semaphore, self.openai_limiter:
+            return await self._openai_client().chat.completions.create(**kwargs)
+    
+    async def close(self):
+        """Release the HTTP session, the OpenAI client and the database connection"""
+        if self._http is not None:
+            await self._http.close()
+        if self._openai is not None:
+            await self._openai.close()
+        self.db.close()
+    
+    async def _rate_limited(self, method, *args, **kwargs):
+        """Call a Telegram API method within the bot-wide rate limit
         
-        # Topic definitions
-        self.available_topics = {
-            'all': {
-                'en': 'All Topics',
-                'ru': 'Все темы'
-            },
-            'oil_gas': {
-                'en': 'Oil & Gas',
-                'ru': 'Нефть и газ'
-            },
-            'metals_mining': {
-                'en': 'Metals & Mining',
-                'ru': 'Металлы и добыча'
-            },
-            'technology': {
-                'en': 'Technology',
-                'ru': 'Технологии'
-            },
-            'finance': {
-                'en': 'Finance & Banking',
-                'ru': 'Финансы и банкинг'
-            }
-        }
+        A flood-control response pauses every sender sharing the limiter, then
+        the call is retried once.
+        """
+        try:
+            async with self.telegram_limiter:
+                return await method(*args, **kwargs)
+        except RetryAfter as e:
+            retry_after = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else e.retry_after
+            logger.warning(f"Telegram flood control, pausing sends for {retry_after}s")
+            self.telegram_limiter.pause(retry_after)
+            async with self.telegram_limiter:
+                return await method(*args, **kwargs)
+    
+    async def _send_message(self, **kwargs):
+        """Send a message within the bot-wide Telegram rate limit"""
+        return await self._rate_limited(self.bot.send_message, **kwargs)
+    
+    async def _edit_message(self, query, text: str, **kwargs):
+        """Edit a callback query's message within the bot-wide Telegram rate limit
         
-        # Translation dictionaries
-        self.translations = {
-            'en': {
-                'welcome_title': 'Кофе и Котировки',
-                'welcome_message': 'Welcome, {name}! I am your personal financial markets news assistant.',
-                'what_i_do': 'What I offer:',
-                'daily_news': 'Daily market news summaries from leading financial sources',
-                'sentiment_analysis': 'AI-powered market sentiment analysis',
-                'predictions': 'Trending topics and market predictions',
-                'auto_updates': 'Automatic daily updates (9:00 AM & 9:30 AM EST)',
-                'commands': 'Commands:',
-                'news_cmd': '/news - Get latest market news',
-                'notify_cmd': '/notify - Manually trigger notifications for all subscribers (Admin only)',
-                'subscribe_cmd': '/subscribe - Enable daily news updates',
-                'unsubscribe_cmd': '/unsubscribe - Disable daily updates',
-                'language_cmd': '/language - Choose language with buttons',
-                'topics_cmd': '/topics - Choose topics of interest',
-                'help_cmd': '/help - Show all commands',
-                'status_cmd': '/status - Check bot and market status',
-                'stats_cmd': '/stats - View bot usage statistics',
-                'admin_features': 'Admin Features:',
-                'first_user_admin': 'First user automatically becomes admin',
-                'addadmin_info': 'Use /addadmin to grant admin access to others',
-                'notify_info': 'Admins can trigger manual notifications anytime',
-                'auto_subscribe': 'Auto-Subscribe:',
-                'subscribed_message': 'You\'re automatically subscribed to daily updates! Use /unsubscribe if you want to disable them.',
-                'ready_message': 'Ready to stay informed about the markets? Try /news to get started!',
-                'daily_intelligence': 'DAILY STOCK MARKET INTELLIGENCE',
-                'market_sentiment': 'MARKET SENTIMENT ANALYSIS',
-                'positive_news': 'Positive News',
-                'negative_news': 'Negative News',
-                'neutral_news': 'Neutral News',
-                'top_headlines': 'TOP MARKET HEADLINES',
-                'market_predictions': 'MARKET PREDICTIONS & ANALYSIS',
-                'market_outlook': 'Market Outlook',
-                'key_focus': 'Key Focus Areas:',
-                'sector_spotlight': 'Sector Spotlight:',
-                'trading_considerations': 'Trading Considerations:',
-                'risk_level': 'Risk Level',
-                'reminder': 'Reminder: Analysis based on news sentiment. Not financial advice. Always do your own research.',
-                'manual_notification': 'MANUAL NOTIFICATION TRIGGERED',
-                'notification_success': 'Manual Notification Sent Successfully!',
-                'results': 'Results:',
-                'successfully_sent': 'Successfully sent to',
-                'failed_to_send': 'Failed to send',
-                'total_subscribers': 'Total subscribers',
-                'sent_at': 'Sent at',
-                'all_notified': 'All subscribed users have been notified with the latest market news and predictions.',
-                'access_denied': 'Access Denied',
-                'admin_only': 'Only administrators can trigger manual notifications.',
-                'contact_admin': 'Contact the bot administrator to request access.',
-                'language_selection': 'Language Selection',
-                'choose_language': 'Please choose your preferred language:',
-                'english': 'English',
-                'russian': 'Russian',
-                'language_changed': 'Language changed successfully!',
-                'current_language': 'Current language',
-                'topics_cmd': '/topics - Choose topics of interest',
-                'topic_selection': 'Choose topics that interest you:',
-                'topic_all': 'All Topics',
-                'topic_oil_gas': 'Oil & Gas',
-                'topic_metals_mining': 'Metals & Mining',
-                'topic_technology': 'Technology',
-                'topic_finance': 'Finance & Banking',
-                'topics_updated': 'Your topics have been updated!',
-                'current_topics': 'Your current topics:',
-                'no_subscribers': 'No subscribers found to notify.',
-                'fetching_news': 'Fetching latest market news and analysis...',
-                'error_fetching': 'Sorry, there was an error fetching the news. Our team has been notified. Please try again in a few minutes.',
-                'error_notification': 'Sorry, I couldn\'t send the notification right now. Please try again later.',
-                'no_news': 'Unable to fetch news at this time. Please try again later.',
-                'no_users': 'No users found.',
-                'user_count': 'User count',
-                'subscriber_count': 'Subscriber count',
-                'bot_health': 'Bot Health:',
-                'status_operational': 'Status: Fully operational',
-                'news_sources': 'News Sources',
-                'active': 'active',
-                'database': 'Database: Connected',
-                'updates': 'Updates: Real-time',
-                'today_summary': 'Today\'s Summary:',
-                'available': 'Available',
-                'generating': 'Generating...',
-                'use_news': 'Use /news to get the latest market analysis!'
-            },
-            'ru': {
-                'welcome_title': 'Кофе и Котировки',
-                'welcome_message': 'Привет {name}! Я ваш личный помощник по новостям рынка акций.',
-                'what_i_do': 'Что я делаю:',
-                'daily_news': 'Ежедневные сводки новостей рынка от ведущих финансовых источников',
-                'sentiment_analysis': 'Анализ настроений рынка на основе ИИ',
-                'predictions': 'Трендовые темы и прогнозы рынка',
-                'auto_updates': 'Автоматические ежедневные обновления (9:00 AM и 9:30 AM EST)',
-                'commands': 'Команды:',
-                'news_cmd': '/news - Получить последние новости рынка',
-                'notify_cmd': '/notify - Вручную отправить уведомления всем подписчикам (только для админов)',
-                'subscribe_cmd': '/subscribe - Включить ежедневные обновления новостей',
-                'unsubscribe_cmd': '/unsubscribe - Отключить ежедневные обновления',
-                'language_cmd': '/language - Выбрать язык кнопками',
-                'help_cmd': '/help - Показать все команды',
-                'status_cmd': '/status - Проверить статус бота и рынка',
-                'stats_cmd': '/stats - Просмотр статистики использования бота',
-                'admin_features': 'Функции администратора:',
-                'first_user_admin': 'Первый пользователь автоматически становится администратором',
-                'addadmin_info': 'Используйте /addadmin для предоставления прав администратора другим',
-                'notify_info': 'Администраторы могут вручную отправлять уведомления в любое время',
-                'auto_subscribe': 'Автоподписка:',
-                'subscribed_message': 'Вы автоматически подписаны на ежедневные обновления! Используйте /unsubscribe, если хотите их отключить.',
-                'ready_message': 'Готовы быть в курсе событий на рынках? Попробуйте /news для начала!',
-                'daily_intelligence': 'ЕЖЕДНЕВНАЯ РАЗВЕДКА РЫНКА АКЦИЙ',
-                'market_sentiment': 'АНАЛИЗ НАСТРОЕНИЙ РЫНКА',
-                'positive_news': 'Позитивные новости',
-                'negative_news': 'Негативные новости',
-                'neutral_news': 'Нейтральные новости',
-                'top_headlines': 'ГЛАВНЫЕ НОВОСТИ РЫНКА',
-                'market_predictions': 'ПРОГНОЗЫ И АНАЛИЗ РЫНКА',
-                'market_outlook': 'Прогноз рынка',
-                'key_focus': 'Ключевые области внимания:',
-                'sector_spotlight': 'В центре внимания сектора:',
-                'trading_considerations': 'Соображения по торговле:',
-                'risk_level': 'Уровень риска',
-                'reminder': 'Напоминание: Анализ основан на настроениях новостей. Не является финансовой консультацией. Всегда проводите собственное исследование.',
-                'manual_notification': 'ВРУЧНУЮ ЗАПУЩЕНО УВЕДОМЛЕНИЕ',
-                'notification_success': 'Ручное уведомление успешно отправлено!',
-                'results': 'Результаты:',
-                'successfully_sent': 'Успешно отправлено',
-                'failed_to_send': 'Не удалось отправить',
-                'total_subscribers': 'Всего подписчиков',
-                'sent_at': 'Отправлено в',
-                'all_notified': 'Все подписчики получили уведомления с последними новостями рынка и прогнозами.',
-                'access_denied': 'Доступ запрещен',
-                'admin_only': 'Только администраторы могут запускать ручные уведомления.',
-                'contact_admin': 'Обратитесь к администратору бота для получения доступа.',
-                'language_selection': 'Выбор языка',
-                'choose_language': 'Пожалуйста, выберите предпочитаемый язык:',
-                'english': 'Английский',
-                'russian': 'Русский',
-                'language_changed': 'Язык успешно изменен!',
-                'current_language': 'Текущий язык',
-                'topics_cmd': '/topics - Выбрать интересующие темы',
-                'topic_selection': 'Выберите интересующие вас темы:',
-                'topic_all': 'Все темы',
-                'topic_oil_gas': 'Нефть и газ',
-                'topic_metals_mining': 'Металлы и добыча',
-                'topic_technology': 'Технологии',
-                'topic_finance': 'Финансы и банкинг',
-                'topics_updated': 'Ваши темы обновлены!',
-                'current_topics': 'Ваши текущие темы:',
-                'no_subscribers': 'Подписчики не найдены для уведомления.',
-                'fetching_news': 'Получение последних новостей рынка и анализа...',
-                'error_fetching': 'Извините, произошла ошибка при получении новостей. Наша команда уведомлена. Пожалуйста, попробуйте снова через несколько минут.',
-                'error_notification': 'Извините, не удалось отправить уведомление прямо сейчас. Пожалуйста, попробуйте снова позже.',
-                'no_news': 'Не удалось получить новости в данный момент. Пожалуйста, попробуйте снова позже.',
-                'no_users': 'Пользователи не найдены.',
-                'user_count': 'Количество пользователей',
-                'subscriber_count': 'Количество подписчиков',
-                'bot_health': 'Состояние бота:',
-                'status_operational': 'Статус: Полностью работает',
-                'news_sources': 'Источники новостей',
-                'active': 'активны',
-                'database': 'База данных: Подключена',
-                'updates': 'Обновления: В реальном времени',
-                'today_summary': 'Сегодняшняя сводка:',
-                'available': 'Доступна',
-                'generating': 'Генерируется...',
-                'use_news': 'Используйте /news для получения последнего анализа рынка!'
-            }
-        }
+        Edits are coalesced per message: a newer tap cancels an edit still waiting
+        for its turn, so only the final state is sent.
+        """
+        key = (query.message.chat.id, query.message.message_id) if query.message else query.inline_message_id
+        pending = self._pending_edits.get(key)
+        if pending is not None:
+            pending.cancel()
+        
+        task = asyncio.ensure_future(self._rate_limited(query.edit_message_text, text, **kwargs))
+        self._pending_edits[key] = task
+        try:
+            await task
+        except asyncio.CancelledError:
+            # Superseded by a newer edit of the same message; only a cancelled handler propagates
+            if self._pending_edits.get(key) is task:
+                raise
+        finally:
+            if self._pending_edits.get(key) is task:
+                del self._pending_edits[key]
+    
+    async def _broadcast(self, send_one) -> Tuple[int, int]:
+        """Run send_one(user_id) for every subscriber, BROADCAST_CONCURRENCY at a time
+        
+        Subscribers are streamed from the DB in batches of SUBSCRIBER_BATCH_SIZE, so memory
+        stays flat and the first users are served before the whole list is read.
+        send_one returns True on success. Returns (successful, failed) counts; sends skipped
+        because the broadcast was aborted count as failed, batches not yet read are not counted.
+        """
+        semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+        
+        async def run(user_id: int, language: str, topics: str) -> bool:
+            async with semaphore:
+                # Seed right before use so per-user lookups hit the cache even for large broadcasts
+                self.db.cache_user_prefs(user_id, language, topics)
+                return await send_one(user_id)
+        
+        batches = self.db.iter_subscriber_batches()
+        successful = failed = attempted = 0
+        while True:
+            batch = await asyncio.to_thread(next, batches, None)
+            if not batch:
+                break
+            attempted += len(batch)
+            tasks = [asyncio.ensure_future(run(user_id, language, topics)) for user_id, language, topics in batch]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    if await next_done:
+                        successful += 1
+                    else:
+                        failed += 1
+                    if failed >= BROADCAST_ABORT_MIN_FAILURES and failed > successful * 3:
+                        logger.error(f"Aborting broadcast after {failed} failed and {successful} successful sends")
+                        return successful, attempted - successful
+            finally:
+                # Cancel whatever is still pending (abort or caller cancellation) and let it unwind
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        
+        return successful, attempted - successful
+    
+    def _shared_digests(self, segments: Dict[Tuple[str, str], int]):
+        """Return digest_for(user_id) yielding one unified digest per (language, topics) pair
+        
+        A digest only depends on the user's language and topic, so subscribers with the
+        same preferences await the same ChatGPT round trip. Every distinct digest is
+        started right away, so ones needed late in the broadcast are ready by then.
+        """
+        digests = {}
+        for prefs, user_id in segments.items():
+            self.db.cache_user_prefs(user_id, *prefs)
+            digests[prefs] = asyncio.ensure_future(self.generate_unified_digest(user_id, include_stocks=True))
+        
+        def digest_for(user_id: int) -> asyncio.Future:
+            prefs = self.db.get_user_prefs(user_id)
+            if prefs not in digests:
+                # Preferences changed after the segments were read
+                digests[prefs] = asyncio.ensure_future(self.generate_unified_digest(user_id, include_stocks=True))
+            return digests[prefs]
+        
+        return digest_for
     
     def is_admin(self, user_id: int) -> bool:
         """Check if a user is an admin"""
         return user_id in self.admin_users
     
+    def _supported_language(self, language: str) -> str:
+        """The language itself if supported, otherwise the default"""
+        return language if language in self.supported_languages else self.default_language
+    
+    def _user_language(self, user_id: int) -> str:
+        """Get the user's language, falling back to the default for unsupported ones"""
+        return self._supported_language(self.db.get_user_language(user_id))
+    
+    def _user_prefs(self, user_id: int) -> Tuple[str, str]:
+        """Get the user's (supported language, topics) in one lookup, for handlers to pass down"""
+        language, topics = self.db.get_user_prefs(user_id)
+        return self._supported_language(language), topics
+    
+    def text_for(self, language: str, key: str, **kwargs) -> str:
+        """Get translated text in an already resolved language"""
+        text = TRANSLATIONS[language].get(key, key)
+        return text.format(**kwargs) if kwargs else text
+    
     def get_text(self, user_id: int, key: str, **kwargs) -> str:
         """Get translated text for a user"""
-        language = self.db.get_user_language(user_id)
-        if language not in self.supported_languages:
-            language = self.default_language
+        return self.text_for(self._user_language(user_id), key, **kwargs)
+    
+    def _translation_key(self, text: str, target_language: str) -> tuple:
+        """Cache key for a translation: a digest, so long texts aren't kept as keys"""
+        return (target_language, hashlib.blake2b(text.encode(), digest_size=16).digest())
+    
+    def _cached_translation(self, key: tuple):
+        """Return a cached translation (None if missing), marking it recently used"""
+        value = self._translation_cache.get(key)
+        if value is not None:
+            self._translation_cache.move_to_end(key)
+        return value
+    
+    def _cache_translation(self, key: tuple, value: str):
+        """Store a translation, evicting the least recently used entry when full"""
+        self._translation_cache[key] = value
+        if len(self._translation_cache) > TRANSLATION_CACHE_SIZE:
+            self._translation_cache.popitem(last=False)
+    
+    async def translate_batch(self, texts: List[str], target_language: str) -> List[str]:
+        """Translate several texts with a single LibreTranslate request"""
+        if target_language == 'en':
+            return list(texts)
+        
+        keys = [self._translation_key(text, target_language) for text in texts]
+        # Texts that are already Russian pass through without a request
+        results = [text if is_mostly_cyrillic(text) else self._cached_translation(key) for text, key in zip(texts, keys)]
+        # Each distinct missing text is sent once, even if it repeats within the batch
+        positions = {}
+        for i, result in enumerate(results):
+            if result is None:
+                positions.setdefault(keys[i], []).append(i)
+        if not positions:
+            return results
+        missing = [indexes[0] for indexes in positions.values()]
         
-        text = self.translations[language].get(key, key)
-        return text.format(**kwargs) if kwargs else text
+        try:
+            # LibreTranslate returns translatedText as a list when q is a list
+            payload = {
+                "q": [texts[i] for i in missing],
+                "source": "en",
+                "target": "ru",
+                "format": "text"
+            }
+            async with self._http_session().post(LIBRETRANSLATE_URL, json=payload) as response:
+                if response.status != 200:
+                    raise Exception(f"API status {response.status}")
+                translated = (await response.json(loads=json_loads)).get('translatedText')
+            if not isinstance(translated, list) or len(translated) != len(missing):
+                raise Exception("unexpected batch response")
+            
+            for i, translated_text in zip(missing, translated):
+                self._cache_translation(keys[i], translated_text)
+            await asyncio.to_thread(
+                self.db.save_translations, [(*keys[i], translated_text) for i, translated_text in zip(missing, translated)]
+            )
+            logger.info(f"AI batch translation successful: {len(missing)} texts")
+        except Exception as e:
+            logger.warning(f"AI batch translation failed, translating one by one: {e}")
+            # Single-text requests run concurrently rather than one round trip after another
+            translated = await asyncio.gather(*(self.translate_news_content(texts[i], target_language) for i in missing))
+        
+        for i, translated_text in zip(missing, translated):
+            for position in positions[keys[i]]:
+                results[position] = translated_text
+        return results
     
     async def translate_news_content(self, text: str, target_language: str) -> str:
         """Translate news content to target language using AI translation"""
         if target_language == 'en':
             return text  # Keep original English
+        if is_mostly_cyrillic(text):
+            return text  # Already Russian, nothing to translate
+        
+        cache_key = self._translation_key(text, target_language)
+        cached = self._cached_translation(cache_key)
+        if cached is not None:
+            return cached
         
         try:
             # Try to use LibreTranslate API (free and reliable)
-            import aiohttp
-            import json
-            
-            # LibreTranslate API endpoint (free service)
-            url = "https://libretranslate.de/translate"
-            
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "q": text,
-                    "source": "en",
-                    "target": "ru",
-                    "format": "text"
-                }
-                
-                async with session.post(url, json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        translated_text = result.get('translatedText', text)
-                        logger.info(f"AI translation successful: {text[:50]}... -> {translated_text[:50]}...")
-                        return translated_text
-                    else:
-                        logger.warning(f"LibreTranslate API failed with status {response.status}")
-                        raise Exception(f"API status {response.status}")
-                        
-        except Exception as e:
-            logger.warning(f"AI translation failed, falling back to keyword-based: {e}")
-            
-            # Fallback to enhanced keyword-based translation
-            translations = {
-                # Market terms
-                'gain': 'рост',
-                'rise': 'подъем',
-                'up': 'вверх',
-                'bull': 'бычий',
-                'growth': 'рост',
-                'profit': 'прибыль',
-                'surge': 'всплеск',
-                'rally': 'ралли',
-                'boom': 'бум',
-                'strong': 'сильный',
-                'beat': 'превзойти',
-                'exceed': 'превысить',
-                'positive': 'позитивный',
-                'upgrade': 'повышение',
-                'buy': 'покупка',
-                'optimistic': 'оптимистичный',
-                'fall': 'падение',
-                'drop': 'снижение',
-                'down': 'вниз',
-                'bear': 'медвежий',
-                'loss': 'потери',
-                'crash': 'крах',
-                'decline': 'снижение',
-                'recession': 'рецессия',
-                'slump': 'спад',
-                'weak': 'слабый',
-                'miss': 'пропустить',
-                'disappointing': 'разочаровывающий',
-                'negative': 'негативный',
-                'downgrade': 'понижение',
-                'sell': 'продажа',
-                'pessimistic': 'пессимистичный',
-                
-                # Sectors
-                'technology': 'технологии',
-                'tech': 'технологии',
-                'energy': 'энергия',
-                'finance': 'финансы',
-                'healthcare': 'здравоохранение',
-                'crypto': 'криптовалюта',
-                'inflation': 'инфляция',
-                'fed': 'ФРС',
-                'interest': 'процентная ставка',
-                'earnings': 'доходы',
-                'china': 'Китай',
-                'europe': 'Европа',
-                'jobs': 'рабочие места',
-                'gdp': 'ВВП',
-                
-                # Common words
-                'the': 'the',  # Keep articles
-                'and': 'и',
-                'or': 'или',
-                'but': 'но',
-                'in': 'в',
-                'on': 'на',
-                'at': 'в',
-                'to': 'к',
-                'for': 'для',
-                'with': 'с',
-                'by': 'от',
-                'from': 'от',
-                'about': 'о',
-                'market': 'рынок',
-                'stock': 'акция',
-                'shares': 'акции',
-                'trading': 'торговля',
-                'investor': 'инвестор',
-                'company': 'компания',
-                'business': 'бизнес',
-                'economy': 'экономика',
-                'financial': 'финансовый',
-                'economic': 'экономический',
-                'global': 'глобальный',
-                'world': 'мир',
-                'news': 'новости',
-                'report': 'отчет',
-                'data': 'данные',
-                'quarter': 'квартал',
-                'year': 'год',
-                'month': 'месяц',
-                'week': 'неделя',
-                'day': 'день',
-                'today': 'сегодня',
-                'yesterday': 'вчера',
-                'tomorrow': 'завтра',
-                'morning': 'утро',
-                'afternoon': 'день',
-                'evening': 'вечер',
-                'night': 'ночь',
-                'time': 'время',
-                'price': 'цена',
-                'value': 'стоимость',
-                'increase': 'увеличение',
-                'decrease': 'уменьшение',
-                'high': 'высокий',
-                'low': 'низкий',
-                'new': 'новый',
-                'old': 'старый',
-                'big': 'большой',
-                'small': 'маленький',
-                'good': 'хороший',
-                'bad': 'плохой',
-                'important': 'важный',
-                'major': 'крупный',
-                'minor': 'незначительный'
+            session = self._http_session()
+            payload = {
+                "q": text,
+                "source": "en",
+                "target": "ru",
+                "format": "text"
             }
             
-            # More sophisticated translation with context
-            translated_text = text
-            
-            # Replace words with proper Russian translations
-            for eng, rus in translations.items():
-                # Use word boundaries to avoid partial replacements
-                import re
-                pattern = r'\b' + re.escape(eng) + r'\b'
-                translated_text = re.sub(pattern, rus, translated_text, flags=re.IGNORECASE)
+            async with session.post(LIBRETRANSLATE_URL, json=payload) as response:
+                if response.status == 200:
+                    result = await response.json(loads=json_loads)
+                    translated_text = result.get('translatedText', text)
+                    logger.info(f"AI translation successful: {text[:50]}... -> {translated_text[:50]}...")
+                    # Only API results are cached; keyword fallbacks are retried next time
+                    self._cache_translation(cache_key, translated_text)
+                    await asyncio.to_thread(self.db.save_translations, [(*cache_key, translated_text)])
+                    return translated_text
+                else:
+                    logger.warning(f"LibreTranslate API failed with status {response.status}")
+                    raise Exception(f"API status {response.status}")
+                    
+        except Exception as e:
+            logger.warning(f"AI translation failed, falling back to keyword-based: {e}")
             
-            return translated_text
+            # Fallback to keyword-based translation: one pass of the precompiled regex
+            return FALLBACK_TRANSLATION_RE.sub(lambda m: FALLBACK_TRANSLATIONS[m.group(0).lower()], text)
     
     async def get_topic_assets(self, user_id: int) -> List[Dict[str, any]]:
+        """Get topic-specific asset prices for a user's topic and language"""
+        language, topics = self.db.get_user_prefs(user_id)
+        return await self.get_topic_assets_for(topics, language)
+    
+    async def get_topic_assets_for(self, user_topics: str, user_language: str) -> List[Dict[str, any]]:
         """Get topic-specific asset prices using ChatGPT research"""
         try:
-            user_topics = self.db.get_user_topics(user_id)
-            user_language = self.db.get_user_language(user_id)
-            
-            # Define topic-specific asset types
-            topic_assets = {
-                'all': {
-                    'en': 'stocks, commodities, and major market indices',
-                    'ru': 'акции, сырьевые товары и основные рыночные индексы'
-                },
-                'oil_gas': {
-                    'en': 'oil prices (WTI, Brent), natural gas, major oil companies, and energy ETFs',
-                    'ru': 'цены на нефть (WTI, Brent), природный газ, крупные нефтяные компании и энергетические ETF'
-                },
-                'metals_mining': {
-                    'en': 'precious metals (gold, silver, platinum), industrial metals (copper, aluminum, nickel), mining companies, and commodity ETFs',
-                    'ru': 'драгоценные металлы (золото, серебро, платина), промышленные металлы (медь, алюминий, никель), горнодобывающие компании и товарные ETF'
-                },
-                'technology': {
-                    'en': 'major tech stocks, semiconductor companies, software firms, and tech ETFs',
-                    'ru': 'крупные технологические акции, компании-производители полупроводников, программные фирмы и технологические ETF'
-                },
-                'finance': {
-                    'en': 'major banks, financial services companies, insurance firms, and financial ETFs',
-                    'ru': 'крупные банки, компании финансовых услуг, страховые фирмы и финансовые ETF'
-                }
-            }
-            
             # Get asset description in user's language
-            asset_description = topic_assets[user_topics].get(user_language, topic_assets[user_topics]['en'])
+            asset_description = TOPIC_ASSET_DESCRIPTIONS[user_topics].get(user_language, TOPIC_ASSET_DESCRIPTIONS[user_topics]['en'])
             
             # Create prompt for ChatGPT to research current prices
             prompt = f"""Research current market prices for {asset_description}.
 
-Please provide:
-1. Current prices for 5-7 key assets in this category
-2. Recent price changes (24h or daily)
-3. Brief market context
-4. Format as structured data
-
+Please provide current prices in USD and recent price changes (24h or daily) for 5-7 key assets in this category.
 Focus on the most liquid and widely traded assets in this category.
-If exact current prices aren't available, provide recent market prices with a note about timing."""
-
-            # Use ChatGPT to research prices
-            try:
-                client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-                response = await client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a financial markets expert. Provide current market data in a structured format."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=800,
-                    temperature=0.3
-                )
-                
-                # Parse ChatGPT response and extract structured data
-                content = response.choices[0].message.content
-                assets = self._parse_asset_data(content, user_language)
-                
-                if assets:
-                    logger.info(f"Generated {len(assets)} topic-specific assets for {user_topics}")
-                    return assets
-                
-            except Exception as e:
-                logger.warning(f"ChatGPT asset research failed: {e}")
+If exact current prices aren't available, provide recent market prices."""
+
+            # Use ChatGPT to research prices, reusing a recent answer for the same topic and language
+            cache_key = (user_topics, user_language)
+            max_tokens = TOPIC_ASSETS_MAX_TOKENS_METALS if user_topics == 'metals_mining' else TOPIC_ASSETS_MAX_TOKENS
+            now = time.monotonic()
+            cached = self._topic_assets_cache.get(cache_key)
+            if cached is None or cached[0] <= now:
+                cached = (now + TOPIC_ASSETS_TTL, asyncio.ensure_future(self._research_topic_assets(prompt, max_tokens)))
+                self._topic_assets_cache[cache_key] = cached
+            # shield: a cancelled caller must not cancel the request other users are waiting on
+            assets = await asyncio.shield(cached[1])
+            
+            if assets:
+                logger.info(f"Generated {len(assets)} topic-specific assets for {user_topics}")
+                return assets
+            
+            # Failed answers are not kept, so the next call asks again
+            if self._topic_assets_cache.get(cache_key) is cached:
+                del self._topic_assets_cache[cache_key]
             
             # Fallback to mock data if ChatGPT fails
             return self._get_fallback_assets(user_topics, user_language)
@@ -732,81 +1725,58 @@ If exact current prices aren't available, provide recent market prices with a no
             logger.error(f"Error getting topic assets: {e}")
             return self._get_fallback_assets('all', 'en')
     
-    def _parse_asset_data(self, content: str, language: str) -> List[Dict[str, any]]:
-        """Parse ChatGPT response to extract structured asset data"""
+    async def _research_topic_assets(self, prompt: str, max_tokens: int) -> List[Dict[str, any]]:
+        """Ask ChatGPT for current asset prices; returns [] on failure"""
         try:
-            import re
-            assets = []
-            lines = content.split('\n')
-            
-            for line in lines:
-                line = line.strip()
-                if not line or ':' not in line:
-                    continue
-                
-                # Look for patterns like "Asset: $Price (+/-X%)" or "Asset - $Price (change)"
-                if '$' in line and ('%' in line or '(' in line):
-                    parts = line.split(':')
-                    if len(parts) >= 2:
-                        symbol = parts[0].strip()
-                        price_info = parts[1].strip()
-                        
-                        # Extract price and change
-                        price_match = re.search(r'\$([\d,]+\.?\d*)', price_info)
-                        change_match = re.search(r'([+-]?\d+\.?\d*)%', price_info)
-                        
-                        if price_match:
-                            price = float(price_match.group(1).replace(',', ''))
-                            change = float(change_match.group(1)) if change_match else 0.0
-                            direction = 'up' if change > 0 else 'down'
-                            
-                            assets.append({
-                                'symbol': symbol,
-                                'name': symbol,
-                                'price': price,
-                                'change': change,
-                                'change_direction': direction,
-                                'source': 'ChatGPT Research'
-                            })
-                            
-                            if len(assets) >= 7:  # Limit to 7 assets
-                                break
+            response = await self._chat_completion(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": (
+                        "You are a financial markets expert. Reply with JSON only, shaped as "
+                        '{"assets": [{"symbol": string, "price": number, "change_pct": number}]}.'
+                    )},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"},
+                max_tokens=max_tokens,
+                temperature=0.3
+            )
             
-            return assets
+            return self._parse_asset_json(response.choices[0].message.content)
             
         except Exception as e:
-            logger.error(f"Error parsing asset data: {e}")
+            logger.warning(f"ChatGPT asset research failed: {e}")
             return []
     
+    def _parse_asset_json(self, content: str) -> List[Dict[str, any]]:
+        """Convert ChatGPT's JSON asset list into asset dicts, skipping malformed entries"""
+        assets = []
+        for entry in json_loads(content).get('assets', [])[:7]:  # Limit to 7 assets
+            try:
+                symbol = str(entry['symbol'])
+                price = float(entry['price'])
+                change = float(entry.get('change_pct') or 0.0)
+            except (KeyError, TypeError, ValueError):
+                continue
+            
+            assets.append({
+                'symbol': symbol,
+                'name': symbol,
+                'price': price,
+                'change': change,
+                'change_direction': 'up' if change > 0 else 'down',
+                'source': 'ChatGPT Research'
+            })
+        
+        return assets
+    
     def _get_fallback_assets(self, topic: str, language: str) -> List[Dict[str, any]]:
         """Generate fallback asset prices when ChatGPT research fails"""
-        import random
-        
-        # Topic-specific fallback assets
-        fallback_assets = {
-            'all': {
-                'AAPL': 150.0, 'MSFT': 300.0, 'GOOGL': 120.0, 'AMZN': 140.0, 'TSLA': 250.0
-            },
-            'oil_gas': {
-                'WTI': 75.0, 'BRENT': 80.0, 'XOM': 100.0, 'CVX': 150.0, 'NGAS': 3.5
-            },
-            'metals_mining': {
-                'GOLD': 1950.0, 'SILVER': 25.0, 'COPPER': 4.2, 'PLAT': 950.0, 'NICKEL': 20.0
-            },
-            'technology': {
-                'NVDA': 400.0, 'META': 200.0, 'NFLX': 450.0, 'ADBE': 500.0, 'CRM': 200.0
-            },
-            'finance': {
-                'JPM': 160.0, 'BAC': 30.0, 'WFC': 45.0, 'GS': 350.0, 'MS': 85.0
-            }
-        }
-        
-        assets = fallback_assets.get(topic, fallback_assets['all'])
-        selected = random.sample(list(assets.keys()), min(5, len(assets)))
+        assets = FALLBACK_ASSET_PRICES.get(topic, FALLBACK_ASSET_PRICES['all'])
+        selected = random.sample(list(assets.items()), min(5, len(assets)))
         
         result = []
-        for symbol in selected:
-            base_price = assets[symbol]
+        for symbol, base_price in selected:
             change_percent = random.uniform(-5.0, 5.0)
             new_price = base_price * (1 + change_percent / 100)
             direction = 'up' if change_percent > 0 else 'down'
@@ -828,253 +1798,114 @@ If exact current prices aren't available, provide recent market prices with a no
         # In production, use get_topic_assets() instead
         return self._get_fallback_assets('all', 'en')
     
-    async def send_market_notification(self, market_name: str, action: str, user_id: int):
-        """Send market open/close notification with stock prices"""
+    async def send_market_notification(self, market_name: str, action: str, user_id: int) -> bool:
+        """Send market open/close notification with stock prices; True if it was sent
+        
+        Permanent failures (see chat_unreachable) are raised so broadcasts can unsubscribe the user.
+        """
         try:
             # Get topic-specific assets for the user
             stock_prices = await self.get_topic_assets(user_id)
-            logger.info(f"Generated topic-specific assets: {stock_prices}")
+            logger.debug(f"Generated topic-specific assets: {stock_prices}")
             
             # Get user language
             user_language = self.db.get_user_language(user_id)
-            logger.info(f"User {user_id} language: {user_language}")
+            logger.debug(f"User {user_id} language: {user_language}")
             
-            if user_language == 'ru':
-                if action == 'open':
-                    title = f"🚀 **{market_name} открывается**"
-                    subtitle = "Рынок открывается через 15 минут"
-                    stock_header = "📈 **Ключевые активы:**"
-                else:  # close
-                    title = f"🔚 **{market_name} закрывается**"
-                    subtitle = "Рынок закрылся 15 минут назад"
-                    stock_header = "📊 **Итоги торгов:**"
-                
-                # Format topic-specific assets in Russian
-                stock_text = ""
-                for stock in stock_prices:
-                    direction = "📈" if stock['change_direction'] == 'up' else "📉"
-                    source_info = f" ({stock.get('source', 'Market Data')})" if 'source' in stock else ""
-                    stock_text += f"\n{direction} **{stock['symbol']}** ({stock['name']}){source_info}\n"
-                    stock_text += f"   Цена: ${stock['price']} ({stock['change']:+.2f}%)\n"
-                
-                message = f"""{title}
-{subtitle}
-
-{stock_header}
-{stock_text}
-
-⏰ Время: {datetime.now().strftime('%H:%M')} EST"""
-                
-            else:
-                if action == 'open':
-                    title = f"🚀 **{market_name} Opening**"
-                    subtitle = "Market opens in 15 minutes"
-                    stock_header = "📈 **Key Assets:**"
-                else:  # close
-                    title = f"🔚 **{market_name} Closing**"
-                    subtitle = "Market closed 15 minutes ago"
-                    stock_header = "📊 **Trading Summary:**"
-                
-                # Format topic-specific assets in English
-                stock_text = ""
-                for stock in stock_prices:
-                    direction = "📈" if stock['change_direction'] == 'up' else "📉"
-                    source_info = f" ({stock.get('source', 'Market Data')})" if 'source' in stock else ""
-                    stock_text += f"\n{direction} **{stock['symbol']}** ({stock['name']}){source_info}\n"
-                    stock_text += f"   Price: ${stock['price']} ({stock['change']:+.2f}%)\n"
-                
-                message = f"""{title}
-{subtitle}
+            texts = TRANSLATIONS['ru' if user_language == 'ru' else 'en']
+            kind = 'open' if action == 'open' else 'close'
+            
+            # Format topic-specific assets in the user's language
+            price_label = texts['market_price']
+            stock_lines = []
+            for stock in stock_prices:
+                direction = "📈" if stock['change_direction'] == 'up' else "📉"
+                source_info = f" ({stock.get('source', 'Market Data')})" if 'source' in stock else ""
+                stock_lines.append(
+                    f"\n{direction} **{stock['symbol']}** ({stock['name']}){source_info}\n"
+                    f"   {price_label}: ${stock['price']} ({stock['change']:+.2f}%)\n"
+                )
+            stock_text = ''.join(stock_lines)
+            
+            message = f"""{texts[f'market_{kind}_title'].format(market=market_name)}
+{texts[f'market_{kind}_subtitle']}
 
-{stock_header}
+{texts[f'market_{kind}_header']}
 {stock_text}
 
-⏰ Time: {datetime.now().strftime('%H:%M')} EST"""
+⏰ {texts['market_time']}: {datetime.now(MARKET_TIMEZONE).strftime('%H:%M %Z')}"""
             
-            logger.info(f"Sending market notification to user {user_id}: {message}")
+            logger.debug(f"Sending market notification to user {user_id}: {message}")
             
             # Send notification
-            await self.bot.send_message(
+            await self._send_message(
                 chat_id=user_id,
                 text=message,
                 parse_mode='Markdown'
             )
+            return True
             
         except Exception as e:
+            if chat_unreachable(e):
+                raise
             logger.error(f"Error sending market notification to user {user_id}: {e}")
+            return False
     
     def setup_handlers(self):
         """Setup command handlers"""
-        self.application.add_handler(CommandHandler("start", self.start_command))
-        self.application.add_handler(CommandHandler("news", self.manual_news_command))
-        self.application.add_handler(CommandHandler("notify", self.manual_notify_command))
-        self.application.add_handler(CommandHandler("help", self.help_command))
-        self.application.add_handler(CommandHandler("status", self.status_command))
-        self.application.add_handler(CommandHandler("subscribe", self.subscribe_command))
-        self.application.add_handler(CommandHandler("unsubscribe", self.unsubscribe_command))
-        self.application.add_handler(CommandHandler("stats", self.stats_command))
-        self.application.add_handler(CommandHandler("addadmin", self.add_admin_command))
-        self.application.add_handler(CommandHandler("language", self.language_command))
-        self.application.add_handler(CommandHandler("topics", self.topics_command))
-        self.application.add_handler(CommandHandler("testmarket", self.test_market_notification_command))
-        self.application.add_handler(CommandHandler("testchatgpt", self.test_chatgpt_command))
-        
-        # Add callback query handler for inline buttons
-        from telegram.ext import CallbackQueryHandler
-        self.application.add_handler(CallbackQueryHandler(self.handle_callback))
+        commands = (
+            ("start", self.start_command),
+            ("news", self.manual_news_command),
+            ("notify", self.manual_notify_command),
+            ("help", self.help_command),
+            ("status", self.status_command),
+            ("subscribe", self.subscribe_command),
+            ("unsubscribe", self.unsubscribe_command),
+            ("stats", self.stats_command),
+            ("addadmin", self.add_admin_command),
+            ("language", self.language_command),
+            ("topics", self.topics_command),
+            ("testmarket", self.test_market_notification_command),
+            ("testchatgpt", self.test_chatgpt_command),
+        )
+        
+        # Register all commands plus the callback query handler for inline buttons in one call
+        self.application.add_handlers(
+            [CommandHandler(name, callback) for name, callback in commands]
+            + [CallbackQueryHandler(self.handle_callback)]
+        )
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
-        
-        # Get translated text to avoid Markdown conflicts
-        welcome_title = self.get_text(user.id, 'welcome_title')
-        welcome_message_text = self.get_text(user.id, 'welcome_message', name=user.first_name)
-        what_i_do = self.get_text(user.id, 'what_i_do')
-        daily_news = self.get_text(user.id, 'daily_news')
-        sentiment_analysis = self.get_text(user.id, 'sentiment_analysis')
-        predictions = self.get_text(user.id, 'predictions')
-        auto_updates = self.get_text(user.id, 'auto_updates')
-        commands = self.get_text(user.id, 'commands')
-        news_cmd = self.get_text(user.id, 'news_cmd')
-        topics_cmd = self.get_text(user.id, 'topics_cmd')
-        notify_cmd = self.get_text(user.id, 'notify_cmd')
-        subscribe_cmd = self.get_text(user.id, 'subscribe_cmd')
-        unsubscribe_cmd = self.get_text(user.id, 'unsubscribe_cmd')
-        language_cmd = self.get_text(user.id, 'language_cmd')
-        help_cmd = self.get_text(user.id, 'help_cmd')
-        status_cmd = self.get_text(user.id, 'status_cmd')
-        stats_cmd = self.get_text(user.id, 'stats_cmd')
-        admin_features = self.get_text(user.id, 'admin_features')
-        first_user_admin = self.get_text(user.id, 'first_user_admin')
-        addadmin_info = self.get_text(user.id, 'addadmin_info')
-        notify_info = self.get_text(user.id, 'notify_info')
-        auto_subscribe = self.get_text(user.id, 'auto_subscribe')
-        subscribed_message = self.get_text(user.id, 'subscribed_message')
-        ready_message = self.get_text(user.id, 'ready_message')
-        
-        welcome_message = f"""
-🤖 **{welcome_title}** 🤖
-
-{welcome_message_text}
-
-**🚀 {what_i_do}**
-📈 {daily_news}
-🔮 {sentiment_analysis}
-📊 {predictions}
-⏰ {auto_updates}
-🕐 Market open/close notifications with stock prices
-
-**📱 {commands}**
-{news_cmd}
-{topics_cmd}
-{notify_cmd}
-{subscribe_cmd}
-{unsubscribe_cmd}
-{language_cmd}
-{help_cmd}
-{status_cmd}
-{stats_cmd}
-
-**🔐 {admin_features}**
-• {first_user_admin}
-• {addadmin_info}
-• {notify_info}
-• /testmarket - Test market notifications
-
-**🔔 {auto_subscribe}**
-{subscribed_message}
-
-{ready_message} 📊
-        """
+        await asyncio.to_thread(self.db.add_user, user.id, user.username, user.first_name, user.last_name)
+        
+        # Static per-language text, rendered once at import; only the name is filled in here
+        language = self._user_language(user.id)
+        welcome_message = WELCOME_TEMPLATES[language].format(name=user.first_name)
         await update.message.reply_text(welcome_message, parse_mode='Markdown')
     
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
-        
-        # Get translated text to avoid Markdown conflicts
-        welcome_title = self.get_text(user.id, 'welcome_title')
-        commands_text = self.get_text(user.id, 'commands')
-        news_cmd = self.get_text(user.id, 'news_cmd')
-        topics_cmd = self.get_text(user.id, 'topics_cmd')
-        notify_cmd = self.get_text(user.id, 'notify_cmd')
-        subscribe_cmd = self.get_text(user.id, 'subscribe_cmd')
-        unsubscribe_cmd = self.get_text(user.id, 'unsubscribe_cmd')
-        language_cmd = self.get_text(user.id, 'language_cmd')
-        help_cmd = self.get_text(user.id, 'help_cmd')
-        status_cmd = self.get_text(user.id, 'status_cmd')
-        stats_cmd = self.get_text(user.id, 'stats_cmd')
-        
-        help_text = f"""
-**📚 {welcome_title} - Help**
-
-**🔧 {commands_text}**
-
-/start - Welcome message and bot introduction
-/news - {news_cmd}
-/topics - {topics_cmd}
-/notify - {notify_cmd}
-/subscribe - {subscribe_cmd}
-/unsubscribe - {unsubscribe_cmd}
-/language - {language_cmd}
-/help - {help_cmd}
-/status - {status_cmd}
-/stats - {stats_cmd}
-
-**🔐 Admin Commands:**
-/addadmin <user_id> - Add a new admin user (Admin only)
-/testmarket - Test market notifications (Admin only)
-/testchatgpt - Test ChatGPT integration (Admin only)
-
-**⏰ Automatic Features:**
-• Daily market summary at 9:00 AM EST
-• Market opening summary at 9:30 AM EST (weekdays)
-• **NEW: Market notifications 15 min before/after open/close**
-• **NEW: Major stock price changes included in notifications**
-• News from 10+ major financial sources
-• Sentiment analysis and trend detection
-• Market predictions based on news analysis
-
-**📊 News Sources:**
-• Yahoo Finance
-• MarketWatch  
-• CNBC
-• Reuters Business
-• Bloomberg
-• Financial Times
-• Seeking Alpha
-• Investing.com
-• Barron's
-• Wall Street Journal
-
-**💡 Tips:**
-- Use /news anytime for the latest market summary
-- Subscribe for automatic daily updates
-- Check /status for current market sentiment
-- All predictions are for educational purposes only
-
-**⚠️ Disclaimer:** This bot provides news summaries and analysis for informational purposes only. Not financial advice.
-
-Need help? The bot is fully automated and runs 24/7!
-        """
+        await asyncio.to_thread(self.db.add_user, user.id, user.username, user.first_name, user.last_name)
+        
+        help_text = HELP_TEXTS[self._user_language(user.id)]
         await update.message.reply_text(help_text, parse_mode='Markdown')
     
     async def subscribe_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /subscribe command"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
-        self.db.subscribe_user(user.id)
+        await asyncio.to_thread(self.db.add_user, user.id, user.username, user.first_name, user.last_name)
+        await asyncio.to_thread(self.db.subscribe_user, user.id)
         
         subscribe_message = """
 ✅ **Subscription Activated!**
 
 You'll now receive automatic daily market summaries:
 
-🌅 **Morning Summary** - 7:00 AM EST
-📈 **Market Open** - 9:30 AM EST (weekdays only)
+🌅 **Morning Summary** - 9:00 AM ET
+📈 **Market Open** - 9:30 AM ET (weekdays only)
 
 Each summary includes:
 • Latest market news from top financial sources
@@ -1091,7 +1922,7 @@ Happy trading! 📊🚀
     async def unsubscribe_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /unsubscribe command"""
         user = update.effective_user
-        self.db.unsubscribe_user(user.id)
+        await asyncio.to_thread(self.db.unsubscribe_user, user.id)
         
         unsubscribe_message = """
 😔 **Subscription Cancelled**
@@ -1104,8 +1935,8 @@ You've been unsubscribed from automatic daily updates.
 • Access all other bot features
 
 **Note:** You'll no longer receive:
-❌ Daily 7:00 AM EST summaries
-❌ Market opening updates at 9:30 AM EST
+❌ Daily 9:00 AM ET summaries
+❌ Market opening updates at 9:30 AM ET
 
 Use /subscribe anytime to re-enable automatic updates!
         """
@@ -1113,8 +1944,8 @@ Use /subscribe anytime to re-enable automatic updates!
     
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stats command"""
-        total_users = self.db.get_user_count()
-        subscribers = self.db.get_subscriber_count()
+        total_users = await asyncio.to_thread(self.db.get_user_count)
+        subscribers = await asyncio.to_thread(self.db.get_subscriber_count)
         
         stats_message = f"""
 📊 **Bot Statistics**
@@ -1125,12 +1956,12 @@ Use /subscribe anytime to re-enable automatic updates!
 • Subscription Rate: {(subscribers/total_users*100) if total_users > 0 else 0:.1f}%
 
 📈 **Service Info:**
-• News Sources: {len(self.news_sources)}
+• News Sources: {len(NEWS_SOURCES)}
 • Daily Summaries: 2 per day
 • Coverage: Global financial markets
 • Uptime: 24/7 automated service
 
-🔄 **Last Update:** {datetime.now().strftime('%Y-%m-%d %H:%M')} EST
+🔄 **Last Update:** {datetime.now(MARKET_TIMEZONE).strftime('%Y-%m-%d %H:%M %Z')}
 
 The bot is serving the financial community with real-time market intelligence!
         """
@@ -1141,15 +1972,12 @@ The bot is serving the financial community with real-time market intelligence!
         user = update.effective_user
         
         # Check if user is subscribed
-        subscribed_users = self.db.get_subscribed_users()
-        is_subscribed = user.id in subscribed_users
+        is_subscribed = await asyncio.to_thread(self.db.is_subscribed, user.id)
         
-        # Get current market day info
-        now = datetime.now()
-        market_status = "🔴 Closed"
-        if now.weekday() < 5:  # Monday to Friday
-            if 9 <= now.hour < 16:  # 9 AM to 4 PM EST (approximate)
-                market_status = "🟢 Open"
+        # Get current market day info in New York time, the same clock the scheduler runs on
+        now = datetime.now(MARKET_TIMEZONE)
+        # Monday to Friday, 9 AM to 4 PM ET (approximate)
+        market_status = "🟢 Open" if now.weekday() < 5 and 9 <= now.hour < 16 else "🔴 Closed"
         
         status_message = f"""
 🤖 **Bot Status: 🟢 ONLINE**
@@ -1161,12 +1989,12 @@ The bot is serving the financial community with real-time market intelligence!
 
 **📈 Market Status:**
 • US Markets: {market_status}
-• Current Time: {now.strftime('%H:%M')} EST
-• Next Summary: {"Tomorrow 7:00 AM" if now.hour >= 10 else "Today 7:00 AM"} EST
+• Current Time: {now.strftime('%H:%M %Z')}
+• Next Summary: {"Tomorrow 9:00 AM" if now.hour >= 9 else "Today 9:00 AM"} ET
 
 **🔄 Bot Health:**
 • Status: Fully operational
-• News Sources: {len(self.news_sources)} active
+• News Sources: {len(NEWS_SOURCES)} active
 • Database: Connected
 • Updates: Real-time
 
@@ -1180,7 +2008,7 @@ Use /news to get the latest market analysis!
     async def manual_news_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle manual /news command - get unified digest"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        await asyncio.to_thread(self.db.add_user, user.id, user.username, user.first_name, user.last_name)
         
         await update.message.reply_text(self.get_text(user.id, 'fetching_news'))
         
@@ -1195,7 +2023,7 @@ Use /news to get the latest market analysis!
     async def manual_notify_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /notify command - manually trigger notification to all subscribers"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        await asyncio.to_thread(self.db.add_user, user.id, user.username, user.first_name, user.last_name)
         
         # Check if user is admin
         if not self.is_admin(user.id):
@@ -1209,41 +2037,44 @@ Use /news to get the latest market analysis!
         await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
         
         try:
-            # Generate fresh news summary
-            summary = await self.generate_daily_summary()
+            # Distinct subscriber preferences in one query; the users themselves are streamed by _broadcast
+            segments = await asyncio.to_thread(self.db.get_subscriber_segments)
             
-            # Get all subscribed users
-            subscribers = self.db.get_subscribed_users()
-            
-            if not subscribers:
+            if not segments:
                 await update.message.reply_text(self.get_text(user.id, 'no_subscribers'))
                 return
             
-            # Send notification to all subscribers
-            successful_sends = 0
-            failed_sends = 0
+            blocked_users = []
+            digest_for = self._shared_digests(segments)
+            # digest -> notification text, so users sharing a digest are sent the very same string
+            notification_texts = {}
             
-            for user_id in subscribers:
+            async def send_one(user_id: int) -> bool:
                 try:
-                    # Generate unified digest for each user
-                    user_digest = await self.generate_unified_digest(user_id, include_stocks=True)
-                    await self.bot.send_message(
+                    # Unified digest for the user's language and topic
+                    user_digest = await digest_for(user_id)
+                    text = notification_texts.get(user_digest)
+                    if text is None:
+                        text = f"🔔 **{self.get_text(user_id, 'manual_notification')}**\n\n{user_digest}"
+                        notification_texts[user_digest] = text
+                    await self._send_message(
                         chat_id=user_id, 
-                        text=f"🔔 **{self.get_text(user_id, 'manual_notification')}**\n\n{user_digest}", 
+                        text=text, 
                         parse_mode='Markdown'
                     )
-                    successful_sends += 1
-                    
-                    # Rate limiting - Telegram allows ~30 messages per second
-                    await asyncio.sleep(0.05)
+                    return True
                     
                 except Exception as e:
-                    logger.error(f"Failed to send manual notification to user {user_id}: {e}")
-                    failed_sends += 1
-                    
-                    # If user blocked bot, unsubscribe them
-                    if "bot was blocked" in str(e).lower():
-                        self.db.unsubscribe_user(user_id)
+                    if chat_unreachable(e):
+                        # Bot blocked, account gone or chat not found: unsubscribe them (together, after the broadcast)
+                        blocked_users.append(user_id)
+                    else:
+                        logger.error(f"Failed to send manual notification to user {user_id}: {e}")
+                    return False
+            
+            # Send notification to all subscribers
+            successful_sends, failed_sends = await self._broadcast(send_one)
+            await asyncio.to_thread(self.db.unsubscribe_users, blocked_users)
             
             # Send confirmation to the user who triggered the notification
             confirmation = f"""
@@ -1252,9 +2083,9 @@ Use /news to get the latest market analysis!
 📊 **{self.get_text(user.id, 'results')}:**
 • {self.get_text(user.id, 'successfully_sent')}: {successful_sends} users
 • {self.get_text(user.id, 'failed_to_send')}: {failed_sends} users
-• {self.get_text(user.id, 'total_subscribers')}: {len(subscribers)} users
+• {self.get_text(user.id, 'total_subscribers')}: {successful_sends + failed_sends} users
 
-⏰ **{self.get_text(user.id, 'sent_at')}:** {datetime.now().strftime('%B %d, %Y at %H:%M:%S')} EST
+⏰ **{self.get_text(user.id, 'sent_at')}:** {datetime.now(MARKET_TIMEZONE).strftime('%B %d, %Y at %H:%M:%S %Z')}
 
 🔔 {self.get_text(user.id, 'all_notified')}
             """
@@ -1327,12 +2158,13 @@ Instructions: Create a professional, engaging digest that combines news insights
     async def add_admin_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /addadmin command - add a new admin user"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        await asyncio.to_thread(self.db.add_user, user.id, user.username, user.first_name, user.last_name)
         
         # Only allow the first user (bot owner) to add admins
         # You can customize this logic based on your needs
         if len(self.admin_users) == 0:
             # First user becomes admin automatically
+            await asyncio.to_thread(self.db.add_admin, user.id)
             self.admin_users.add(user.id)
             await update.message.reply_text(
                 "✅ **Admin Access Granted**\n\n"
@@ -1363,7 +2195,7 @@ Instructions: Create a professional, engaging digest that combines news insights
             new_admin_id = int(context.args[0])
             
             # Check if user exists in database
-            if new_admin_id not in [u[0] for u in self.db.get_all_users()]:
+            if not await asyncio.to_thread(self.db.user_exists, new_admin_id):
                 await update.message.reply_text(
                     "❌ **User Not Found**\n\n"
                     f"User ID {new_admin_id} is not registered with this bot.\n"
@@ -1372,6 +2204,7 @@ Instructions: Create a professional, engaging digest that combines news insights
                 return
             
             # Add to admin list
+            await asyncio.to_thread(self.db.add_admin, new_admin_id)
             self.admin_users.add(new_admin_id)
             
             await update.message.reply_text(
@@ -1393,18 +2226,18 @@ Instructions: Create a professional, engaging digest that combines news insights
     async def language_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /language command - show language selection with inline buttons"""
         user = update.effective_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        await asyncio.to_thread(self.db.add_user, user.id, user.username, user.first_name, user.last_name)
         
         # Show language selection menu with inline buttons
-        current_lang = self.db.get_user_language(user.id)
-        current_lang_name = self.get_text(user.id, 'english' if current_lang == 'en' else 'russian')
+        current_lang = self._user_language(user.id)
+        current_lang_name = self.text_for(current_lang, 'english' if current_lang == 'en' else 'russian')
         
         language_message = f"""
-🌍 **{self.get_text(user.id, 'language_selection')}**
+🌍 **{self.text_for(current_lang, 'language_selection')}**
 
-{self.get_text(user.id, 'choose_language')}
+{self.text_for(current_lang, 'choose_language')}
 
-**📍 {self.get_text(user.id, 'current_language')}**: {current_lang_name}
+**📍 {self.text_for(current_lang, 'current_language')}**: {current_lang_name}
 
 Выберите язык / Choose language:
         """
@@ -1430,43 +2263,23 @@ Instructions: Create a professional, engaging digest that combines news insights
         """Handle /topics command - show topic selection"""
         user = update.effective_user
         
-        # Get current topics
-        current_topics = self.db.get_user_topics(user.id)
-        
-        # Create topic selection keyboard
-        keyboard = []
-        row = []
-        
-        for topic_key, topic_names in self.available_topics.items():
-            topic_name = topic_names.get(self.db.get_user_language(user.id), topic_names['en'])
-            callback_data = f"topic_{topic_key}"
-            
-            # Mark current selection
-            if topic_key == current_topics:
-                topic_name = f"✅ {topic_name}"
-            
-            row.append(InlineKeyboardButton(topic_name, callback_data=callback_data))
-            
-            if len(row) == 2:  # 2 buttons per row
-                keyboard.append(row)
-                row = []
-        
-        if row:  # Add remaining buttons
-            keyboard.append(row)
+        # Language and current topics, looked up once for the whole handler
+        language, current_topics = self._user_prefs(user.id)
         
         # Add current topics info
         current_topic_names = []
         if current_topics == 'all':
-            current_topic_names = [self.get_text(user.id, 'topic_all')]
+            current_topic_names = [self.text_for(language, 'topic_all')]
         else:
-            current_topic_names = [self.available_topics[current_topics][self.db.get_user_language(user.id)]]
+            current_topic_names = [AVAILABLE_TOPICS[current_topics][language]]
         
         message_text = (
-            f"{self.get_text(user.id, 'topic_selection')}\n\n"
-            f"{self.get_text(user.id, 'current_topics')}: {', '.join(current_topic_names)}"
+            f"{self.text_for(language, 'topic_selection')}\n\n"
+            f"{self.text_for(language, 'current_topics')}: {', '.join(current_topic_names)}"
         )
         
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        # Unknown stored values fall back to a keyboard with nothing ticked
+        reply_markup = TOPIC_KEYBOARDS.get((language, current_topics)) or render_topic_keyboard(language, current_topics)
         await update.message.reply_text(message_text, reply_markup=reply_markup)
     
     async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -1475,7 +2288,7 @@ Instructions: Create a professional, engaging digest that combines news insights
         await query.answer()
         
         user = query.from_user
-        self.db.add_user(user.id, user.username, user.first_name, user.last_name)
+        await asyncio.to_thread(self.db.add_user, user.id, user.username, user.first_name, user.last_name)
         
         # Check if it's a language selection
         if query.data.startswith("lang_"):
@@ -1484,7 +2297,7 @@ Instructions: Create a professional, engaging digest that combines news insights
         elif query.data.startswith("topic_"):
             await self._handle_topic_selection(query)
         else:
-            await query.edit_message_text("❌ Invalid selection")
+            await self._edit_message(query, "❌ Invalid selection")
     
     async def _handle_language_selection(self, query):
         """Handle language selection from inline buttons"""
@@ -1498,11 +2311,11 @@ Instructions: Create a professional, engaging digest that combines news insights
             language = "en"
             language_name = "English"
         else:
-            await query.edit_message_text("❌ Invalid language selection")
+            await self._edit_message(query, "❌ Invalid language selection")
             return
         
         # Set user language
-        self.db.set_user_language(user.id, language)
+        await asyncio.to_thread(self.db.set_user_language, user.id, language)
         
         # Send confirmation message
         if language == "ru":
@@ -1522,90 +2335,120 @@ Instructions: Create a professional, engaging digest that combines news insights
 💡 **Tip**: Use /start to see the interface in your new language!
             """
         
-        await query.edit_message_text(confirmation, parse_mode='Markdown')
+        await self._edit_message(query, confirmation, parse_mode='Markdown')
     
     async def _handle_topic_selection(self, query):
         """Handle topic selection callbacks"""
         user_id = query.from_user.id
         topic_key = query.data.replace('topic_', '')
         
-        if topic_key in self.available_topics:
+        if topic_key in AVAILABLE_TOPICS:
             # Update user's topic preferences
-            self.db.set_user_topics(user_id, topic_key)
+            await asyncio.to_thread(self.db.set_user_topics, user_id, topic_key)
             
             # Get topic name in user's language
-            user_language = self.db.get_user_language(user_id)
-            topic_name = self.available_topics[topic_key].get(user_language, self.available_topics[topic_key]['en'])
+            user_language = self._user_language(user_id)
+            topic_name = AVAILABLE_TOPICS[topic_key].get(user_language, AVAILABLE_TOPICS[topic_key]['en'])
             
             # Update the message to show selection
-            keyboard = []
-            row = []
-            
-            for t_key, t_names in self.available_topics.items():
-                t_name = t_names.get(user_language, t_names['en'])
-                callback_data = f"topic_{t_key}"
-                
-                # Mark current selection
-                if t_key == topic_key:
-                    t_name = f"✅ {t_name}"
-                
-                row.append(InlineKeyboardButton(t_name, callback_data=callback_data))
-                
-                if len(row) == 2:
-                    keyboard.append(row)
-                    row = []
+            reply_markup = TOPIC_KEYBOARDS[(user_language, topic_key)]
             
-            if row:
-                keyboard.append(row)
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await query.edit_message_text(
-                f"{self.get_text(user_id, 'topics_updated')}\n\n"
-                f"{self.get_text(user_id, 'current_topics')}: {topic_name}",
+            await self._edit_message(
+                query,
+                f"{self.text_for(user_language, 'topics_updated')}\n\n"
+                f"{self.text_for(user_language, 'current_topics')}: {topic_name}",
                 reply_markup=reply_markup
             )
     
+    def _feed_check_interval(self, entries: List[Dict[str, any]]) -> float:
+        """Seconds until a feed is worth requesting again, from its observed posting rate"""
+        published = sorted(entry['timestamp'] for entry in entries if entry['timestamp'] is not None)
+        if len(published) < 2:
+            return FEED_MAX_CHECK_INTERVAL
+        # Busy feeds are rechecked about once per new post, quiet ones up to hourly
+        average_gap = (published[-1] - published[0]) / (len(published) - 1)
+        return min(max(average_gap, FEED_MIN_CHECK_INTERVAL), FEED_MAX_CHECK_INTERVAL)
+    
     async def fetch_news_from_source(self, source_name: str, url: str) -> List[NewsItem]:
         """Fetch news from a single RSS source"""
         try:
-            # Create SSL context that's more permissive for RSS feeds
-            import ssl
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            # Create connector with SSL context
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        feed = feedparser.parse(content)
-                        
-                        news_items = []
-                        for entry in feed.entries[:5]:  # Get top 5 articles
-                            news_items.append(NewsItem(
-                                title=entry.get('title', 'No title'),
-                                summary=entry.get('summary', entry.get('description', 'No summary')),
-                                source=source_name,
-                                published=entry.get('published', 'Unknown'),
-                                url=entry.get('link', '')
-                            ))
-                        return news_items
-                    else:
-                        logger.warning(f"HTTP {response.status} from {source_name}")
-                        return []
+            meta = self._feed_meta.get(url)
+            if meta and time.monotonic() < meta['next_check']:
+                return list(meta['items'])
+            
+            # Conditional GET: an unchanged feed answers 304 with no body to download or parse
+            headers = {}
+            if meta:
+                if meta['etag']:
+                    headers['If-None-Match'] = meta['etag']
+                if meta['last_modified']:
+                    headers['If-Modified-Since'] = meta['last_modified']
+            
+            session = self._http_session()
+            async with session.get(url, headers=headers, ssl=self._rss_ssl_context, timeout=RSS_TIMEOUT) as response:
+                if response.status == 304 and meta:
+                    meta['next_check'] = time.monotonic() + meta['interval']
+                    return list(meta['items'])
+                if response.status == 200:
+                    # Parse while downloading and stop reading once enough entries arrived
+                    head = FeedHeadParser(FEED_ITEMS_PER_SOURCE)
+                    chunks = []
+                    received = 0
+                    try:
+                        async for chunk in response.content.iter_chunked(FEED_READ_CHUNK_SIZE):
+                            chunks.append(chunk)
+                            received += len(chunk)
+                            if head.feed(chunk) or received >= FEED_MAX_BYTES:
+                                break
+                        entries = head.entries
+                    except ElementTree.ParseError:
+                        entries = []
+                    
+                    if not entries:
+                        # Malformed or unrecognised feed: read the rest and let feedparser handle it in a worker thread
+                        while received < FEED_MAX_BYTES:
+                            chunk = await response.content.read(FEED_MAX_BYTES - received)
+                            if not chunk:
+                                break
+                            chunks.append(chunk)
+                            received += len(chunk)
+                        entries = await asyncio.to_thread(feedparser_entries, b''.join(chunks), FEED_ITEMS_PER_SOURCE)
+                    
+                    news_items = []
+                    for entry in entries:
+                        news_items.append(NewsItem(
+                            title=entry['title'],
+                            summary=entry['summary'],
+                            source=source_name,
+                            published=entry['published'],
+                            url=entry['link'],
+                            published_at=(
+                                datetime.fromtimestamp(entry['timestamp'], timezone.utc)
+                                if entry['timestamp'] is not None else None
+                            )
+                        ))
+                    
+                    interval = self._feed_check_interval(entries)
+                    self._feed_meta[url] = {
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'items': news_items,
+                        'interval': interval,
+                        'next_check': time.monotonic() + interval
+                    }
+                    return list(news_items)
+                else:
+                    logger.warning(f"HTTP {response.status} from {source_name}")
+                    return []
         except Exception as e:
             logger.error(f"Error fetching from {source_name}: {e}")
             return []
     
     async def fetch_topic_news(self, user_id: int) -> List[NewsItem]:
         """Fetch topic-specific news using RSS + ChatGPT filtering"""
+        all_news = None
         try:
-            user_topics = self.db.get_user_topics(user_id)
-            user_language = self.db.get_user_language(user_id)
+            user_language, user_topics = self.db.get_user_prefs(user_id)
             
             logger.info(f"🎯 User {user_id} has topic: '{user_topics}', language: '{user_language}'")
             
@@ -1615,32 +2458,10 @@ Instructions: Create a professional, engaging digest that combines news insights
                 logger.warning("No RSS news available for topic filtering")
                 return []
             
-            # Define topic-specific keywords for filtering
-            topic_keywords = {
-                'all': {
-                    'en': ['market', 'stock', 'economy', 'financial', 'trading', 'investment', 'earnings', 'revenue', 'profit', 'growth', 'company', 'business', 'industry', 'sector', 'price', 'index', 'dow', 'nasdaq', 'sp500', 'fed', 'inflation', 'interest', 'rate', 'oil', 'gas', 'gold', 'silver', 'tech', 'bank', 'energy', 'mining'],
-                    'ru': ['рынок', 'акции', 'экономика', 'финансы', 'торговля', 'инвестиции', 'доходы', 'выручка', 'прибыль', 'рост', 'компания', 'бизнес', 'отрасль', 'сектор', 'цена', 'индекс', 'dow', 'nasdaq', 'sp500', 'фрс', 'инфляция', 'процент', 'ставка', 'нефть', 'газ', 'золото', 'серебро', 'технологии', 'банк', 'энергия', 'добыча']
-                },
-                'oil_gas': {
-                    'en': ['oil', 'gas', 'energy', 'petroleum', 'crude', 'brent', 'wti', 'opec', 'pipeline', 'refinery', 'exxon', 'chevron', 'shell', 'bp', 'energy', 'fuel', 'drilling', 'shale'],
-                    'ru': ['нефть', 'газ', 'энергия', 'нефтепродукты', 'сырая', 'брент', 'wti', 'опек', 'трубопровод', 'нефтепереработка', 'эксон', 'шеврон', 'шелл', 'бп', 'энергия', 'топливо', 'бурение', 'сланцы']
-                },
-                'metals_mining': {
-                    'en': ['gold', 'silver', 'copper', 'aluminum', 'nickel', 'zinc', 'platinum', 'palladium', 'mining', 'commodity', 'ore', 'mineral', 'bhp', 'rio tinto', 'vale', 'glencore', 'mining', 'extraction'],
-                    'ru': ['золото', 'серебро', 'медь', 'алюминий', 'никель', 'цинк', 'платина', 'палладий', 'добыча', 'сырье', 'руда', 'минерал', 'bhp', 'rio tinto', 'vale', 'glencore', 'добыча', 'извлечение']
-                },
-                'technology': {
-                    'en': ['tech', 'technology', 'ai', 'artificial intelligence', 'semiconductor', 'chip', 'software', 'digital', 'innovation', 'apple', 'microsoft', 'google', 'amazon', 'meta', 'tesla', 'nvidia', 'amd', 'intel'],
-                    'ru': ['технологии', 'искусственный интеллект', 'полупроводники', 'чип', 'программное обеспечение', 'цифровой', 'инновации', 'apple', 'microsoft', 'google', 'amazon', 'meta', 'tesla', 'nvidia', 'amd', 'intel']
-                },
-                'finance': {
-                    'en': ['bank', 'banking', 'financial', 'finance', 'credit', 'loan', 'mortgage', 'interest rate', 'federal reserve', 'fed', 'jpmorgan', 'goldman', 'morgan stanley', 'credit suisse', 'ubs', 'regulation', 'compliance'],
-                    'ru': ['банк', 'банковское дело', 'финансы', 'кредит', 'ссуда', 'ипотека', 'процентная ставка', 'федеральная резервная система', 'фрс', 'jpmorgan', 'goldman', 'morgan stanley', 'credit suisse', 'ubs', 'регулирование', 'соответствие']
-                }
-            }
-            
             # Get keywords for user's topic and language
-            keywords = topic_keywords[user_topics].get(user_language, topic_keywords[user_topics]['en'])
+            keyword_language = user_language if user_language in TOPIC_KEYWORDS[user_topics] else 'en'
+            keywords = TOPIC_KEYWORDS[user_topics][keyword_language]
+            score_key = (user_topics, keyword_language)
             
             # Filter news by topic relevance
             relevant_news = []
@@ -1648,9 +2469,10 @@ Instructions: Create a professional, engaging digest that combines news insights
             logger.info(f"🔍 Using keywords: {keywords[:5]}...")  # Log first 5 keywords
             
             for item in all_news:
-                # Check if news item contains topic-relevant keywords
-                text = (item.title + ' ' + item.summary).lower()
-                relevance_score = sum(1 for keyword in keywords if keyword.lower() in text)
+                # Check if news item contains topic-relevant keywords; all topics are scored together, once per item
+                if not item.topic_scores:
+                    item.topic_scores.update(score_topics(item.search_text))
+                relevance_score = item.topic_scores[score_key]
                 
                 if relevance_score > 0:
                     relevant_news.append((item, relevance_score))
@@ -1681,28 +2503,44 @@ Instructions: Create a professional, engaging digest that combines news insights
             
         except Exception as e:
             logger.error(f"Error fetching topic news: {e}")
-            return await self.fetch_all_news()
+            # Reuse the news already fetched for this call rather than going through the cache again
+            return all_news if all_news is not None else await self.fetch_all_news()
     
     async def _enhance_news_with_chatgpt(self, news_items: List[NewsItem], topic: str, language: str) -> List[NewsItem]:
-        """Enhance filtered news with ChatGPT analysis"""
+        """Enhance filtered news with ChatGPT analysis, reusing a recent answer for the same articles"""
+        cache_key = (topic, language, tuple(sorted(item.url for item in news_items)))
+        now = time.monotonic()
+        cached = self._enhanced_news_cache.get(cache_key)
+        if cached is None or cached[0] <= now:
+            if len(self._enhanced_news_cache) >= ENHANCED_NEWS_CACHE_SIZE:
+                # Drop expired answers first, then the oldest ones
+                self._enhanced_news_cache = {key: value for key, value in self._enhanced_news_cache.items() if value[0] > now}
+                while len(self._enhanced_news_cache) >= ENHANCED_NEWS_CACHE_SIZE:
+                    del self._enhanced_news_cache[next(iter(self._enhanced_news_cache))]
+            cached = (now + ENHANCED_NEWS_TTL, asyncio.ensure_future(self._request_news_enhancement(news_items, topic, language)))
+            self._enhanced_news_cache[cache_key] = cached
+        # shield: a cancelled caller must not cancel the request other users are waiting on
+        enhanced = await asyncio.shield(cached[1])
+        
+        if enhanced:
+            return list(enhanced)
+        
+        # Failed answers are not kept, so the next call asks again
+        if self._enhanced_news_cache.get(cache_key) is cached:
+            del self._enhanced_news_cache[cache_key]
+        return news_items  # Return original news if enhancement fails
+    
+    async def _request_news_enhancement(self, news_items: List[NewsItem], topic: str, language: str) -> Optional[List[NewsItem]]:
+        """Ask ChatGPT to enhance the news; None if the request fails"""
         try:
             # Create prompt for ChatGPT to enhance the news
-            topic_names = {
-                'all': {'en': 'general financial markets', 'ru': 'общие финансовые рынки'},
-                'oil_gas': {'en': 'oil and gas sector', 'ru': 'нефтегазовый сектор'},
-                'metals_mining': {'en': 'metals and mining sector', 'ru': 'металлургия и добыча'},
-                'technology': {'en': 'technology sector', 'ru': 'технологический сектор'},
-                'finance': {'en': 'finance and banking sector', 'ru': 'финансовый и банковский сектор'}
-            }
-            
-            topic_name = topic_names[topic].get(language, topic_names[topic]['en'])
+            topic_name = TOPIC_SECTOR_NAMES[topic].get(language, TOPIC_SECTOR_NAMES[topic]['en'])
             
             # Prepare news content for ChatGPT
-            news_content = ""
-            for i, item in enumerate(news_items, 1):
-                news_content += f"{i}. {item.title}\n"
-                news_content += f"   Summary: {item.summary}\n"
-                news_content += f"   Source: {item.source}\n\n"
+            news_content = "".join(
+                f"{i}. {item.title}\n   Summary: {item.summary}\n   Source: {item.source}\n\n"
+                for i, item in enumerate(news_items, 1)
+            )
             
             prompt = f"""Analyze and enhance these {topic_name} news stories. For each story, provide:
 
@@ -1718,65 +2556,67 @@ Key Insights: [What investors should know]
 
 Focus on making the analysis professional and actionable for investors in this sector."""
 
-            # Use ChatGPT to enhance the news
-            client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-            response = await client.chat.completions.create(
+            # Use ChatGPT to enhance the news, streamed so generation can stop once every story is complete
+            stream = await self._chat_completion(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are a financial analyst specializing in market analysis. Enhance news stories with professional insights and market impact analysis."},
                     {"role": "user", "content": prompt + "\n\n" + news_content}
                 ],
                 max_tokens=1000,
-                temperature=0.3
+                temperature=0.3,
+                stream=True
             )
+            parts = []
+            try:
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if not delta:
+                        continue
+                    parts.append(delta)
+                    if '\n' in delta and self._enhanced_stories_complete(''.join(parts), len(news_items)):
+                        # Closing remarks after the last story are never used, so they aren't waited for
+                        break
+            finally:
+                await stream.close()
             
             # Parse enhanced content and update news items
-            enhanced_content = response.choices[0].message.content
+            enhanced_content = ''.join(parts)
             return self._parse_enhanced_news(enhanced_content, news_items, language)
             
         except Exception as e:
             logger.warning(f"ChatGPT enhancement failed: {e}")
-            return news_items  # Return original news if enhancement fails
+            return None
+    
+    def _enhanced_stories_complete(self, partial_content: str, story_count: int) -> bool:
+        """True once the streamed reply holds `story_count` stories whose Key Insights line has ended"""
+        complete_lines = partial_content[:partial_content.rfind('\n')]
+        finished = sum(1 for match in ENHANCED_NEWS_RE.finditer(complete_lines) if match.group('insights'))
+        return finished >= story_count
     
     def _parse_enhanced_news(self, enhanced_content: str, original_news: List[NewsItem], language: str) -> List[NewsItem]:
         """Parse ChatGPT enhanced news content"""
         try:
-            import re
             enhanced_news = []
             
-            # Split content into sections
-            sections = enhanced_content.split('\n\n')
-            
-            for i, section in enumerate(sections):
-                if i >= len(original_news):
-                    break
-                    
-                # Extract enhanced components
-                enhanced_summary_match = re.search(r'Enhanced Summary:\s*(.+)', section)
-                market_impact_match = re.search(r'Market Impact:\s*(.+)', section)
-                key_insights_match = re.search(r'Key Insights:\s*(.+)', section)
+            # A single pass over the whole reply; stories pair up with the originals by position
+            for original_item, match in zip(original_news, ENHANCED_NEWS_RE.finditer(enhanced_content)):
+                # Combine enhanced summary with market impact and insights
+                enhanced_summary = match.group('summary').strip()
+                if match.group('impact'):
+                    enhanced_summary += f" Market Impact: {match.group('impact').strip()}"
+                if match.group('insights'):
+                    enhanced_summary += f" Key Insights: {match.group('insights').strip()}"
                 
-                if enhanced_summary_match:
-                    # Update the original news item with enhanced content
-                    original_item = original_news[i]
-                    
-                    # Combine enhanced summary with market impact and insights
-                    enhanced_summary = enhanced_summary_match.group(1).strip()
-                    if market_impact_match:
-                        enhanced_summary += f" Market Impact: {market_impact_match.group(1).strip()}"
-                    if key_insights_match:
-                        enhanced_summary += f" Key Insights: {key_insights_match.group(1).strip()}"
-                    
-                    # Create enhanced news item
-                    enhanced_item = NewsItem(
-                        title=original_item.title,
-                        summary=enhanced_summary,
-                        source=original_item.source,
-                        published=original_item.published,
-                        url=original_item.url
-                    )
-                    
-                    enhanced_news.append(enhanced_item)
+                # Create enhanced news item
+                enhanced_news.append(NewsItem(
+                    title=original_item.title,
+                    summary=enhanced_summary,
+                    source=original_item.source,
+                    published=original_item.published,
+                    url=original_item.url,
+                    published_at=original_item.published_at
+                ))
             
             return enhanced_news if enhanced_news else original_news
             
@@ -1787,68 +2627,112 @@ Focus on making the analysis professional and actionable for investors in this s
 
     
     async def fetch_all_news(self) -> List[NewsItem]:
+        """Fetch news from all sources with fallback, sharing one result for NEWS_CACHE_TTL seconds"""
+        now = time.monotonic()
+        if self._news_cache is None or self._news_cache[0] <= now:
+            # Concurrent callers (e.g. every user of a broadcast) await the same in-flight fetch
+            self._news_cache = (now + NEWS_CACHE_TTL, asyncio.ensure_future(self._fetch_all_news_uncached()))
+        cached = self._news_cache
+        try:
+            return list(await asyncio.shield(cached[1]))
+        except Exception:
+            # A failed fetch is not reused
+            if self._news_cache is cached:
+                self._news_cache = None
+            raise
+    
+    async def _news_snapshot(self) -> Tuple[List[NewsItem], Dict[str, any], str, List[NewsItem]]:
+        """Shared news with its sentiment analysis, predictions and summary headlines, computed once per news fetch"""
+        news_items = await self.fetch_all_news()
+        cache_entry = self._news_cache
+        if self._news_analysis is None or self._news_analysis[0] is not cache_entry:
+            analysis = self.analyze_news_sentiment(news_items)
+            
+            # Top headlines from different sources: the first 5 distinct sources among the first 8 items
+            headlines = []
+            added_sources = set()
+            for item in news_items[:8]:
+                if item.source not in added_sources and len(headlines) < 5:
+                    headlines.append(item)
+                    added_sources.add(item.source)
+            
+            self._news_analysis = (cache_entry, analysis, self.generate_predictions(analysis), headlines)
+        return news_items, self._news_analysis[1], self._news_analysis[2], self._news_analysis[3]
+    
+    async def _fetch_all_news_uncached(self) -> List[NewsItem]:
         """Fetch news from all sources with fallback (legacy method)"""
         all_news = []
         successful_sources = 0
         
-        # Try primary sources first
-        for source_name, url in self.news_sources.items():
-            try:
-                news_items = await self.fetch_news_from_source(source_name, url)
-                if news_items:
-                    all_news.extend(news_items)
-                    successful_sources += 1
-                    logger.info(f"✅ Successfully fetched from {source_name}: {len(news_items)} articles")
-                else:
-                    logger.warning(f"⚠️ No news from {source_name}")
-            except Exception as e:
-                logger.error(f"❌ Failed to fetch from {source_name}: {e}")
+        # Try primary sources first, all feeds at once over the shared session
+        results = await asyncio.gather(
+            *(self.fetch_news_from_source(source_name, url) for source_name, url in NEWS_SOURCES.items()),
+            return_exceptions=True
+        )
+        for source_name, news_items in zip(NEWS_SOURCES, results):
+            if isinstance(news_items, Exception):
+                logger.error(f"❌ Failed to fetch from {source_name}: {news_items}")
+            elif news_items:
+                all_news.extend(news_items)
+                successful_sources += 1
+                logger.info(f"✅ Successfully fetched from {source_name}: {len(news_items)} articles")
+            else:
+                logger.warning(f"⚠️ No news from {source_name}")
         
         # If we don't have enough news, try fallback sources
         if len(all_news) < 10 and successful_sources < 3:
             logger.info("🔄 Trying fallback RSS sources...")
-            for source_name, url in self.fallback_sources.items():
-                try:
-                    news_items = await self.fetch_news_from_source(source_name, url)
-                    if news_items:
-                        all_news.extend(news_items)
-                        logger.info(f"✅ Fallback success from {source_name}: {len(news_items)} articles")
-                except Exception as e:
-                    logger.error(f"❌ Fallback failed for {source_name}: {e}")
+            results = await asyncio.gather(
+                *(self.fetch_news_from_source(source_name, url) for source_name, url in FALLBACK_SOURCES.items()),
+                return_exceptions=True
+            )
+            for source_name, news_items in zip(FALLBACK_SOURCES, results):
+                if isinstance(news_items, Exception):
+                    logger.error(f"❌ Fallback failed for {source_name}: {news_items}")
+                elif news_items:
+                    all_news.extend(news_items)
+                    logger.info(f"✅ Fallback success from {source_name}: {len(news_items)} articles")
+        
+        # The same story often arrives from several feeds under different URLs; de-duplicating and
+        # keyword-scanning the batch in a worker thread keeps the loop free for other users' updates
+        unique_news = await asyncio.to_thread(dedupe_and_scan, all_news)
+        if len(unique_news) < len(all_news):
+            logger.info(f"🧹 Dropped {len(all_news) - len(unique_news)} near-duplicate articles")
+        all_news = unique_news
         
         logger.info(f"📊 Total news fetched: {len(all_news)} articles from {successful_sources} sources")
         
         # If no news was fetched, create some mock content to avoid empty summaries
         if not all_news:
             logger.warning("⚠️ No news fetched from any source, creating fallback content")
-            all_news = self.create_fallback_news()
+            all_news = dedupe_and_scan(self.create_fallback_news())
         
         return all_news
     
     def create_fallback_news(self) -> List[NewsItem]:
         """Create fallback news content when RSS feeds fail"""
-        from datetime import datetime, timedelta
+        now = datetime.now()
         
         fallback_news = [
             NewsItem(
                 title="Market Update: Trading Session Overview",
                 summary="Current market session shows mixed signals across major indices. Technology sector leading gains while energy stocks face pressure from oil price fluctuations.",
                 source="System Generated",
-                published=(datetime.now() - timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"),
+                published=(now - timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"),
                 url=""
             ),
             NewsItem(
                 title="Economic Calendar: Key Events This Week",
                 summary="Federal Reserve meeting minutes, CPI data, and earnings reports from major tech companies expected to drive market sentiment this week.",
                 source="System Generated",
-                published=(datetime.now() - timedelta(hours=2)).strftime("%Y-%m-%d %H:%M:%S"),
+                published=(now - timedelta(hours=2)).strftime("%Y-%m-%d %H:%M:%S"),
                 url=""
             ),
             NewsItem(
                 title="Sector Performance: Market Rotation Continues",
                 summary="Defensive sectors showing strength as investors assess economic data. Healthcare and utilities outperforming while cyclical stocks remain volatile.",
                 source="System Generated",
-                published=(datetime.now() - timedelta(hours=3)).strftime("%Y-%m-%d %H:%M:%S"),
+                published=(now - timedelta(hours=3)).strftime("%Y-%m-%d %H:%M:%S"),
                 url=""
             )
         ]
@@ -1858,61 +2742,22 @@ Focus on making the analysis professional and actionable for investors in this s
     
     def analyze_news_sentiment(self, news_items: List[NewsItem]) -> Dict[str, any]:
         """Advanced sentiment analysis and trend detection"""
-        positive_keywords = ['gain', 'rise', 'up', 'bull', 'growth', 'profit', 'surge', 'rally', 'boom', 
-                           'strong', 'beat', 'exceed', 'positive', 'upgrade', 'buy', 'optimistic']
-        negative_keywords = ['fall', 'drop', 'down', 'bear', 'loss', 'crash', 'decline', 'recession', 
-                           'slump', 'weak', 'miss', 'disappointing', 'negative', 'downgrade', 'sell', 'pessimistic']
-        
-        positive_count = 0
-        negative_count = 0
-        neutral_count = 0
-        
-        trending_topics = {}
-        sector_mentions = {}
-        
-        # Sector keywords
-        sectors = {
-            'tech': ['technology', 'tech', 'apple', 'microsoft', 'google', 'amazon', 'meta', 'tesla', 'nvidia'],
-            'energy': ['oil', 'gas', 'energy', 'exxon', 'chevron', 'renewable'],
-            'finance': ['bank', 'finance', 'jpmorgan', 'goldman', 'credit', 'loan'],
-            'healthcare': ['health', 'pharma', 'drug', 'medical', 'pfizer', 'johnson'],
-            'crypto': ['bitcoin', 'crypto', 'ethereum', 'blockchain', 'digital currency']
-        }
-        
         for item in news_items:
-            text = (item.title + ' ' + item.summary).lower()
-            
-            # Count sentiment
-            pos_score = sum(1 for word in positive_keywords if word in text)
-            neg_score = sum(1 for word in negative_keywords if word in text)
-            
-            if pos_score > neg_score:
-                positive_count += 1
-            elif neg_score > pos_score:
-                negative_count += 1
-            else:
-                neutral_count += 1
-            
-            # Track trending general topics
-            for word in ['inflation', 'fed', 'interest', 'earnings', 'china', 'europe', 'jobs', 'gdp']:
-                if word in text:
-                    trending_topics[word] = trending_topics.get(word, 0) + 1
-            
-            # Track sector mentions
-            for sector, keywords in sectors.items():
-                for keyword in keywords:
-                    if keyword in text:
-                        sector_mentions[sector] = sector_mentions.get(sector, 0) + 1
-                        break
+            # Items are shared between summaries (feed and news caches), so each is scanned only once
+            if item.sentiment_scan is None:
+                item.sentiment_scan = scan_sentiment(item.search_text)
+        scans = [item.sentiment_scan for item in news_items]
+        
+        # Tally with Counter, which counts an iterable in C; most_common keeps first-seen order for ties
+        sentiment_counts = {'positive': 0, 'negative': 0, 'neutral': 0}
+        sentiment_counts.update(Counter(sentiment for sentiment, _, _ in scans))
+        trending_topics = Counter(chain.from_iterable(topics for _, topics, _ in scans))
+        sector_mentions = Counter(chain.from_iterable(sectors for _, _, sectors in scans))
         
         return {
-            'sentiment': {
-                'positive': positive_count,
-                'negative': negative_count,
-                'neutral': neutral_count
-            },
-            'trending_topics': sorted(trending_topics.items(), key=lambda x: x[1], reverse=True)[:5],
-            'hot_sectors': sorted(sector_mentions.items(), key=lambda x: x[1], reverse=True)[:3]
+            'sentiment': sentiment_counts,
+            'trending_topics': trending_topics.most_common(5),
+            'hot_sectors': sector_mentions.most_common(3)
         }
     
     def generate_predictions(self, analysis: Dict[str, any]) -> str:
@@ -1976,51 +2821,44 @@ Focus on making the analysis professional and actionable for investors in this s
         
         return '\n'.join(predictions)
     
+    def _summary_header(self, language: str, timestamp: str, sentiment: Dict[str, int]) -> str:
+        """Fill in the precompiled summary header for a language"""
+        positive, negative, neutral = sentiment['positive'], sentiment['negative'], sentiment['neutral']
+        total = positive + negative + neutral
+        return SUMMARY_HEADER_TEMPLATES[language].format(
+            timestamp=timestamp,
+            positive=positive,
+            negative=negative,
+            neutral=neutral,
+            positive_pct=percentage(positive, total),
+            negative_pct=percentage(negative, total),
+            neutral_pct=percentage(neutral, total)
+        )
+    
     async def generate_daily_summary(self) -> str:
         """Generate the complete daily summary"""
         try:
-            # Fetch all news
-            news_items = await self.fetch_all_news()
+            # Fetch all news, with sentiment analysis and predictions shared by every summary of this fetch
+            news_items, analysis, predictions, headlines = await self._news_snapshot()
             
             if not news_items:
                 return "❌ Unable to fetch news at this time. Please try again later."
             
-            # Analyze sentiment
-            analysis = self.analyze_news_sentiment(news_items)
-            
-            # Generate predictions
-            predictions = self.generate_predictions(analysis)
+            now = datetime.now(MARKET_TIMEZONE)
             
-            # Create summary message
-            summary = f"""
-📊 **{self.translations['en']['daily_intelligence']}**
-📅 {datetime.now().strftime('%B %d, %Y')} • {datetime.now().strftime('%H:%M')} EST
-
-**📈 {self.translations['en']['market_sentiment']}**
-• {self.translations['en']['positive_news']}: {analysis['sentiment']['positive']} articles ({analysis['sentiment']['positive']/(sum(analysis['sentiment'].values()))*100:.1f}%)
-• {self.translations['en']['negative_news']}: {analysis['sentiment']['negative']} articles ({analysis['sentiment']['negative']/(sum(analysis['sentiment'].values()))*100:.1f}%)
-• {self.translations['en']['neutral_news']}: {analysis['sentiment']['neutral']} articles ({analysis['sentiment']['neutral']/(sum(analysis['sentiment'].values()))*100:.1f}%)
-
-**🚨 {self.translations['en']['top_headlines']}**
-"""
+            # Create summary message, collected in parts and joined once
+            parts = [self._summary_header('en', now.strftime('%B %d, %Y • %H:%M %Z'), analysis['sentiment'])]
             
             # Add top headlines from different sources
-            added_sources = set()
-            headline_count = 0
-            for item in news_items[:8]:
-                if item.source not in added_sources and headline_count < 5:
-                    summary += f"\n📰 **{item.source}**\n"
-                    summary += f"*{item.title[:100]}{'...' if len(item.title) > 100 else ''}*\n"
-                    added_sources.add(item.source)
-                    headline_count += 1
+            parts.extend(f"\n📰 **{item.source}**\n*{truncate(item.title)}*\n" for item in headlines)
             
-            summary += f"\n**🔮 {self.translations['en']['market_predictions']}**\n{predictions}\n"
+            parts.append(f"\n**🔮 {TRANSLATIONS['en']['market_predictions']}**\n{predictions}\n")
             
             # Add footer with sources
-            summary += f"\n📡 **Sources**: {', '.join(list(self.news_sources.keys())[:4])} + more"
-            summary += f"\n🤖 **Generated**: {datetime.now().strftime('%H:%M')} EST | Users: {self.db.get_user_count():,}"
+            parts.append(f"\n📡 **Sources**: {', '.join(islice(NEWS_SOURCES, 4))} + more")
+            parts.append(f"\n🤖 **Generated**: {now.strftime('%H:%M %Z')} | Users: {self.db.get_user_count():,}")
             
-            return summary
+            return ''.join(parts)
             
         except Exception as e:
             logger.error(f"Error generating daily summary: {e}")
@@ -2040,70 +2878,30 @@ We apologize for the inconvenience and appreciate your patience! 🙏
     async def generate_translated_summary(self, user_id: int) -> str:
         """Generate daily summary in user's preferred language"""
         try:
-            # Fetch all news
-            news_items = await self.fetch_all_news()
+            # Fetch all news, with sentiment analysis and predictions shared by every summary of this fetch
+            news_items, analysis, predictions, headlines = await self._news_snapshot()
             
             if not news_items:
                 return self.get_text(user_id, 'no_news')
             
-            # Analyze sentiment
-            analysis = self.analyze_news_sentiment(news_items)
-            
-            # Generate predictions
-            predictions = self.generate_predictions(analysis)
-            
             # Get user's language
             user_language = self.db.get_user_language(user_id)
+            language = 'ru' if user_language == 'ru' else 'en'
             
-            # Create summary in user's language
+            # Create summary in user's language, collected in parts and joined once
+            parts = [self._summary_header(language, datetime.now(MARKET_TIMEZONE).strftime('%B %d, %Y • %H:%M %Z'), analysis['sentiment'])]
+            
+            # Translate all picked titles in one request if user prefers Russian
+            titles = [item.title for item in headlines]
             if user_language == 'ru':
-                summary = f"""
-📊 **{self.translations['ru']['daily_intelligence']}**
-📅 {datetime.now().strftime('%B %d, %Y')} • {datetime.now().strftime('%H:%M')} EST
-
-**📈 {self.translations['ru']['market_sentiment']}**
-• {self.translations['ru']['positive_news']}: {analysis['sentiment']['positive']} статей ({analysis['sentiment']['positive']/(sum(analysis['sentiment'].values()))*100:.1f}%)
-• {self.translations['ru']['negative_news']}: {analysis['sentiment']['negative']} статей ({analysis['sentiment']['negative']/(sum(analysis['sentiment'].values()))*100:.1f}%)
-• {self.translations['ru']['neutral_news']}: {analysis['sentiment']['neutral']} статей ({analysis['sentiment']['neutral']/(sum(analysis['sentiment'].values()))*100:.1f}%)
-
-**🚨 {self.translations['ru']['top_headlines']}**
-"""
-            else:
-                summary = f"""
-📊 **{self.translations['en']['daily_intelligence']}**
-📅 {datetime.now().strftime('%B %d, %Y')} • {datetime.now().strftime('%H:%M')} EST
-
-**📈 {self.translations['en']['market_sentiment']}**
-• {self.translations['en']['positive_news']}: {analysis['sentiment']['positive']} articles ({analysis['sentiment']['positive']/(sum(analysis['sentiment'].values()))*100:.1f}%)
-• {self.translations['en']['negative_news']}: {analysis['sentiment']['negative']} articles ({analysis['sentiment']['negative']/(sum(analysis['sentiment'].values()))*100:.1f}%)
-• {self.translations['en']['neutral_news']}: {analysis['sentiment']['neutral']} articles ({analysis['sentiment']['neutral']/(sum(analysis['sentiment'].values()))*100:.1f}%)
-
-**🚨 {self.translations['en']['top_headlines']}**
-"""
+                titles = await self.translate_batch(titles, 'ru')
             
-            # Add top headlines from different sources
-            added_sources = set()
-            headline_count = 0
-            for item in news_items[:8]:
-                if item.source not in added_sources and headline_count < 5:
-                    # Translate news content if user prefers Russian
-                    if user_language == 'ru':
-                        title = await self.translate_news_content(item.title, 'ru')
-                        summary += f"\n📰 **{item.source}**\n"
-                        summary += f"*{title[:100]}{'...' if len(title) > 100 else ''}*\n"
-                    else:
-                        summary += f"\n📰 **{item.source}**\n"
-                        summary += f"*{item.title[:100]}{'...' if len(item.title) > 100 else ''}*\n"
-                    added_sources.add(item.source)
-                    headline_count += 1
+            parts.extend(f"\n📰 **{item.source}**\n*{truncate(title)}*\n" for item, title in zip(headlines, titles))
             
             # Add predictions
-            if user_language == 'ru':
-                summary += f"\n**🔮 {self.translations['ru']['market_predictions']}**\n{predictions}\n"
-            else:
-                summary += f"\n**🔮 {self.translations['en']['market_predictions']}**\n{predictions}\n"
+            parts.append(f"\n**🔮 {TRANSLATIONS[language]['market_predictions']}**\n{predictions}\n")
             
-            return summary
+            return ''.join(parts)
             
         except Exception as e:
             logger.error(f"Error generating translated summary for user {user_id}: {e}")
@@ -2112,123 +2910,91 @@ We apologize for the inconvenience and appreciate your patience! 🙏
     async def send_daily_summary_to_subscribers(self):
         """Send unified daily digest to all subscribed users"""
         try:
-            subscribers = self.db.get_subscribed_users()
-            if not subscribers:
+            segments = await asyncio.to_thread(self.db.get_subscriber_segments)
+            if not segments:
                 logger.info("No subscribers found for daily summary")
                 return
             
-            # Send to all subscribers with rate limiting
-            successful_sends = 0
-            failed_sends = 0
+            blocked_users = []
+            digest_for = self._shared_digests(segments)
             
-            for user_id in subscribers:
+            async def send_one(user_id: int) -> bool:
                 try:
-                    # Generate personalized unified digest for each user
-                    digest = await self.generate_unified_digest(user_id, include_stocks=True)
+                    # Personalized unified digest, shared by users with the same preferences
+                    digest = await digest_for(user_id)
                     
-                    await self.bot.send_message(
+                    await self._send_message(
                         chat_id=user_id, 
                         text=digest, 
                         parse_mode='Markdown'
                     )
-                    successful_sends += 1
-                    
-                    # Rate limiting - Telegram allows ~30 messages per second
-                    await asyncio.sleep(0.05)
+                    return True
                     
                 except Exception as e:
-                    logger.error(f"Failed to send digest to user {user_id}: {e}")
-                    failed_sends += 1
-                    
-                    # If user blocked bot, we might want to unsubscribe them
-                    if "bot was blocked" in str(e).lower():
-                        self.db.unsubscribe_user(user_id)
+                    if chat_unreachable(e):
+                        # Bot blocked, account gone or chat not found: unsubscribe them (together, after the broadcast)
+                        blocked_users.append(user_id)
+                    else:
+                        logger.error(f"Failed to send digest to user {user_id}: {e}")
+                    return False
+            
+            # Send to all subscribers with rate limiting
+            successful_sends, failed_sends = await self._broadcast(send_one)
+            await asyncio.to_thread(self.db.unsubscribe_users, blocked_users)
             
             logger.info(f"Unified digest sent to {successful_sends} users, {failed_sends} failed")
             
         except Exception as e:
             logger.error(f"Error sending unified digest to subscribers: {e}")
     
-    def schedule_daily_summaries(self):
-        """Schedule daily summaries"""
-        # Daily morning summary at 9:00 AM EST
-        schedule.every().day.at("09:00").do(
-            lambda: asyncio.create_task(self.send_daily_summary_to_subscribers())
-        )
-        
-        # Market opening summary at 9:30 AM EST (weekdays only)
-        schedule.every().monday.at("09:30").do(
-            lambda: asyncio.create_task(self.send_daily_summary_to_subscribers())
-        )
-        schedule.every().tuesday.at("09:30").do(
-            lambda: asyncio.create_task(self.send_daily_summary_to_subscribers())
-        )
-        schedule.every().wednesday.at("09:30").do(
-            lambda: asyncio.create_task(self.send_daily_summary_to_subscribers())
-        )
-        schedule.every().thursday.at("09:30").do(
-            lambda: asyncio.create_task(self.send_daily_summary_to_subscribers())
-        )
-        schedule.every().friday.at("09:30").do(
-            lambda: asyncio.create_task(self.send_daily_summary_to_subscribers())
-        )
-        
-        # Market notifications (15 minutes before/after major markets)
-        # NYSE/NASDAQ (US Markets) - Weekdays only
-        schedule.every().monday.at("09:15").do(
-            lambda: asyncio.create_task(self.send_market_notifications("NYSE", "open"))
-        )
-        schedule.every().monday.at("16:15").do(
-            lambda: asyncio.create_task(self.send_market_notifications("NYSE", "close"))
-        )
-        schedule.every().tuesday.at("09:15").do(
-            lambda: asyncio.create_task(self.send_market_notifications("NYSE", "open"))
-        )
-        schedule.every().tuesday.at("16:15").do(
-            lambda: asyncio.create_task(self.send_market_notifications("NYSE", "close"))
-        )
-        schedule.every().wednesday.at("09:15").do(
-            lambda: asyncio.create_task(self.send_market_notifications("NYSE", "open"))
-        )
-        schedule.every().wednesday.at("16:15").do(
-            lambda: asyncio.create_task(self.send_market_notifications("NYSE", "close"))
-        )
-        schedule.every().thursday.at("09:15").do(
-            lambda: asyncio.create_task(self.send_market_notifications("NYSE", "open"))
-        )
-        schedule.every().thursday.at("16:15").do(
-            lambda: asyncio.create_task(self.send_market_notifications("NYSE", "close"))
-        )
-        schedule.every().friday.at("09:15").do(
-            lambda: asyncio.create_task(self.send_market_notifications("NYSE", "open"))
-        )
-        schedule.every().friday.at("16:15").do(
-            lambda: asyncio.create_task(self.send_market_notifications("NYSE", "close"))
-        )
+    async def _run_daily(self, at_time: str, weekdays_only: bool, job, *args):
+        """Start job(*args) every day at at_time (HH:MM in MARKET_TIMEZONE), skipping weekends if weekdays_only"""
+        hour, minute = map(int, at_time.split(':'))
+        while True:
+            now = datetime.now(MARKET_TIMEZONE)
+            due = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if due <= now:
+                due += timedelta(days=1)
+            
+            # Wait on timestamps rather than wall times so DST changes are handled
+            remaining = due.timestamp() - time.time()
+            while remaining > 0:
+                await asyncio.sleep(min(remaining, SCHEDULER_MAX_SLEEP))
+                remaining = due.timestamp() - time.time()
+            
+            if not weekdays_only or due.weekday() < 5:
+                asyncio.create_task(job(*args))
     
     async def send_market_notifications(self, market_name: str, action: str):
         """Send market notifications to all subscribers"""
         try:
-            subscribers = self.db.get_subscribed_users()
-            if not subscribers:
+            segments = await asyncio.to_thread(self.db.get_subscriber_segments)
+            if not segments:
                 logger.info(f"No subscribers found for {market_name} {action} notification")
                 return
             
-            # Send notification to all subscribers
-            successful_sends = 0
-            failed_sends = 0
+            blocked_users = []
             
-            for user_id in subscribers:
+            async def send_one(user_id: int) -> bool:
                 try:
-                    await self.send_market_notification(market_name, action, user_id)
-                    successful_sends += 1
-                    
-                    # Rate limiting
-                    await asyncio.sleep(0.05)
+                    return await self.send_market_notification(market_name, action, user_id)
                     
                 except Exception as e:
-                    logger.error(f"Failed to send {market_name} {action} notification to user {user_id}: {e}")
-                    failed_sends += 1
+                    if chat_unreachable(e):
+                        # Bot blocked, account gone or chat not found: unsubscribe them (together, after the broadcast)
+                        blocked_users.append(user_id)
+                    else:
+                        logger.error(f"Failed to send {market_name} {action} notification to user {user_id}: {e}")
+                    return False
+            
+            # Warm the topic-asset cache with one request per distinct (topic, language) before the fan-out
+            await asyncio.gather(*(
+                self.get_topic_assets_for(topics, language) for language, topics in segments
+            ))
+            
+            # Send notification to all subscribers
+            successful_sends, failed_sends = await self._broadcast(send_one)
+            await asyncio.to_thread(self.db.unsubscribe_users, blocked_users)
             
             logger.info(f"{market_name} {action} notification sent to {successful_sends} users, {failed_sends} failed")
             
@@ -2236,19 +3002,25 @@ We apologize for the inconvenience and appreciate your patience! 🙏
             logger.error(f"Error sending {market_name} {action} notifications: {e}")
     
     async def run_scheduler(self):
-        """Run the scheduled tasks"""
+        """Run the scheduled jobs at their New York times, whatever the host's timezone"""
         logger.info("Scheduler started")
-        while True:
-            schedule.run_pending()
-            await asyncio.sleep(60)  # Check every minute
+        jobs = [
+            # Daily morning summary at 9:00 AM ET
+            self._run_daily("09:00", False, self.send_daily_summary_to_subscribers),
+            # Market opening summary at 9:30 AM ET (weekdays only)
+            self._run_daily("09:30", True, self.send_daily_summary_to_subscribers),
+        ]
+        # Market notifications (15 minutes before/after major markets)
+        jobs += [
+            self._run_daily(at_time, True, self.send_market_notifications, market_name, action)
+            for market_name, action, at_time in MARKET_NOTIFICATION_TIMES
+        ]
+        await asyncio.gather(*jobs)
     
     async def start_bot(self):
         """Start the public bot and scheduler"""
         logger.info("Starting Public Stock News Bot...")
         
-        # Schedule daily summaries
-        self.schedule_daily_summaries()
-        
         # Start the bot
         await self.application.initialize()
         await self.application.start()
@@ -2261,33 +3033,56 @@ We apologize for the inconvenience and appreciate your patience! 🙏
         await self.run_scheduler()
     
     async def generate_unified_digest(self, user_id: int, include_stocks: bool = True) -> str:
-        """Generate unified digest with news, stock prices, and ChatGPT-powered analysis"""
+        """Generate unified digest with news, stock prices, and ChatGPT-powered analysis
+        
+        The digest only depends on the user's language and topics, so it is shared with
+        every such user for DIGEST_TTL seconds; concurrent callers await one build.
+        """
+        user_language, user_topics = self.db.get_user_prefs(user_id)
+        cache_key = (user_language, user_topics, include_stocks)
+        now = time.monotonic()
+        cached = self._digest_cache.get(cache_key)
+        if cached is None or cached[0] <= now:
+            cached = (now + DIGEST_TTL, asyncio.ensure_future(self._build_unified_digest(user_id, include_stocks)))
+            self._digest_cache[cache_key] = cached
+        
         try:
-            # Get user language
-            user_language = self.db.get_user_language(user_id)
-            
-            # Fetch topic-specific news
-            news_items = await self.fetch_topic_news(user_id)
-            if not news_items:
-                return self.get_text(user_id, 'no_news')
-            
-            # Get topic-specific assets if requested
-            stock_prices = []
-            if include_stocks:
-                stock_prices = await self.get_topic_assets(user_id)
-            
-            # Create unified content for ChatGPT processing
-            unified_content = self._prepare_content_for_chatgpt(news_items, stock_prices, user_language)
-            
-            # Process with ChatGPT API
-            processed_digest = await self._process_with_chatgpt(unified_content, user_language)
-            
-            return processed_digest
-            
+            # shield: a cancelled caller must not cancel the build other users are waiting on
+            digest = await asyncio.shield(cached[1])
         except Exception as e:
             logger.error(f"Error generating unified digest for user {user_id}: {e}")
+            digest = None
+        if digest:
+            return digest
+        
+        # Failed or empty digests are not kept, so the next call tries again
+        if self._digest_cache.get(cache_key) is cached:
+            del self._digest_cache[cache_key]
+        if digest is None:
             # Fallback to traditional method
             return await self.generate_translated_summary(user_id)
+        return self.get_text(user_id, 'no_news')
+    
+    async def _build_unified_digest(self, user_id: int, include_stocks: bool) -> str:
+        """Build a unified digest for the user's language and topics; empty if there is no news"""
+        # Get user language
+        user_language = self._user_language(user_id)
+        
+        # Fetch topic-specific news
+        news_items = await self.fetch_topic_news(user_id)
+        if not news_items:
+            return ''
+        
+        # Get topic-specific assets if requested
+        stock_prices = []
+        if include_stocks:
+            stock_prices = await self.get_topic_assets(user_id)
+        
+        # Create unified content for ChatGPT processing
+        unified_content = self._prepare_content_for_chatgpt(news_items, stock_prices, user_language)
+        
+        # Process with ChatGPT API
+        return await self._process_with_chatgpt(unified_content, user_language)
     
     def _prepare_content_for_chatgpt(self, news_items: List[NewsItem], stock_prices: List[Dict], user_language: str) -> str:
         """Prepare unified content for ChatGPT processing"""
@@ -2323,75 +3118,52 @@ We apologize for the inconvenience and appreciate your patience! 🙏
     async def _process_with_chatgpt(self, content: str, user_language: str) -> str:
         """Process content with ChatGPT API for translation and analysis"""
         try:
-            import os
-            from openai import AsyncOpenAI
-            
             # Get API key from environment
             api_key = os.getenv('OPENAI_API_KEY')
             if not api_key:
                 logger.warning("OpenAI API key not found, using fallback")
                 raise Exception("No API key")
             
-            client = AsyncOpenAI(api_key=api_key)
-            
-            # Create system prompt based on language
+            # The model only fills in a JSON schema; section titles and layout are rendered locally
             if user_language == 'ru':
-                system_prompt = """Ты - эксперт по финансовым рынкам. Создай структурированный дайджест новостей и цен на акции на русском языке.
-
-Формат:
-📊 **РЫНОЧНЫЙ ДАЙДЖЕСТ** 📊
-
-📰 **ГЛАВНЫЕ НОВОСТИ ПО ТЕМЕ**
-• Краткое описание ключевых новостей (3-5 самых важных)
-• Анализ влияния на рынок
-• Источники новостей с ссылками
-
-📈 **КЛЮЧЕВЫЕ АКТИВЫ**
-• Цены и изменения по основным активам
-• Тренды и паттерны
-• Анализ движения цен
+                system_prompt = """Ты - эксперт по финансовым рынкам. По новостям и ценам активов составь дайджест на русском языке.
 
-🔮 **ПРОГНОЗЫ И ТЕНДЕНЦИИ**
-• Анализ настроений рынка
-• Ключевые секторы для внимания
-• Рекомендации для инвесторов
+Ответь только JSON вида:
+{"headlines": [{"title": строка, "impact": строка, "url": строка}], "assets": [{"symbol": строка, "trend": строка}], "forecast": строка}
 
-Используй эмодзи, структурируй информацию для легкого чтения, и сделай анализ профессиональным и понятным. Включи ссылки на полные статьи, если они доступны."""
+headlines - 3-5 самых важных новостей: короткий заголовок, одно предложение о влиянии на рынок и ссылка на статью, если она есть.
+assets - ключевые активы с одним предложением о тренде.
+forecast - 2-4 предложения о настроениях рынка, секторах для внимания и рекомендациях инвесторам."""
             else:
-                system_prompt = """You are a financial markets expert. Create a structured digest of news and stock prices in English.
+                system_prompt = """You are a financial markets expert. Build a digest in English from the news and asset prices.
 
-Format:
-📊 **MARKET DIGEST** 📊
+Reply with JSON only, shaped as:
+{"headlines": [{"title": string, "impact": string, "url": string}], "assets": [{"symbol": string, "trend": string}], "forecast": string}
 
-📰 **TOP NEWS BY TOPIC**
-• Brief description of key news (3-5 most important)
-• Market impact analysis
-• News sources with links
-
-📈 **KEY ASSETS**
-• Prices and changes for major assets
-• Trends and patterns
-• Price movement analysis
-
-🔮 **FORECASTS & TRENDS**
-• Market sentiment analysis
-• Key sectors to watch
-• Investor recommendations
-
-Use emojis, structure information for easy reading, and make the analysis professional and understandable. Include links to full articles when available."""
+headlines - the 3-5 most important stories: a short title, one sentence on market impact and the article link when available.
+assets - the key assets with one sentence on their trend.
+forecast - 2-4 sentences on market sentiment, sectors to watch and investor recommendations."""
             
             # Process with ChatGPT
-            response = await client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await self._chat_completion(
+                model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": f"Process this financial content and create a digest in {user_language}:\n\n{content}"}
                 ],
-                max_tokens=1000,
+                response_format={"type": "json_object"},
+                max_tokens=DIGEST_MAX_TOKENS,
                 temperature=0.7
             )
             
-            result = response.choices[0].message.content
+            choice = response.choices[0]
+            if choice.finish_reason == 'length':
+                logger.warning(f"ChatGPT digest for {user_language} hit the {DIGEST_MAX_TOKENS}-token limit")
+            digest = json_loads(choice.message.content)
+            if not digest.get('headlines'):
+                raise ValueError("ChatGPT digest has no headlines")
+            
+            result = render_digest(TRANSLATIONS['ru' if user_language == 'ru' else 'en'], digest)
             logger.info(f"ChatGPT processing successful for {user_language}")
             return result
             
@@ -2424,7 +3196,10 @@ async def main():
     
     # Create and start public bot
     bot = PublicStockNewsBot(BOT_TOKEN)
-    await bot.start_bot()
+    try:
+        await bot.start_bot()
+    finally:
+        await bot.close()
 
 if __name__ == "__main__":
     try:
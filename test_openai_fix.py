@@ -15,27 +15,21 @@ async def test_openai_client():
         
         print("🧪 Testing OpenAI AsyncClient initialization...")
         
-        # Initialize client - this was causing the error
-        client = AsyncOpenAI(
-            api_key=os.getenv('OPENAI_API_KEY'),
-            http_client=None  # Use default httpx client to avoid conflicts
-        )
+        # Initialize client - this was causing the error; the context manager closes it even on failure
+        async with AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY')) as client:
+            print("✅ AsyncClient initialized successfully")
+            
+            # Test a simple completion
+            print("🤖 Testing completion...")
+            response = await client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": "Say 'test successful' in one word"}],
+                max_tokens=10
+            )
+            
+            result = response.choices[0].message.content.strip()
+            print(f"✅ OpenAI response: {result}")
         
-        print("✅ AsyncClient initialized successfully")
-        
-        # Test a simple completion
-        print("🤖 Testing completion...")
-        response = await client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": "Say 'test successful' in one word"}],
-            max_tokens=10
-        )
-        
-        result = response.choices[0].message.content.strip()
-        print(f"✅ OpenAI response: {result}")
-        
-        # Close client properly
-        await client.close()
         print("✅ Client closed successfully")
         
         return True